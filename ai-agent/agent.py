@@ -2,8 +2,11 @@ from google.adk.agents import LlmAgent
 
 from typing import List, Dict, Optional
 import datetime
+import hashlib
+import json
 import sys
 import os
+import threading
 
 # Add current directory to sys.path to ensure local modules like rag_tool can be imported
 # This is necessary because the folder name 'ai-agent' contains a hyphen and cannot be imported as a package
@@ -12,14 +15,31 @@ if current_dir not in sys.path:
     sys.path.append(current_dir)
 
 # Import database query helper
-from data.query_data import query_employees, query_performance_reviews
+from data.query_data import query_performance_reviews, iter_employees
 from data.insert_data import insert_performance_review_data, insert_performance_review, resolve_employee_identifier, insert_employee_data, insert_employee
-from rag_tool import search_company_policies, GoogleGenAIEmbeddingFunction
+from data.update_data import update_employee_by_id, update_employees_by_id, ALLOWED_COLUMNS
+from data.delete_data import delete_employee_by_id, delete_employees_by_id
+from data.review_stats import query_review_stats
+from data.analytics import GROUP_COLUMNS, headcount_and_salary, salary_bands, review_score_distribution, hire_cohorts
+from data.async_db import db_tool, io_tool
+from data.culture_flags import create_culture_flag_tables, get_culture_scan_state, has_culture_flags_after, iter_reviews_after, query_culture_flags, save_culture_flags
+from rag_tool import search_company_policies, start_background_indexer, GoogleGenAIEmbeddingFunction, EmbeddingError, KNOWLEDGE_BASE_PATH, EMBEDDING_MODEL
+from chunker import CHUNKER_VERSION, chunk_markdown
+from culture_matcher import CultureMatcher, get_culture_matcher
+from policy_cache import PolicyRulesCache, knowledge_base_fingerprint
 
 from dotenv import load_dotenv, dotenv_values
 # Load environment variables from .env file
 load_dotenv()
 
+# Parsed culture policy (rules, chunks, embeddings), persisted across restarts
+policy_cache = PolicyRulesCache()
+
+# Rows fetched per page when tools stream the employee table
+EMPLOYEE_PAGE_SIZE = int(os.getenv("EMPLOYEE_PAGE_SIZE", "500"))
+# Most employees `list_all_employees` returns per call; the rest are paged with `after_id`
+EMPLOYEE_LIST_LIMIT = int(os.getenv("EMPLOYEE_LIST_LIMIT", "200"))
+
 # Rules / triggers to detect culture-related issues in free-text comments.
 CULTURE_MISMATCH_RULES = [
     {
@@ -80,45 +100,24 @@ CULTURE_MISMATCH_RULES = [
 ]
 
 
+def _culture_matcher(extra_rules: Optional[List[Dict]] = None) -> CultureMatcher:
+    """Compiled matcher for the built-in rules plus `extra_rules` (cached per rule-set version)."""
+    return get_culture_matcher(list(CULTURE_MISMATCH_RULES) + list(extra_rules or []))
+
+
 def _detect_culture_flags_from_comment(comment: Optional[str], extra_rules: Optional[List[Dict]] = None) -> List[Dict]:
     """Return list of matched culture dimensions found in a free-text comment.
 
+    For many comments, build the matcher once with `_culture_matcher(extra_rules)`
+    and call its `match` directly.
+
     Args:
         comment: review comment text
         extra_rules: optional list of rule dicts to augment `CULTURE_MISMATCH_RULES`
     """
     if not comment:
         return []
-    lowered = comment.lower()
-    matches: List[Dict] = []
-    # Combine built-in rules with any extra rules (dynamic from policy)
-    all_rules = list(CULTURE_MISMATCH_RULES)
-    if extra_rules:
-        # ensure we don't mutate the originals
-        for r in extra_rules:
-            # normalize to expected keys
-            dr = {
-                "dimension": r.get("dimension", "policy"),
-                "description": r.get("description", ""),
-                "triggers": r.get("triggers", []),
-            }
-            all_rules.append(dr)
-
-    for rule in all_rules:
-        for phrase in rule["triggers"]:
-            try:
-                if phrase.lower() in lowered:
-                    matches.append({
-                        "dimension": rule["dimension"],
-                        "phrase": phrase,
-                        "description": rule["description"],
-                        "comment": comment,
-                    })
-                    break
-            except Exception:
-                # ignore any bad trigger values
-                continue
-    return matches
+    return _culture_matcher(extra_rules).match(comment)
 
 
 def _extract_rules_from_policy(policy_text: Optional[str]) -> List[Dict]:
@@ -199,124 +198,260 @@ def _summarize_policy_text(policy_text: Optional[str], max_chars: int = 800) ->
     return s[: max_chars - 3].rstrip() + "..."
 
 
-def _cosine_sim(a: List[float], b: List[float]) -> float:
-    """Compute cosine similarity between two vectors."""
-    try:
-        import math
-
-        dot = sum(x * y for x, y in zip(a, b))
-        norm_a = math.sqrt(sum(x * x for x in a))
-        norm_b = math.sqrt(sum(y * y for y in b))
-        if norm_a == 0 or norm_b == 0:
-            return 0.0
-        return dot / (norm_a * norm_b)
-    except Exception:
-        return 0.0
+_embedding_fn: Optional[GoogleGenAIEmbeddingFunction] = None
 
 
 def _embed_texts(texts: List[str]) -> List[List[float]]:
     """Embed a list of texts using the project's GenAI embedding function.
 
-    This reuses the `GoogleGenAIEmbeddingFunction` defined in `rag_tool.py`.
+    This reuses the `GoogleGenAIEmbeddingFunction` defined in `rag_tool.py`,
+    so texts embedded before (e.g. unchanged review comments) come from the
+    persistent embedding cache instead of the API.
+
+    Raises `EmbeddingError` if any text could not be embedded.
     """
-    try:
-        ef = GoogleGenAIEmbeddingFunction()
-        return ef(texts)
-    except Exception as e:
-        # Fallback: return zero vectors of length 1 to avoid crashes
-        print(f"Embedding error: {e}")
-        return [[0.0] for _ in texts]
+    global _embedding_fn
+    if _embedding_fn is None:
+        _embedding_fn = GoogleGenAIEmbeddingFunction()
+    return _embedding_fn(texts)
 
 
-def find_culture_misaligned_employees() -> Dict:
-    """Tool: search company policy (RAG) and performance reviews, then report employees with evidence of culture mismatch.
+# RAG query used to retrieve the culture policy for scans
+CULTURE_POLICY_QUERY = "公司文化 考核 標準 文化契合"
 
-    Returns a dict with textual summary and structured list of flagged employees.
+
+def _policy_chunks(policy_text: str) -> List[str]:
+    """Chunk retrieved policy text with the same chunker `rag_tool` indexes with.
+
+    `search_company_policies` joins results with `---` separators and
+    prefixes each with its source; those wrappers are removed first.
     """
-    # 1) Get policy/context from RAG
+    chunks: List[str] = []
+    for part in str(policy_text).split("\n\n---\n\n"):
+        if part.startswith("來源:") and "\n內容:\n" in part:
+            part = part.split("\n內容:\n", 1)[1]
+        chunks.extend(c["text"] for c in chunk_markdown(part))
+    return chunks
+
+
+def _load_policy_context(query: str = CULTURE_POLICY_QUERY) -> Dict:
+    """Return the culture policy text with its extracted rules, chunks and chunk embeddings.
+
+    Served from `policy_cache` while the knowledge base is unchanged;
+    otherwise retrieved via RAG and parsed, reusing a cached entry when the
+    retrieved text is identical. Embeddings are only cached when every chunk
+    embedded successfully.
+    """
+    kb_fingerprint = knowledge_base_fingerprint(KNOWLEDGE_BASE_PATH)
+    entry = policy_cache.lookup(query, kb_fingerprint)
+    if entry is not None and entry.get("embeddings") is not None and entry.get("chunker") == CHUNKER_VERSION:
+        return entry
+
     try:
-        policy_res = search_company_policies("公司文化 考核 標準 文化契合")
+        policy_res = search_company_policies(query)
     except Exception:
         policy_res = None
-
     policy_text = ""
     if isinstance(policy_res, dict):
         policy_text = policy_res.get("text", "")
-    policy_summary = _summarize_policy_text(policy_text)
+    if not policy_text:
+        return {"policy_text": "", "rules": [], "chunks": [], "embeddings": []}
+    if policy_res.get("status") != "success":
+        # e.g. "no_match": use the message as-is but don't cache or embed it
+        return {"policy_text": policy_text, "rules": _extract_rules_from_policy(policy_text), "chunks": [], "embeddings": []}
+
+    entry = policy_cache.get(policy_text) or {}
     # extract simple rules from the policy text to improve detection recall
-    dynamic_rules = _extract_rules_from_policy(policy_text)
+    rules = entry.get("rules")
+    if rules is None:
+        rules = _extract_rules_from_policy(policy_text)
+    if entry.get("chunker") != CHUNKER_VERSION:
+        # Chunked with other settings: chunks and their embeddings are stale
+        entry = {}
+    chunks = entry.get("chunks")
+    if chunks is None:
+        chunks = _policy_chunks(policy_text)
+    embeddings = entry.get("embeddings")
+    if embeddings is None and chunks:
+        try:
+            embeddings = _embed_texts(chunks)
+            cacheable = embeddings
+        except EmbeddingError as e:
+            # Scan without the semantic pass; retry embedding next scan
+            print(f"Policy embedding failed: {e}")
+            embeddings, cacheable = [], None
+    else:
+        cacheable = embeddings if embeddings is not None else []
+    policy_cache.put(query, kb_fingerprint, policy_text, rules, chunks, cacheable, chunker=CHUNKER_VERSION)
+    return {"policy_text": policy_text, "rules": rules, "chunks": chunks, "embeddings": embeddings or []}
+
+
+# similarity threshold for semantic policy matches (tunable)
+SEMANTIC_THRESHOLD = 0.72
+# reviews whose comments are embedded and scored together
+SEMANTIC_BATCH_SIZE = 256
+
+
+def _culture_scan_version(matcher: CultureMatcher, policy_chunks: List[str], semantic: bool) -> str:
+    """Version of everything that decides a review's flags; stored flags are reused only while it is unchanged."""
+    payload = json.dumps(
+        {
+            "rules": matcher.version,
+            "semantic": semantic,
+            "chunks": policy_chunks if semantic else [],
+            "threshold": SEMANTIC_THRESHOLD,
+            "model": EMBEDDING_MODEL if semantic else None,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# One culture scan at a time per process: overlapping scans would read the
+# same watermark and flag the same reviews twice.
+_culture_scan_lock = threading.Lock()
+
+
+def _scan_culture_flags(
+    after_id: int,
+    matcher: CultureMatcher,
+    policy_index,
+    policy_chunks: List[str],
+    version: str,
+    state: Optional[Dict] = None,
+) -> Dict:
+    """Flag reviews with id > `after_id` and persist flags plus watermark block by block.
 
-    # 2) Walk employees and their reviews
-    rows = query_employees()
-    flagged: List[Dict] = []
+    `state` is the stored scan state the caller derived `after_id` from.
 
-    # Prepare policy chunks and embeddings for semantic matching
-    policy_chunks: List[str] = []
-    policy_embeddings: List[List[float]] = []
-    if policy_text:
-        # Split into chunks similar to rag_tool: by double newline
-        policy_chunks = [c.strip() for c in str(policy_text).split("\n\n") if c.strip()]
-        if policy_chunks:
-            policy_embeddings = _embed_texts(policy_chunks)
-
-    # similarity threshold (tunable)
-    SEMANTIC_THRESHOLD = 0.72
-
-    for emp in rows:
-        emp_reviews = query_performance_reviews(emp["id"]) or []
-        reasons: List[Dict] = []
-        for rev in emp_reviews:
-            comments = rev.get("comments") or ""
+    Returns `{"reviews_scanned": n}`. Progress is committed per block, so
+    an interrupted scan resumes where it stopped. If a block's comments
+    cannot be embedded the scan stops there, leaving that block and the
+    rest for the next scan, and the result carries an `"error"` message.
+    """
+    # Drop flags above the resume point (all of them on a rescan) and record the
+    # version. Skipped when the stored state already matches and nothing is left
+    # above it: a write here would bump data_version, and with it the snapshot.
+    unchanged = state is not None and state["rules_version"] == version and int(state["last_review_id"]) == after_id
+    if not unchanged or has_culture_flags_after(after_id):
+        save_culture_flags([], after_id, version, resume_from=after_id)
+
+    scanned = 0
+
+    def scan_block(block: List[Dict]) -> None:
+        # Embed every non-empty comment in the block at once and score the
+        # comments x policy-chunks matrix in one operation.
+        best_idx, best_sim = {}, {}
+        if policy_index is not None:
+            texts = {}
+            for rev in block:
+                text = (rev.get("comments") or "").strip()
+                if text:
+                    texts[rev["id"]] = text
+            if texts:
+                idx, sims = policy_index.best(_embed_texts(list(texts.values())))
+                for rid, i, sim in zip(texts, idx, sims):
+                    best_idx[rid], best_sim[rid] = int(i), float(sim)
+
+        flags: List[Dict] = []
+        for rev in block:
+            base = {"review_id": rev["id"], "employee_id": rev["employee_id"]}
             # run detection with both built-in and dynamic rules
-            matches = _detect_culture_flags_from_comment(comments, extra_rules=dynamic_rules)
-            for m in matches:
-                reasons.append({
-                    "dimension": m["dimension"],
-                    "description": m["description"],
-                    "evidence": comments,
-                    "highlight": m["phrase"],
-                    "score": rev.get("score"),
-                    "date": rev.get("created_at"),
-                    "review_id": rev.get("id"),
-                })
-
-            # Semantic matching: embed the comment and compare to policy chunks
-            if policy_embeddings and comments.strip():
-                try:
-                    comment_emb = _embed_texts([comments.strip()])[0]
-                    # compute max similarity
-                    best_score = 0.0
-                    best_idx = -1
-                    for i, pe in enumerate(policy_embeddings):
-                        sim = _cosine_sim(comment_emb, pe)
-                        if sim > best_score:
-                            best_score = sim
-                            best_idx = i
-                    if best_score >= SEMANTIC_THRESHOLD and best_idx >= 0:
-                        snippet = policy_chunks[best_idx]
-                        reasons.append({
-                            "dimension": "文化相關(語意匹配)",
-                            "description": f"與政策片段語意相似 (score={best_score:.2f})",
-                            "evidence": comments,
-                            "highlight": snippet,
-                            "similarity": float(best_score),
-                            "score": rev.get("score"),
-                            "date": rev.get("created_at"),
-                            "review_id": rev.get("id"),
-                        })
-                except Exception as e:
-                    # don't crash on embedding errors
-                    print(f"Semantic matching error: {e}")
-
-        if reasons:
-            flagged.append({"employee": emp, "reasons": reasons})
+            for m in matcher.match(rev.get("comments") or ""):
+                flags.append(dict(base, kind="keyword", dimension=m["dimension"], description=m["description"], highlight=m["phrase"]))
+
+            # Semantic matching: best policy chunk for this comment
+            sim = best_sim.get(rev["id"], 0.0)
+            if sim > 0 and sim >= SEMANTIC_THRESHOLD:
+                flags.append(dict(
+                    base,
+                    kind="semantic",
+                    dimension="文化相關(語意匹配)",
+                    description=f"與政策片段語意相似 (score={sim:.2f})",
+                    highlight=policy_chunks[best_idx[rev["id"]]],
+                    similarity=sim,
+                ))
+        save_culture_flags(flags, block[-1]["id"], version)
+
+    block: List[Dict] = []
+    try:
+        for rev in iter_reviews_after(after_id):
+            block.append(rev)
+            if len(block) >= SEMANTIC_BATCH_SIZE:
+                scan_block(block)
+                scanned += len(block)
+                block = []
+        if block:
+            scan_block(block)
+            scanned += len(block)
+    except EmbeddingError as e:
+        print(f"Culture scan stopped: {e}")
+        return {"reviews_scanned": scanned, "error": str(e)}
+    return {"reviews_scanned": scanned}
+
+
+def find_culture_misaligned_employees(full_rescan: Optional[bool] = False) -> Dict:
+    """Tool: search company policy (RAG) and performance reviews, then report employees with evidence of culture mismatch.
+
+    Scans incrementally: flags are stored per review, and only reviews added
+    (or edited) since the last scan are processed. Everything is rescanned
+    when the culture rules or policy change, or when `full_rescan` is true.
+
+    Returns a dict with textual summary and structured list of flagged employees.
+    """
+    # 1) Get policy/context from RAG (cached while the knowledge base is unchanged)
+    policy = _load_policy_context()
+    policy_text = policy["policy_text"]
+    policy_summary = _summarize_policy_text(policy_text)
+    dynamic_rules = policy["rules"]
+
+    # Policy chunks and embeddings for semantic matching
+    policy_chunks: List[str] = policy["chunks"]
+    policy_embeddings: List[List[float]] = policy["embeddings"]
+
+    # Built-in + policy rules compiled once for the whole scan
+    matcher = _culture_matcher(dynamic_rules)
+
+    # Policy chunk embeddings are normalized once; comments are scored in batches
+    policy_index = None
+    # Skip the pass entirely if the policy chunks could not be embedded
+    if any(any(v) for v in policy_embeddings):
+        # numpy is only needed for the semantic pass
+        from similarity import SimilarityIndex
+        policy_index = SimilarityIndex(policy_embeddings)
+
+    # 2) Flag reviews added since the last scan (or all of them if the rules changed)
+    version = _culture_scan_version(matcher, policy_chunks, policy_index is not None)
+    create_culture_flag_tables()
+    with _culture_scan_lock:
+        # Read the watermark under the lock, after any scan that was running has committed
+        state = get_culture_scan_state()
+        after_id = 0
+        if state and state["rules_version"] == version and not full_rescan:
+            after_id = int(state["last_review_id"])
+        scan_info = _scan_culture_flags(after_id, matcher, policy_index, policy_chunks, version, state)
+    scan_info.update({"full_rescan": after_id == 0, "rules_version": version})
+    scan_note = ""
+    if "error" in scan_info:
+        # Flags found so far are kept; the remaining reviews are scanned next time
+        scan_note = f"\n\n注意：評論語意比對失敗，本次掃描未完成，下次查詢時會繼續。錯誤：{scan_info['error']}"
+
+    # Answer from the stored flags
+    flagged: List[Dict] = []
+    for item in query_culture_flags():
+        # Only flagged employees need their row loaded
+        emp_rows = resolve_employee_identifier(int(item["employee_id"]))
+        if emp_rows:
+            flagged.append({"employee": emp_rows[0], "reasons": item["reasons"]})
 
     # 3) Format text response
     if not flagged:
         text = "目前沒有發現明確提到文化不符的考核評論。"
         if policy_summary:
             text += "\n\n公司文化摘要：\n" + policy_summary
-        return {"status": "success", "text": text, "policy_context": policy_summary, "employees": []}
+        text += scan_note
+        return {"status": "success", "text": text, "policy_context": policy_summary, "employees": [], "scan": scan_info}
 
     lines = []
     if policy_summary:
@@ -332,7 +467,7 @@ def find_culture_misaligned_employees() -> Dict:
             lines.append(f"  {i}. {r['dimension']} — {r['description']}")
             lines.append(f"     評語摘錄: {r['evidence']}")
             lines.append(f"     關鍵字: {r['highlight']} | 分數: {r.get('score')} | 日期: {r.get('date')}")
-    return {"status": "success", "text": "\n".join(lines), "policy_context": policy_summary, "employees": flagged}
+    return {"status": "success", "text": "\n".join(lines) + scan_note, "policy_context": policy_summary, "employees": flagged, "scan": scan_info}
 
 def _format_employee_row(row: Dict) -> str:
     """Return a compact single-line representation for one employee row."""
@@ -343,19 +478,29 @@ def _format_employee_row(row: Dict) -> str:
     return f"{name} — {pos} ({dept}) <{email}>"
 
 
-def list_all_employees() -> Dict:
-    """Tool: return all employees as text.
+def list_all_employees(after_id: Optional[int] = None) -> Dict:
+    """Tool: return all employees as text, one page at a time.
 
     Returns a dict so the ADK tool runner can serialize the result. The
     'text' key contains a human-readable string for direct display in chat.
+    At most `EMPLOYEE_LIST_LIMIT` employees are returned per call; when more
+    remain, `next_after_id` is set and passing it as `after_id` returns the
+    next page.
     """
-    rows = query_employees()
-    if not rows:
-        return {"status": "success", "text": "沒有找到任何員工資料。"}
     lines = ["所有員工："]
-    for r in rows:
+    employees: List[Dict] = []
+    next_after_id = None
+    for r in iter_employees(page_size=min(EMPLOYEE_PAGE_SIZE, EMPLOYEE_LIST_LIMIT + 1), after_id=after_id):
+        if len(employees) >= EMPLOYEE_LIST_LIMIT:
+            next_after_id = employees[-1]["id"]
+            break
         lines.append(_format_employee_row(r))
-    return {"status": "success", "text": "\n".join(lines), "employees": rows}
+        employees.append(r)
+    if not employees:
+        return {"status": "success", "text": "沒有找到任何員工資料。"}
+    if next_after_id is not None:
+        lines.append(f"（僅列出前 {len(employees)} 位，還有更多員工；以 after_id={next_after_id} 查詢下一頁）")
+    return {"status": "success", "text": "\n".join(lines), "employees": employees, "next_after_id": next_after_id}
 
 
 def find_employees_by_role(query: str) -> Dict:
@@ -378,9 +523,8 @@ def find_employees_by_role(query: str) -> Dict:
     # also include the original words
     syns.append(q)
 
-    rows = query_employees()
     matches: List[Dict] = []
-    for r in rows:
+    for r in iter_employees(page_size=EMPLOYEE_PAGE_SIZE):
         combined = " ".join([str(r.get('first_name','')), str(r.get('last_name','')), str(r.get('department','')), str(r.get('position','')), str(r.get('email',''))]).lower()
         if any(s.lower() in combined for s in syns):
             matches.append(r)
@@ -453,6 +597,120 @@ def get_employee_performance_reviews(employee_name: str) -> Dict:
     return {"status": "success", "text": "\n".join(lines), "reviews": reviews}
 
 
+def get_employee_review_summary(employee_name: str) -> Dict:
+    """Tool: summarize an employee's performance reviews (count, average, min, max, latest).
+
+    Reads the precomputed per-employee statistics instead of every review;
+    use `get_employee_performance_reviews` when the review texts are needed.
+
+    Args:
+        employee_name: The name, email or ID of the employee.
+    """
+    res = _resolve_single_employee(employee_name)
+    if res["status"] != "success":
+        return res
+    target = res["employee"]
+    name = f"{target.get('first_name','')} {target.get('last_name','')}".strip()
+    stats = query_review_stats(int(target["id"]))
+    if not stats:
+        return {"status": "success", "text": f"{name} 目前沒有任何考核紀錄。", "stats": None}
+
+    mean = stats.get("mean_score")
+    lines = [
+        f"{name} 的考核摘要：",
+        f"- 考核次數: {stats['review_count']}",
+        f"- 平均分數: {mean:.1f}" if mean is not None else "- 平均分數: N/A",
+        f"- 最低 / 最高: {stats.get('min_score')} / {stats.get('max_score')}",
+        f"- 最近一次: {stats.get('latest_score')} ({stats.get('latest_at')})",
+    ]
+    return {"status": "success", "text": "\n".join(lines), "stats": stats}
+
+
+def _analytics_group(group_by: Optional[str]) -> Optional[str]:
+    """Normalize a tool's group_by argument ("department", "position", or "all"/empty for company-wide)."""
+    g = (group_by or "").strip().lower()
+    if g in ("", "all", "company", "none"):
+        return None
+    if g not in GROUP_COLUMNS:
+        raise ValueError(f"group_by 只能是 {', '.join(sorted(GROUP_COLUMNS))} 或 all")
+    return g
+
+
+def get_headcount_and_salary_stats(group_by: Optional[str] = "department", band_size: Optional[float] = None) -> Dict:
+    """Tool: headcount and salary min / average / max per department or position.
+
+    Aggregated in the database; use this instead of listing employees for
+    "how many people / average salary by department" questions.
+
+    Args:
+        group_by: "department", "position", or "all" for company-wide totals.
+        band_size: optional salary band width (e.g. 10000) to also return headcount per salary band.
+    """
+    try:
+        group = _analytics_group(group_by)
+        rows = headcount_and_salary(group)
+        bands = salary_bands(band_size, group) if band_size else []
+    except ValueError as e:
+        return {"status": "error", "text": str(e)}
+    if not rows:
+        return {"status": "success", "text": "沒有找到任何員工資料。", "groups": []}
+    lines = [f"人數與薪資（依 {group or 'all'}）："]
+    for r in rows:
+        lines.append(f"- {r['group']}: {r['headcount']} 人, 薪資 {r['min_salary']} / {r['avg_salary']} / {r['max_salary']} (min/avg/max)")
+    if bands:
+        lines.append(f"薪資級距（每 {band_size:g}）：")
+        for b in bands:
+            prefix = f"{b['group']} " if group else ""
+            lines.append(f"- {prefix}{b['band_start']:g}–{b['band_end']:g}: {b['headcount']} 人")
+    return {"status": "success", "text": "\n".join(lines), "groups": rows, "salary_bands": bands}
+
+
+def get_review_score_distribution(group_by: Optional[str] = "department", bucket_size: Optional[int] = 10) -> Dict:
+    """Tool: performance review score averages and histogram per department or position.
+
+    Aggregated in the database; use this for "average score by department"
+    style questions instead of reading individual reviews.
+
+    Args:
+        group_by: "department", "position", or "all" for company-wide totals.
+        bucket_size: histogram bucket width in score points (default 10).
+    """
+    try:
+        rows = review_score_distribution(_analytics_group(group_by), bucket_size=int(bucket_size or 10))
+    except ValueError as e:
+        return {"status": "error", "text": str(e)}
+    if not rows:
+        return {"status": "success", "text": "目前沒有任何考核紀錄。", "groups": []}
+    lines = ["考核分數分布："]
+    for r in rows:
+        hist = ", ".join(f"{k}+:{v}" for k, v in sorted(r["buckets"].items()))
+        lines.append(
+            f"- {r['group']}: 平均 {r['avg_score']} (min {r['min_score']}, max {r['max_score']}), "
+            f"{r['review_count']} 筆 / {r['employees_reviewed']} 人 | {hist}"
+        )
+    return {"status": "success", "text": "\n".join(lines), "groups": rows}
+
+
+def get_hire_cohort_stats(period: Optional[str] = "year", group_by: Optional[str] = None) -> Dict:
+    """Tool: headcount, average salary and average review score per hire-date cohort.
+
+    Args:
+        period: "year" or "month".
+        group_by: optional "department" or "position" to split each cohort.
+    """
+    try:
+        rows = hire_cohorts((period or "year").strip().lower(), _analytics_group(group_by))
+    except ValueError as e:
+        return {"status": "error", "text": str(e)}
+    if not rows:
+        return {"status": "success", "text": "沒有找到任何員工資料。", "cohorts": []}
+    lines = ["到職梯次統計："]
+    for r in rows:
+        label = r["cohort"] if r["group"] == "(all)" else f"{r['cohort']} {r['group']}"
+        lines.append(f"- {label}: {r['headcount']} 人, 平均薪資 {r['avg_salary']}, 平均考核 {r['avg_score']}")
+    return {"status": "success", "text": "\n".join(lines), "cohorts": rows}
+
+
 def seed_employee_data() -> Dict:
     """Tool: seed `employee` table using `insert_employee_data` helper.
 
@@ -495,20 +753,178 @@ def create_employee(
         return {"status": "error", "text": "Failed to create employee.", "detail": str(e)}
 
 
+def _resolve_single_employee(identifier) -> Dict:
+    """Resolve an identifier to exactly one employee, or return an error/ambiguous tool result."""
+    candidates = resolve_employee_identifier(identifier)
+    if not candidates:
+        return {"status": "error", "text": f"找不到符合 '{identifier}' 的員工。"}
+    if len(candidates) > 1:
+        lines = [f"找到多位符合 '{identifier}' 的員工，請提供更精確的名稱、email 或 ID："]
+        for c in candidates:
+            lines.append(f"{_format_employee_row(c)} (ID: {c.get('id')})")
+        return {"status": "ambiguous", "text": "\n".join(lines), "candidates": candidates}
+    return {"status": "success", "employee": candidates[0]}
+
+
+def get_employee(identifier: str) -> Dict:
+    """Tool: look up a single employee by id, email, or name.
+
+    Returns `ambiguous` with candidates when several employees match.
+    """
+    res = _resolve_single_employee(identifier)
+    if res["status"] != "success":
+        return res
+    emp = res["employee"]
+    return {"status": "success", "text": f"{_format_employee_row(emp)} (ID: {emp.get('id')})", "employee": emp}
+
+
+def update_employee(
+    identifier: str,
+    updates: Optional[Dict] = None,
+    first_name: Optional[str] = None,
+    last_name: Optional[str] = None,
+    email: Optional[str] = None,
+    department: Optional[str] = None,
+    position: Optional[str] = None,
+    salary: Optional[float] = None,
+    hire_date: Optional[str] = None,
+    supervisor_id: Optional[int] = None,
+) -> Dict:
+    """Tool: update one employee located by id, email, or name.
+
+    Fields can be passed either as an `updates` dict (column -> value) or as
+    individual keyword arguments.
+    """
+    fields = dict(updates or {})
+    for key, value in (
+        ("first_name", first_name),
+        ("last_name", last_name),
+        ("email", email),
+        ("department", department),
+        ("position", position),
+        ("salary", salary),
+        ("hire_date", hire_date),
+        ("supervisor_id", supervisor_id),
+    ):
+        if value is not None:
+            fields[key] = value
+    fields = {k: v for k, v in fields.items() if k in ALLOWED_COLUMNS}
+    if not fields:
+        return {"status": "error", "text": f"沒有可更新的欄位，可更新欄位：{', '.join(sorted(ALLOWED_COLUMNS))}"}
+
+    res = _resolve_single_employee(identifier)
+    if res["status"] != "success":
+        return res
+    emp = res["employee"]
+    try:
+        rows = update_employee_by_id(int(emp["id"]), fields)
+    except Exception as e:
+        return {"status": "error", "text": "Failed to update employee.", "detail": str(e)}
+    return {"status": "success", "text": f"Updated employee id={emp['id']}: {fields}", "id": int(emp["id"]), "rows_updated": rows}
+
+
+def delete_employee(identifier: str) -> Dict:
+    """Tool: delete one employee located by id, email, or name."""
+    res = _resolve_single_employee(identifier)
+    if res["status"] != "success":
+        return res
+    emp = res["employee"]
+    try:
+        rows = delete_employee_by_id(int(emp["id"]))
+    except Exception as e:
+        return {"status": "error", "text": "Failed to delete employee.", "detail": str(e)}
+    return {"status": "success", "text": f"Deleted employee id={emp['id']} ({_format_employee_row(emp)})", "id": int(emp["id"]), "rows_deleted": rows}
+
+
+def _batch_result_text(action: str, results: Dict[int, int]) -> str:
+    done = [i for i, n in results.items() if n]
+    missing = [i for i, n in results.items() if not n]
+    text = f"{action} {len(done)} employee(s) in one transaction."
+    if missing:
+        text += f" No matching row for id(s): {', '.join(str(i) for i in missing)}."
+    return text
+
+
+def update_employees_batch(employee_ids: List[int], updates: Dict) -> Dict:
+    """Tool: apply the same field updates to many employees in one transaction.
+
+    Use for reorgs (e.g. move a team to a new `supervisor_id`) or
+    department-wide changes (e.g. a new `salary` band). If any update fails,
+    none are applied.
+
+    Args:
+        employee_ids: ids of the employees to update.
+        updates: column -> value, e.g. {"supervisor_id": 12}.
+    """
+    fields = {k: v for k, v in (updates or {}).items() if k in ALLOWED_COLUMNS}
+    if not employee_ids or not fields:
+        return {"status": "error", "text": f"請提供員工 ID 清單與要更新的欄位（{', '.join(sorted(ALLOWED_COLUMNS))}）。"}
+    try:
+        results = update_employees_by_id({int(i): fields for i in employee_ids})
+    except Exception as e:
+        return {"status": "error", "text": "Batch update failed; no changes were applied.", "detail": str(e)}
+    return {
+        "status": "success",
+        "text": _batch_result_text("Updated", results),
+        "results": [{"id": i, "rows_updated": n} for i, n in results.items()],
+    }
+
+
+def delete_employees_batch(employee_ids: List[int]) -> Dict:
+    """Tool: delete many employees by id in one transaction.
+
+    If any delete fails, none are applied.
+    """
+    if not employee_ids:
+        return {"status": "error", "text": "請提供要刪除的員工 ID 清單。"}
+    try:
+        results = delete_employees_by_id([int(i) for i in employee_ids])
+    except Exception as e:
+        return {"status": "error", "text": "Batch delete failed; no changes were applied.", "detail": str(e)}
+    return {
+        "status": "success",
+        "text": _batch_result_text("Deleted", results),
+        "results": [{"id": i, "rows_deleted": n} for i, n in results.items()],
+    }
+
+
+def _start_knowledge_base_indexer(callback_context=None) -> None:
+    """Agent callback: make sure the background knowledge-base indexer is running.
+
+    Starting it on the agent's first turn (instead of at import) keeps
+    importing this module free of side effects; later turns are a no-op.
+    """
+    start_background_indexer()
+    return None
+
+
 # Register tools with LlmAgent if available
 root_agent = LlmAgent(
     name="ai_administrative",
     model=os.getenv("MODEL_USE"),
     description=("Agent to help with administrative tasks such as managing employee data"),
     instruction=("You are an AI administrative assistant. Use the provided tools to answer user queries about employees."),
-    tools=[
+    before_agent_callback=_start_knowledge_base_indexer,
+    # Tools block on SQLite / network I/O; run them on worker threads so one
+    # slow call does not stall other sessions on the server's event loop.
+    # Tools that wait on the embedding API / Chroma (the policy search, and
+    # the culture scan that embeds every new review) use the I/O pool so they
+    # never tie up a DB worker for the length of a remote call.
+    tools=[io_tool(t) for t in (search_company_policies, find_culture_misaligned_employees)] + [db_tool(t) for t in (
         list_all_employees,
         find_employees_by_role,
         add_performance_review,
         get_employee_performance_reviews,
-        search_company_policies,
-        find_culture_misaligned_employees,
+        get_employee_review_summary,
+        get_headcount_and_salary_stats,
+        get_review_score_distribution,
+        get_hire_cohort_stats,
         seed_employee_data,
         create_employee,
-    ],
+        get_employee,
+        update_employee,
+        delete_employee,
+        update_employees_batch,
+        delete_employees_batch,
+    )],
 )
@@ -0,0 +1,149 @@
+"""Heading-aware, size-bounded chunking of Markdown policy documents.
+
+Splitting on blank lines turned `culture_policy.md` into fragments such as
+a bare `## 1. 誠信正直 (Integrity)` heading, while a long paragraph stayed
+one oversized chunk. `chunk_markdown` follows the heading structure
+instead:
+
+- each section (a heading plus its body) is rendered with its full
+  heading path as Markdown heading lines, so a chunk is self-describing
+  and `agent._extract_rules_from_policy` still sees `##` headings;
+- consecutive small sibling sections (same parent heading) are packed
+  into one chunk while they fit in `max_chars`;
+- a section longer than `max_chars` is split at paragraph, line or
+  sentence boundaries (hard cut as a last resort), and consecutive pieces
+  overlap by `overlap` characters.
+
+Used by `rag_tool` for indexing and by the agent for the policy chunks
+it embeds. `CHUNKER_VERSION` changes with the parameters, so indexes and
+caches built with different chunking are rebuilt.
+"""
+
+import os
+import re
+from typing import Dict, List, Tuple
+
+CHUNK_MAX_CHARS = int(os.getenv("KB_CHUNK_MAX_CHARS", "800"))
+CHUNK_OVERLAP_CHARS = int(os.getenv("KB_CHUNK_OVERLAP_CHARS", "100"))
+CHUNKER_VERSION = f"md1:{CHUNK_MAX_CHARS}:{CHUNK_OVERLAP_CHARS}"
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+# Preferred cut points for oversized text, best first
+_BOUNDARIES = (("\n\n",), ("\n",), ("。", "！", "？", "；", ". ", "! ", "? ", "; "))
+
+HeadingPath = List[Tuple[int, str]]
+
+
+def _sections(text: str) -> List[Tuple[HeadingPath, str]]:
+    """`(heading path, body)` for every section with a non-empty body, in document order."""
+    sections: List[Tuple[HeadingPath, str]] = []
+    path: HeadingPath = []
+    body: List[str] = []
+    in_fence = False
+
+    def flush() -> None:
+        content = "\n".join(body).strip()
+        if content:
+            sections.append((list(path), content))
+        body.clear()
+
+    for line in text.splitlines():
+        if line.lstrip().startswith(("```", "~~~")):
+            in_fence = not in_fence
+        m = None if in_fence else _HEADING_RE.match(line)
+        if m is None:
+            body.append(line)
+            continue
+        flush()
+        level = len(m.group(1))
+        while path and path[-1][0] >= level:
+            path.pop()
+        path.append((level, m.group(2).strip()))
+    flush()
+    return sections
+
+
+def _heading_lines(path: HeadingPath) -> str:
+    return "\n".join(f"{'#' * level} {title}" for level, title in path)
+
+
+def _render(path: HeadingPath, body: str) -> str:
+    return f"{_heading_lines(path)}\n\n{body}" if path else body
+
+
+def _best_cut(text: str, lo: int, hi: int) -> int:
+    """Position just after the last preferred boundary in `text[lo:hi]`, or `hi` if there is none."""
+    for separators in _BOUNDARIES:
+        cut = -1
+        for sep in separators:
+            i = text.rfind(sep, lo, hi)
+            if i >= 0:
+                cut = max(cut, i + len(sep))
+        if cut > lo:
+            return cut
+    return hi
+
+
+def split_text(text: str, limit: int, overlap: int = 0) -> List[str]:
+    """Split `text` into pieces of at most `limit` characters, preferring natural boundaries.
+
+    Each piece after the first starts `overlap` characters before the end
+    of the previous one.
+    """
+    if len(text) <= limit:
+        return [text]
+    overlap = max(0, min(overlap, limit // 2))
+    pieces: List[str] = []
+    start = 0
+    while start < len(text):
+        end = min(start + limit, len(text))
+        if end < len(text):
+            end = _best_cut(text, start + limit // 2, end)
+        piece = text[start:end].strip()
+        if piece:
+            pieces.append(piece)
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return pieces
+
+
+def chunk_markdown(text: str, max_chars: int = CHUNK_MAX_CHARS, overlap: int = CHUNK_OVERLAP_CHARS) -> List[Dict]:
+    """Chunk a Markdown document; returns `[{"text", "headings"}]` in document order.
+
+    `headings` is the list of heading titles the chunk sits under (for a
+    chunk packing several sibling sections, their common parent's path).
+    """
+    chunks: List[Dict] = []
+    group: List[Tuple[HeadingPath, str]] = []
+
+    def group_text(sections: List[Tuple[HeadingPath, str]]) -> str:
+        if len(sections) == 1:
+            return _render(*sections[0])
+        parent = sections[0][0][:-1]
+        parts = [_heading_lines(parent)] if parent else []
+        parts.extend(_render(path[-1:], body) for path, body in sections)
+        return "\n\n".join(parts)
+
+    def emit() -> None:
+        if not group:
+            return
+        if len(group) > 1:
+            chunks.append({"text": group_text(group), "headings": [t for _, t in group[0][0][:-1]]})
+        else:
+            path, body = group[0]
+            prefix = len(_heading_lines(path)) + 2 if path else 0
+            for piece in split_text(body, max(max_chars - prefix, max_chars // 4, 1), overlap):
+                chunks.append({"text": _render(path, piece), "headings": [t for _, t in path]})
+        group.clear()
+
+    for path, body in _sections(text or ""):
+        if group:
+            same_parent = bool(path) and path[:-1] == group[0][0][:-1] and bool(group[0][0])
+            if same_parent and len(group_text(group + [(path, body)])) <= max_chars:
+                group.append((path, body))
+                continue
+            emit()
+        group.append((path, body))
+    emit()
+    return chunks
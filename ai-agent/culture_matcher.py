@@ -0,0 +1,142 @@
+"""Compiled multi-pattern matcher for culture trigger phrases.
+
+Culture rules are lists of trigger phrases per dimension. Instead of testing
+every trigger of every rule against every comment (`phrase in comment`),
+`CultureMatcher` compiles all triggers into one Aho-Corasick automaton and
+finds every occurring trigger in a single pass over the lowercased comment.
+
+Results are the same as the substring loop it replaces: at most one match
+per rule, reported with the rule's earliest-listed trigger that occurs, in
+rule order.
+
+Compiled matchers are cached by `rule_set_version(rules)`, a hash of the
+rules' content, so a rule set is compiled once however many comments are
+scanned with it.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Compiled rule sets kept in memory (built-in rules plus a few policy versions)
+MATCHER_CACHE_SIZE = 16
+
+
+def _normalize_rules(rules: Sequence[Dict]) -> List[Tuple[str, str, Tuple[str, ...]]]:
+    normalized = []
+    for r in rules:
+        # Non-string triggers were skipped by the original substring loop
+        triggers = tuple(t for t in (r.get("triggers") or []) if isinstance(t, str))
+        normalized.append((r.get("dimension", "policy"), r.get("description", ""), triggers))
+    return normalized
+
+
+def rule_set_version(rules: Sequence[Dict]) -> str:
+    """Stable content hash of a rule list; identical rules give the same version."""
+    payload = json.dumps(_normalize_rules(rules), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class CultureMatcher:
+    """Aho-Corasick automaton over the (lowercased) triggers of a rule list."""
+
+    def __init__(self, rules: Sequence[Dict]):
+        self.rules = _normalize_rules(rules)
+        self.version = rule_set_version(rules)
+        # Trie: per state, char -> next state; outputs are (rule_idx, trigger_idx)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, int]]] = [[]]
+        # An empty trigger matches every comment, as `"" in text` does
+        self._always: Dict[int, int] = {}
+        for ri, (_, _, triggers) in enumerate(self.rules):
+            for ti, phrase in enumerate(triggers):
+                pattern = phrase.lower()
+                if not pattern:
+                    self._always.setdefault(ri, ti)
+                    continue
+                state = 0
+                for ch in pattern:
+                    nxt = self._goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[state][ch] = nxt
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._out.append([])
+                    state = nxt
+                self._out[state].append((ri, ti))
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        # Also builds `_delta`, the full transition table (trie edges plus
+        # failure fallbacks), so matching is one dict lookup per character.
+        self._delta: List[Dict[str, int]] = [dict(self._goto[0])] + [{} for _ in self._goto[1:]]
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            # The failure state is shallower, so its row is already complete
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Fold suffix outputs in so matching never walks the failure chain for output
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> Dict[int, int]:
+        """Return `{rule_idx: earliest-listed trigger_idx}` for every rule with a trigger in `text`."""
+        best = dict(self._always)
+        if not text:
+            return best
+        delta, out = self._delta, self._out
+        state = 0
+        for ch in text.lower():
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                for ri, ti in out[state]:
+                    cur = best.get(ri)
+                    if cur is None or ti < cur:
+                        best[ri] = ti
+        return best
+
+    def match(self, comment: Optional[str]) -> List[Dict]:
+        """Matched culture dimensions for one comment, in rule order (same shape as before)."""
+        if not comment:
+            return []
+        found = self.find(comment)
+        matches: List[Dict] = []
+        for ri in sorted(found):
+            dimension, description, triggers = self.rules[ri]
+            matches.append({
+                "dimension": dimension,
+                "phrase": triggers[found[ri]],
+                "description": description,
+                "comment": comment,
+            })
+        return matches
+
+
+_cache: "OrderedDict[str, CultureMatcher]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def get_culture_matcher(rules: Sequence[Dict]) -> CultureMatcher:
+    """Return the compiled matcher for `rules`, compiling it on first use of this rule-set version."""
+    version = rule_set_version(rules)
+    with _cache_lock:
+        matcher = _cache.get(version)
+        if matcher is not None:
+            _cache.move_to_end(version)
+            return matcher
+    matcher = CultureMatcher(rules)
+    with _cache_lock:
+        _cache[version] = matcher
+        while len(_cache) > MATCHER_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return matcher
@@ -0,0 +1,201 @@
+"""Persistent, content-addressed embedding store.
+
+Embeddings are keyed by `(model, sha256(normalized text))` and kept in a
+SQLite file (`data/embedding_cache.db`, override with `EMBEDDING_CACHE_PATH`)
+as packed float32 blobs, about 3 KB per 768-d vector. Review comments and
+policy chunks rarely change, so each distinct text is embedded once and then
+served from disk.
+
+Size is bounded by `EMBEDDING_CACHE_MAX_ROWS` (default 50000). When a write
+pushes the store past it, the least recently used rows are evicted. Recency
+is tracked coarsely: a hit only rewrites `last_used` when the stored value is
+older than `EMBEDDING_CACHE_TOUCH_SECONDS` (default 3600), so repeated reads
+of a warm cache do not take the write lock.
+
+Used by `rag_tool.GoogleGenAIEmbeddingFunction` (and therefore by Chroma
+indexing and queries) and by the agent's `_embed_texts`.
+"""
+
+import hashlib
+import os
+import threading
+import time
+import unicodedata
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from data.connection import get_connection, transaction
+
+DEFAULT_CACHE_PATH = Path(os.getenv("EMBEDDING_CACHE_PATH", Path(__file__).resolve().parent.parent / "data" / "embedding_cache.db"))
+DEFAULT_MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_MAX_ROWS", "50000"))
+DEFAULT_TOUCH_SECONDS = int(os.getenv("EMBEDDING_CACHE_TOUCH_SECONDS", "3600"))
+
+EMBEDDING_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding (
+    model TEXT NOT NULL,
+    text_hash BLOB NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_embedding_last_used ON embedding(last_used);
+"""
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC with whitespace runs collapsed; texts differing only in spacing share an entry."""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+
+
+def _pack(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+def is_valid_embedding(vector: Optional[Sequence[float]]) -> bool:
+    """False for missing or all-zero vectors (what failed embedding calls return)."""
+    return bool(vector) and any(vector)
+
+
+class EmbeddingCache:
+    """SQLite-backed `(model, text) -> vector` store with LRU eviction by row count."""
+
+    def __init__(
+        self,
+        db_path: Path | str = DEFAULT_CACHE_PATH,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        touch_seconds: int = DEFAULT_TOUCH_SECONDS,
+    ):
+        self.db_path = Path(db_path)
+        self.max_rows = max_rows
+        self.touch_seconds = touch_seconds
+        self._ready = False
+        # Guards the counters; the cache is shared by request threads and the indexer
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _conn(self):
+        # Created on first use so importing this module never touches disk
+        conn = get_connection(self.db_path)
+        if not self._ready:
+            conn.executescript(EMBEDDING_CACHE_SCHEMA)
+            self._ready = True
+        return conn
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vectors for `texts` (None where missing), in input order."""
+        if not texts:
+            return []
+        keys = [text_key(t) for t in texts]
+        unique = list(dict.fromkeys(keys))
+        conn = self._conn()
+        found: Dict[bytes, List[float]] = {}
+        now = int(time.time())
+        touch: List[bytes] = []
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(unique), 500):
+            batch = unique[i:i + 500]
+            marks = ",".join("?" * len(batch))
+            for row in conn.execute(
+                f"SELECT text_hash, vector, last_used FROM embedding WHERE model = ? AND text_hash IN ({marks})",
+                (model, *batch),
+            ):
+                key = bytes(row["text_hash"])
+                found[key] = _unpack(row["vector"])
+                if now - row["last_used"] >= self.touch_seconds:
+                    touch.append(key)
+        if touch:
+            with transaction(self.db_path) as tx:
+                tx.executemany(
+                    "UPDATE embedding SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, k) for k in touch],
+                )
+        result = [found.get(k) for k in keys]
+        hit_count = sum(1 for v in result if v is not None)
+        with self._lock:
+            self.hits += hit_count
+            self.misses += len(result) - hit_count
+        return result
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> int:
+        """Store valid vectors for `texts`; returns how many were written. Evicts LRU rows past `max_rows`."""
+        now = int(time.time())
+        rows = [
+            (model, text_key(t), len(v), _pack(v), now)
+            for t, v in zip(texts, vectors)
+            if is_valid_embedding(v)
+        ]
+        if not rows:
+            return 0
+        self._conn()
+        with transaction(self.db_path) as tx:
+            tx.executemany(
+                "INSERT OR REPLACE INTO embedding (model, text_hash, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            excess = tx.execute("SELECT COUNT(*) FROM embedding").fetchone()[0] - self.max_rows
+            if excess > 0:
+                tx.execute(
+                    """
+                    DELETE FROM embedding WHERE (model, text_hash) IN (
+                        SELECT model, text_hash FROM embedding ORDER BY last_used LIMIT ?
+                    )
+                    """,
+                    (excess,),
+                )
+                with self._lock:
+                    self.evictions += excess
+        return len(rows)
+
+    def embed(self, model: str, texts: Sequence[str], embed_fn: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        """Return embeddings for `texts`, calling `embed_fn` only for distinct texts not cached yet."""
+        texts = list(texts)
+        cached = self.get_many(model, texts)
+        missing: Dict[bytes, str] = {}
+        for t, v in zip(texts, cached):
+            if v is None:
+                missing.setdefault(text_key(t), t)
+        if missing:
+            fresh = embed_fn(list(missing.values()))
+            self.put_many(model, list(missing.values()), fresh)
+            by_key = dict(zip(missing.keys(), fresh))
+            cached = [v if v is not None else by_key[text_key(t)] for t, v in zip(texts, cached)]
+        return cached
+
+    def clear(self) -> None:
+        self._conn()
+        with transaction(self.db_path) as tx:
+            tx.execute("DELETE FROM embedding")
+
+    def stats(self) -> Dict:
+        conn = self._conn()
+        rows, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(length(vector)), 0) FROM embedding").fetchone()
+        with self._lock:
+            hits, misses, evictions = self.hits, self.misses, self.evictions
+        lookups = hits + misses
+        return {
+            "rows": rows,
+            "max_rows": self.max_rows,
+            "vector_bytes": size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "evictions": evictions,
+        }
+
+
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,205 @@
+"""Background re-indexing of the knowledge base when its files change.
+
+`KnowledgeBaseIndexer` runs the indexing function on a daemon thread,
+off the request path. It learns about changes from `watchdog` filesystem
+events when the package is installed, and otherwise by polling the
+knowledge-base fingerprint (names, sizes and mtimes) every
+`KB_INDEX_POLL_SECONDS`. Bursts of events, such as an editor writing a
+temp file and renaming it, are debounced: indexing starts once no change
+has been seen for `KB_INDEX_DEBOUNCE_SECONDS`.
+
+`status()` reports freshness: when the files last changed, when the index
+last caught up, whether a change is pending, and the lag (how long the
+oldest unindexed change has been waiting).
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from policy_cache import KNOWLEDGE_BASE_SUFFIXES, knowledge_base_fingerprint
+
+KB_INDEX_DEBOUNCE_SECONDS = float(os.getenv("KB_INDEX_DEBOUNCE_SECONDS", "1.0"))
+KB_INDEX_POLL_SECONDS = float(os.getenv("KB_INDEX_POLL_SECONDS", "5.0"))
+
+
+class KnowledgeBaseIndexer:
+    """Watches `path` and calls `index_fn()` on a background thread after changes settle."""
+
+    def __init__(
+        self,
+        path: Path,
+        index_fn: Callable[[], Optional[Dict]],
+        debounce_seconds: float = KB_INDEX_DEBOUNCE_SECONDS,
+        poll_seconds: float = KB_INDEX_POLL_SECONDS,
+        use_watchdog: bool = True,
+    ):
+        self.path = Path(path)
+        self.index_fn = index_fn
+        self.debounce_seconds = debounce_seconds
+        self.poll_seconds = poll_seconds
+        self.use_watchdog = use_watchdog
+        self.mode: Optional[str] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+        self._stopping = False
+        self._fingerprint: Optional[str] = None
+        # Time of the oldest and newest change not indexed yet (None when idle)
+        self._pending_since: Optional[float] = None
+        self._last_event: Optional[float] = None
+        self.last_change_at: Optional[float] = None
+        self.last_indexed_at: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_stats: Optional[Dict] = None
+        self.last_error: Optional[str] = None
+        self.runs = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "KnowledgeBaseIndexer":
+        """Start watching; the first indexing pass runs right away in the background."""
+        with self._cond:
+            if self.running:
+                return self
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="kb-indexer", daemon=True)
+        self.mode = "polling"
+        if self.use_watchdog:
+            self._observer = self._start_observer()
+            if self._observer is not None:
+                self.mode = "watchdog"
+        self.notify_change()
+        self._thread.start()
+        return self
+
+    def _start_observer(self):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+        indexer = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                paths = [getattr(event, "src_path", ""), getattr(event, "dest_path", "")]
+                if any(str(p).lower().endswith(KNOWLEDGE_BASE_SUFFIXES) for p in paths):
+                    indexer.notify_change()
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        observer = Observer()
+        observer.schedule(Handler(), str(self.path), recursive=False)
+        observer.daemon = True
+        observer.start()
+        return observer
+
+    def notify_change(self) -> None:
+        """Record a change to the knowledge base; indexing follows after the debounce delay."""
+        now = time.time()
+        with self._cond:
+            if self._pending_since is None:
+                self._pending_since = now
+            self._last_event = now
+            self.last_change_at = now
+            self._cond.notify_all()
+
+    def _poll(self) -> None:
+        if knowledge_base_fingerprint(self.path) != self._fingerprint:
+            self.notify_change()
+
+    def _run(self) -> None:
+        next_poll = time.time() + self.poll_seconds
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        return
+                    now = time.time()
+                    if self._last_event is not None and now - self._last_event >= self.debounce_seconds:
+                        self._last_event = None
+                        task = "index"
+                        break
+                    if self.mode == "polling" and now >= next_poll:
+                        task = "poll"
+                        break
+                    timeouts = []
+                    if self._last_event is not None:
+                        timeouts.append(self._last_event + self.debounce_seconds - now)
+                    if self.mode == "polling":
+                        timeouts.append(next_poll - now)
+                    self._cond.wait(min(timeouts) if timeouts else None)
+            if task == "poll":
+                next_poll = time.time() + self.poll_seconds
+                self._poll()
+            else:
+                self._index_once()
+
+    def _index_once(self) -> None:
+        started = time.time()
+        # Taken before indexing so a change made while it runs is still detected
+        fingerprint = knowledge_base_fingerprint(self.path)
+        try:
+            stats = self.index_fn()
+        except Exception as e:
+            print(f"Knowledge-base indexing failed: {e}")
+            with self._cond:
+                self.runs += 1
+                self.last_error = str(e)
+                self.last_duration = time.time() - started
+                if self._last_event is None:
+                    # Retry after a poll interval rather than spinning on a persistent error
+                    self._last_event = time.time() + self.poll_seconds
+            return
+        with self._cond:
+            self.runs += 1
+            self._fingerprint = fingerprint
+            self.last_stats = stats
+            self.last_error = None
+            self.last_duration = time.time() - started
+            self.last_indexed_at = started
+            # Changes seen while indexing are still pending
+            self._pending_since = None if self._last_event is None else started
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wait_until_idle(self, timeout: float = 10.0) -> bool:
+        """Block until at least one pass ran and no change is pending (for tests and tooling)."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._cond:
+                if self.runs and self._pending_since is None:
+                    return True
+            time.sleep(0.02)
+        return False
+
+    def status(self) -> Dict:
+        now = time.time()
+        with self._cond:
+            pending_since = self._pending_since
+            return {
+                "running": self.running,
+                "mode": self.mode,
+                "pending": pending_since is not None,
+                "last_change_at": self.last_change_at,
+                "last_indexed_at": self.last_indexed_at,
+                "lag_seconds": round(now - pending_since, 3) if pending_since is not None else 0.0,
+                "last_duration_seconds": round(self.last_duration, 3) if self.last_duration is not None else None,
+                "last_stats": self.last_stats,
+                "last_error": self.last_error,
+                "runs": self.runs,
+            }
@@ -0,0 +1,113 @@
+"""Manifest of what is currently indexed in the knowledge-base collection.
+
+`rag_tool._index_documents` used to re-read, re-chunk and re-upsert (and so
+re-embed) every knowledge-base file on each query. The manifest records, per
+indexed file, its size, mtime and content hash plus the id and content hash
+of every chunk stored for it, so indexing can:
+
+- skip files whose size and mtime are unchanged without reading them;
+- upsert only chunks that are new or whose text changed;
+- delete chunk ids the file no longer produces (a shrinking file leaves
+  `f"{name}_{i}"` ids behind) and every chunk of a removed file.
+
+It is stored next to the Chroma files (`data/chroma_db/kb_manifest.json`)
+so deleting the store also deletes the manifest, and is written atomically.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+MANIFEST_FILENAME = "kb_manifest.json"
+MANIFEST_FORMAT = 1
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class IndexManifest:
+    """Persistent `file name -> {size, mtime_ns, sha256, chunker, chunks: {id: sha256}}` map."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._files: Optional[Dict[str, Dict]] = None
+        self._version: Optional[str] = None
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._files is None:
+            files: Dict[str, Dict] = {}
+            try:
+                loaded = json.loads(self.path.read_text(encoding="utf-8"))
+                if isinstance(loaded, dict) and loaded.get("format") == MANIFEST_FORMAT:
+                    files = dict(loaded.get("files") or {})
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable index manifest {self.path}: {e}")
+            self._files = files
+        return self._files
+
+    def files(self) -> Dict[str, Dict]:
+        """Snapshot of the per-file entries."""
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._load().items()}
+
+    def get(self, name: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._load().get(name)
+            return dict(entry) if entry is not None else None
+
+    def set(self, name: str, entry: Dict) -> None:
+        with self._lock:
+            self._load()[name] = entry
+            self._version = None
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            self._load().pop(name, None)
+            self._version = None
+
+    def chunk_count(self) -> int:
+        with self._lock:
+            return sum(len(e.get("chunks") or {}) for e in self._load().values())
+
+    def version(self) -> str:
+        """Hash of every indexed chunk id and content; changes whenever the index content does."""
+        with self._lock:
+            if self._version is None:
+                parts = sorted(
+                    f"{cid}:{h}"
+                    for entry in self._load().values()
+                    for cid, h in (entry.get("chunks") or {}).items()
+                )
+                self._version = hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+            return self._version
+
+    def save(self) -> None:
+        with self._lock:
+            payload = {"format": MANIFEST_FORMAT, "files": self._load()}
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"Could not write index manifest {self.path}: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._files = {}
+            self._version = None
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
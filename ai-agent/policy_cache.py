@@ -0,0 +1,160 @@
+"""On-disk cache of culture rules parsed from the company policy.
+
+Every culture scan retrieves the policy text via RAG, extracts rules from
+it, splits it into chunks and embeds the chunks. The policy rarely changes,
+so this module persists the results between scans and restarts:
+
+- entries: keyed by a SHA-256 of the retrieved policy text, holding the
+  extracted rules, the chunk list and (when embedding succeeded) the chunk
+  embeddings.
+- lookups: `(query, knowledge-base fingerprint) -> policy hash`, so an
+  unchanged knowledge base skips the retrieval step as well.
+
+The knowledge-base fingerprint covers every indexed file's name, size and
+mtime; editing, adding or removing a file changes it, which forces a fresh
+retrieval. If the retrieved text is unchanged, its parsed entry is reused.
+
+The cache lives in `data/policy_cache.json` (override with
+`POLICY_CACHE_PATH`) and is written atomically.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_CACHE_PATH = Path(os.getenv("POLICY_CACHE_PATH", Path(__file__).resolve().parent.parent / "data" / "policy_cache.json"))
+
+# Distinct policy texts kept; older ones are dropped first
+MAX_ENTRIES = 8
+# File types indexed by rag_tool
+KNOWLEDGE_BASE_SUFFIXES = (".md", ".txt")
+
+
+def policy_hash(policy_text: str) -> str:
+    return hashlib.sha256(policy_text.encode("utf-8")).hexdigest()
+
+
+def knowledge_base_fingerprint(kb_path: Path) -> str:
+    """Hash of (name, size, mtime) of every knowledge-base file; changes whenever a file does."""
+    kb_path = Path(kb_path)
+    parts = []
+    if kb_path.exists():
+        for f in sorted(kb_path.glob("*.*")):
+            if f.suffix.lower() in KNOWLEDGE_BASE_SUFFIXES:
+                st = f.stat()
+                parts.append(f"{f.name}:{st.st_size}:{st.st_mtime_ns}")
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class PolicyRulesCache:
+    """Persistent `policy hash -> {rules, chunks, embeddings}` store."""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data: Optional[Dict] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self) -> Dict:
+        if self._data is None:
+            data = {"entries": {}, "lookups": {}}
+            try:
+                loaded = json.loads(self.path.read_text(encoding="utf-8"))
+                if isinstance(loaded, dict):
+                    data["entries"] = dict(loaded.get("entries") or {})
+                    data["lookups"] = dict(loaded.get("lookups") or {})
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable policy cache {self.path}: {e}")
+            self._data = data
+        return self._data
+
+    def _save(self) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(self._data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not write policy cache {self.path}: {e}")
+
+    @staticmethod
+    def _lookup_key(query: str, kb_fingerprint: str) -> str:
+        return f"{kb_fingerprint}|{query}"
+
+    def lookup(self, query: str, kb_fingerprint: str) -> Optional[Dict]:
+        """Cached entry for `query` against this knowledge-base state, or None."""
+        with self._lock:
+            data = self._load()
+            h = data["lookups"].get(self._lookup_key(query, kb_fingerprint))
+            entry = data["entries"].get(h) if h else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def get(self, policy_text: str) -> Optional[Dict]:
+        """Cached entry for this exact policy text, or None."""
+        with self._lock:
+            return self._load()["entries"].get(policy_hash(policy_text))
+
+    def put(
+        self,
+        query: str,
+        kb_fingerprint: str,
+        policy_text: str,
+        rules: List[Dict],
+        chunks: List[str],
+        embeddings: Optional[List[List[float]]],
+        chunker: Optional[str] = None,
+    ) -> Dict:
+        """Store (or refresh) the entry for `policy_text` and map `query` to it; returns the entry."""
+        h = policy_hash(policy_text)
+        with self._lock:
+            data = self._load()
+            entries = data["entries"]
+            entry = entries.pop(h, None) or {}
+            if embeddings is None and entry.get("chunks") == chunks and entry.get("chunker") == chunker:
+                # Keep earlier embeddings only while they still line up one-to-one with the chunks
+                embeddings = entry.get("embeddings")
+            entry.update({
+                "policy_hash": h,
+                "policy_text": policy_text,
+                "rules": rules,
+                "chunks": chunks,
+                "embeddings": embeddings,
+                "chunker": chunker,
+                "updated_at": time.time(),
+            })
+            entries[h] = entry
+            while len(entries) > self.max_entries:
+                entries.pop(next(iter(entries)))
+            # Lookups for other knowledge-base states are stale by definition
+            data["lookups"] = {
+                k: v for k, v in data["lookups"].items()
+                if k.startswith(kb_fingerprint + "|") and v in entries
+            }
+            data["lookups"][self._lookup_key(query, kb_fingerprint)] = h
+            self._save()
+            return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data = {"entries": {}, "lookups": {}}
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict:
+        with self._lock:
+            data = self._load()
+            return {"entries": len(data["entries"]), "lookups": len(data["lookups"]), "hits": self.hits, "misses": self.misses}
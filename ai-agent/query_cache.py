@@ -0,0 +1,100 @@
+"""In-memory LRU cache for knowledge-base searches.
+
+HR users repeat the same policy questions, and every culture scan sends the
+same fixed query. `QueryResultCache` keeps, per normalized query text, the
+query embedding and the search result for one index version:
+
+- a hit with the current index version and within the TTL returns the
+  result without embedding the query or searching the collection;
+- after the index changes, the result is stale but the embedding is
+  still valid (it does not depend on the index), so only the search runs.
+
+Size is bounded by `QUERY_CACHE_MAX_ENTRIES` (least recently used entries
+go first) and entries expire after `QUERY_CACHE_TTL_SECONDS`.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from embedding_cache import normalize_text
+
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "256"))
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "600"))
+
+
+def normalize_query(query: str) -> str:
+    """Queries differing only in case or spacing share an entry."""
+    return normalize_text(query).casefold()
+
+
+class QueryResultCache:
+    """`normalized query -> {embedding, index_version, result}` with LRU eviction and a TTL."""
+
+    def __init__(self, max_entries: int = QUERY_CACHE_MAX_ENTRIES, ttl_seconds: float = QUERY_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, query: str, index_version: str) -> Tuple[Optional[List[float]], Optional[Dict]]:
+        """Return `(embedding, result)`; either is None when not cached or no longer valid."""
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, None
+            if self.ttl_seconds and now - entry["stored_at"] > self.ttl_seconds:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None, None
+            self._entries.move_to_end(key)
+            if entry["index_version"] != index_version:
+                self.stale += 1
+                self.misses += 1
+                return entry["embedding"], None
+            self.hits += 1
+            return entry["embedding"], dict(entry["result"])
+
+    def put(self, query: str, index_version: str, embedding: List[float], result: Dict) -> None:
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = {
+                "embedding": embedding,
+                "index_version": index_version,
+                "result": dict(result),
+                "stored_at": time.time(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
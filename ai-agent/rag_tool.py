@@ -1,6 +1,10 @@
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv # Added import
 
 # Load environment variables from .env file (assuming it's in the same directory as this script)
@@ -12,6 +16,13 @@ from chromadb.utils import embedding_functions
 from google import genai
 from google.genai import types
 
+from chunker import CHUNKER_VERSION, chunk_markdown
+from embedding_cache import embedding_cache
+from kb_indexer import KnowledgeBaseIndexer
+from kb_manifest import IndexManifest, MANIFEST_FILENAME, content_hash
+from policy_cache import KNOWLEDGE_BASE_SUFFIXES, knowledge_base_fingerprint
+from query_cache import QueryResultCache
+
 KNOWLEDGE_BASE_PATH = Path(__file__).resolve().parent.parent / "data" / "knowledge_base"
 CHROMA_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "chroma_db"
 
@@ -19,78 +30,312 @@ CHROMA_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "chroma_db"
 # Ensure GOOGLE_API_KEY is set in environment variables
 client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
 
+# Model 'text-embedding-004' is a good default for retrieval
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-004")
+# Texts per embed_content request
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))
+# Embedding requests in flight at once, across all callers in this process
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+# Retries per request after the first attempt, with exponential backoff
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "3"))
+EMBEDDING_RETRY_BASE_DELAY = float(os.getenv("EMBEDDING_RETRY_BASE_DELAY", "0.5"))
+
+# HTTP status codes that retrying cannot fix
+_NON_RETRYABLE_CODES = {400, 401, 403, 404}
+
+_inflight = threading.BoundedSemaphore(EMBEDDING_MAX_CONCURRENCY)
+
+
+class EmbeddingError(RuntimeError):
+    """Some texts could not be embedded; `failed` holds their indexes in the input."""
+
+    def __init__(self, message: str, failed: List[int]):
+        super().__init__(message)
+        self.failed = failed
+
+
 class GoogleGenAIEmbeddingFunction(embedding_functions.EmbeddingFunction):
-    """Custom embedding function using Google GenAI SDK."""
+    """Custom embedding function using Google GenAI SDK.
+
+    Results are served from the persistent `embedding_cache` when the same
+    text was embedded before with the same model. Uncached texts are sent in
+    batches of `batch_size`, with at most `EMBEDDING_MAX_CONCURRENCY`
+    requests in flight; failed requests are retried with exponential
+    backoff, and texts that still fail raise `EmbeddingError`.
+
+    `client` defaults to the module's GenAI client; tests can pass a stub
+    exposing `models.embed_content(model=..., contents=[...])`.
+    """
+    def __init__(
+        self,
+        client: Any = None,
+        model: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_base_delay: Optional[float] = None,
+    ):
+        self._client = client
+        self.model = model or EMBEDDING_MODEL
+        self.batch_size = max(1, batch_size or EMBEDDING_BATCH_SIZE)
+        self.max_retries = EMBEDDING_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base_delay = EMBEDDING_RETRY_BASE_DELAY if retry_base_delay is None else retry_base_delay
+
     def __call__(self, input: List[str]) -> List[List[float]]:
-        # Embed content using the new SDK
-        # Model 'text-embedding-004' is a good default for retrieval
-        embeddings = []
-        for text in input:
+        return embedding_cache.embed(self.model, input, self._embed_uncached)
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        delay = self.retry_base_delay
+        for attempt in range(self.max_retries + 1):
             try:
-                response = client.models.embed_content(
-                    model="text-embedding-004",
-                    contents=text
-                )
-                embeddings.append(response.embeddings[0].values)
+                with _inflight:
+                    response = (self._client or client).models.embed_content(model=self.model, contents=texts)
+                vectors = [e.values for e in response.embeddings]
+                if len(vectors) != len(texts):
+                    raise EmbeddingError(f"expected {len(texts)} embeddings, got {len(vectors)}", list(range(len(texts))))
+                return vectors
             except Exception as e:
-                print(f"Error embedding text: {e}")
-                # Return a zero vector or handle error appropriately
-                # For simplicity, we might skip or raise, but let's try to be robust
-                embeddings.append([0.0] * 768) # Assuming 768 dim, but this is risky.
-        return embeddings
+                if attempt >= self.max_retries or getattr(e, "code", None) in _NON_RETRYABLE_CODES:
+                    raise
+                print(f"Embedding request failed (attempt {attempt + 1}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay * random.uniform(0.8, 1.2))
+                delay *= 2
+
+    def _try_batch(self, texts: List[str]):
+        try:
+            return self._embed_batch(texts)
+        except Exception as e:
+            return e
+
+    def _embed_uncached(self, input: List[str]) -> List[List[float]]:
+        texts = list(input)
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) <= 1:
+            outcomes = [self._try_batch(b) for b in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(EMBEDDING_MAX_CONCURRENCY, len(batches))) as pool:
+                outcomes = list(pool.map(self._try_batch, batches))
+        results: List[List[float]] = []
+        failed: List[int] = []
+        errors: List[Exception] = []
+        for batch, outcome in zip(batches, outcomes):
+            if isinstance(outcome, Exception):
+                failed.extend(range(len(results), len(results) + len(batch)))
+                errors.append(outcome)
+                outcome = [[] for _ in batch]
+            results.extend(outcome)
+        if failed:
+            raise EmbeddingError(f"{len(failed)} of {len(texts)} texts could not be embedded: {errors[0]}", failed)
+        return results
+
+COLLECTION_NAME = "company_knowledge_base"
+
+# Process-wide Chroma client and collection, opened on first use
+_chroma_client = None
+_collection = None
+_collection_lock = threading.Lock()
+
 
 def _get_collection():
-    """Initialize and return the ChromaDB collection."""
-    chroma_client = chromadb.PersistentClient(path=str(CHROMA_DB_PATH))
+    """Return the process-wide ChromaDB collection, opening the store on first use."""
+    global _chroma_client, _collection
+    collection = _collection
+    if collection is not None:
+        return collection
+    with _collection_lock:
+        if _collection is None:
+            _chroma_client = chromadb.PersistentClient(path=str(CHROMA_DB_PATH))
+            # Use our custom embedding function
+            _collection = _chroma_client.get_or_create_collection(
+                name=COLLECTION_NAME,
+                embedding_function=GoogleGenAIEmbeddingFunction()
+            )
+        return _collection
+
+
+def close_collection() -> None:
+    """Release the Chroma client; the next `_get_collection()` reopens the store."""
+    global _chroma_client, _collection, _indexed_fingerprint
+    with _collection_lock:
+        client_, _chroma_client, _collection = _chroma_client, None, None
+        # The reopened store may differ from what this process indexed
+        _indexed_fingerprint = None
+    if client_ is not None:
+        # Chroma keeps one shared system per path; drop it so files are closed
+        release = getattr(client_, "clear_system_cache", None)
+        if release is not None:
+            release()
+
+
+def reload_collection():
+    """Reopen the store (e.g. after CHROMA_DB_PATH was replaced on disk) and return the new collection."""
+    close_collection()
+    return _get_collection()
+
+
+# Per-file and per-chunk hashes of what the collection holds (see kb_manifest)
+_manifest = IndexManifest(CHROMA_DB_PATH / MANIFEST_FILENAME)
+_index_lock = threading.Lock()
+# Knowledge-base fingerprint as of the last indexing run in this process
+_indexed_fingerprint: Optional[str] = None
+
+
+def _chunk_document(name: str, content: str) -> Dict[str, Dict]:
+    """`{chunk id: {"text", "headings"}}` for one knowledge-base file, ids `f"{name}_{i}"` in order."""
+    return {f"{name}_{i}": chunk for i, chunk in enumerate(chunk_markdown(content))}
 
-    # Use our custom embedding function
-    embedding_fn = GoogleGenAIEmbeddingFunction()
 
-    collection = chroma_client.get_or_create_collection(
-        name="company_knowledge_base",
-        embedding_function=embedding_fn
-    )
-    return collection
+def _seed_manifest(collection) -> None:
+    """Rebuild the manifest's chunk hashes from what the collection holds.
 
-def _index_documents():
-    """Reads documents and indexes them into ChromaDB if not already present."""
+    Used when the manifest is missing or out of sync with the store, so an
+    existing index is reconciled chunk by chunk instead of re-embedded.
+    """
+    _manifest.clear()
+    existing = collection.get(include=["documents", "metadatas"])
+    files: Dict[str, Dict] = {}
+    for cid, doc, meta in zip(existing["ids"], existing["documents"], existing["metadatas"]):
+        source = (meta or {}).get("source") or cid.rsplit("_", 1)[0]
+        entry = files.setdefault(source, {"size": None, "mtime_ns": None, "sha256": None, "chunks": {}})
+        entry["chunks"][cid] = content_hash(doc or "")
+    for name, entry in files.items():
+        _manifest.set(name, entry)
+
+
+def _index_documents(collection=None) -> Dict:
+    """Bring the collection in line with the knowledge-base files; returns counts of what changed.
+
+    Files whose size and mtime match the manifest are not read. For the
+    others, only new or changed chunks are upserted (and so embedded), and
+    chunk ids the file no longer produces are deleted, as are all chunks of
+    removed files.
+    """
+    stats = {"files_indexed": 0, "files_removed": 0, "chunks_upserted": 0, "chunks_deleted": 0}
     if not KNOWLEDGE_BASE_PATH.exists():
-        return
+        return stats
 
-    collection = _get_collection()
+    collection = collection or _get_collection()
+    with _index_lock:
+        if collection.count() != _manifest.chunk_count():
+            _seed_manifest(collection)
+        seen = set()
+        try:
+            for file_path in sorted(KNOWLEDGE_BASE_PATH.glob("*.*")):
+                if file_path.suffix.lower() not in KNOWLEDGE_BASE_SUFFIXES:
+                    continue
+                name = file_path.name
+                seen.add(name)
+                st = file_path.stat()
+                old = _manifest.get(name) or {}
+                # Chunks made with other chunker settings must be rebuilt even if the file is unchanged
+                same_chunker = old.get("chunker") == CHUNKER_VERSION
+                if same_chunker and old.get("size") == st.st_size and old.get("mtime_ns") == st.st_mtime_ns:
+                    continue
+                try:
+                    content = file_path.read_text(encoding='utf-8')
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"Error reading {file_path}: {e}")
+                    continue
+                digest = content_hash(content)
+                old_chunks = old.get("chunks") or {}
+                if same_chunker and digest == old.get("sha256"):
+                    # Touched but unchanged
+                    chunk_hashes = old_chunks
+                else:
+                    docs = _chunk_document(name, content)
+                    chunk_hashes = {cid: content_hash(doc["text"]) for cid, doc in docs.items()}
+                    changed = [cid for cid, h in chunk_hashes.items() if old_chunks.get(cid) != h]
+                    stale = [cid for cid in old_chunks if cid not in chunk_hashes]
+                    if changed:
+                        collection.upsert(
+                            documents=[docs[cid]["text"] for cid in changed],
+                            ids=changed,
+                            metadatas=[{"source": name, "headings": " > ".join(docs[cid]["headings"])} for cid in changed]
+                        )
+                    if stale:
+                        collection.delete(ids=stale)
+                    stats["chunks_upserted"] += len(changed)
+                    stats["chunks_deleted"] += len(stale)
+                _manifest.set(name, {
+                    "size": st.st_size,
+                    "mtime_ns": st.st_mtime_ns,
+                    "sha256": digest,
+                    "chunker": CHUNKER_VERSION,
+                    "chunks": chunk_hashes,
+                })
+                stats["files_indexed"] += 1
 
-    # Simple check: if collection is empty, index everything.
-    # In a real app, we'd check file hashes or modification times.
-    # For now, we always scan files and upsert to ensure new files are added.
-    # if collection.count() > 0:
-    #    pass
+            for name, entry in _manifest.files().items():
+                if name not in seen:
+                    stale = list(entry.get("chunks") or {})
+                    if stale:
+                        collection.delete(ids=stale)
+                    _manifest.remove(name)
+                    stats["files_removed"] += 1
+                    stats["chunks_deleted"] += len(stale)
+        finally:
+            # Keep whatever was indexed before a failure (e.g. EmbeddingError)
+            _manifest.save()
+    return stats
 
-    # Re-reading files
-    docs = []
-    ids = []
-    metadatas = []
 
-    for file_path in KNOWLEDGE_BASE_PATH.glob("*.*"):
-        if file_path.suffix.lower() in ['.txt', '.md']:
-            try:
-                content = file_path.read_text(encoding='utf-8')
-                # Split by double newlines to create chunks
-                chunks = content.split("\n\n")
-                for i, chunk in enumerate(chunks):
-                    if chunk.strip():
-                        docs.append(chunk.strip())
-                        ids.append(f"{file_path.name}_{i}")
-                        metadatas.append({"source": file_path.name})
-            except Exception as e:
-                print(f"Error reading {file_path}: {e}")
-
-    if docs:
-        # Upsert (update or insert)
-        collection.upsert(
-            documents=docs,
-            ids=ids,
-            metadatas=metadatas
-        )
+def _ensure_index(force: bool = False) -> Optional[Dict]:
+    """Index the knowledge base if its files changed since this process last did.
+
+    While they are unchanged this only stats the files, so queries skip
+    indexing entirely. Returns the indexing stats, or None if skipped.
+    """
+    global _indexed_fingerprint
+    fingerprint = knowledge_base_fingerprint(KNOWLEDGE_BASE_PATH)
+    if fingerprint == _indexed_fingerprint and not force:
+        return None
+    stats = _index_documents()
+    _indexed_fingerprint = fingerprint
+    return stats
+
+
+_indexer: Optional[KnowledgeBaseIndexer] = None
+_indexer_lock = threading.Lock()
+
+
+def start_background_indexer() -> Optional[KnowledgeBaseIndexer]:
+    """Start the background knowledge-base indexer once per process; later calls return it.
+
+    Disabled (returns None) when `KB_BACKGROUND_INDEXER` is 0/false/no, in
+    which case queries index on demand as before.
+    """
+    global _indexer
+    if os.getenv("KB_BACKGROUND_INDEXER", "1").lower() in ("0", "false", "no"):
+        return None
+    with _indexer_lock:
+        if _indexer is None or not _indexer.running:
+            _indexer = KnowledgeBaseIndexer(KNOWLEDGE_BASE_PATH, lambda: _ensure_index(force=True)).start()
+        return _indexer
+
+
+def stop_background_indexer() -> None:
+    global _indexer
+    with _indexer_lock:
+        if _indexer is not None:
+            _indexer.stop()
+            _indexer = None
+
+
+def index_status() -> Dict:
+    """Index content version and size, the background indexer's freshness and lag, and query-cache counters."""
+    indexer = _indexer
+    return {
+        "index_version": _manifest.version(),
+        "chunks": _manifest.chunk_count(),
+        "indexer": indexer.status() if indexer is not None else None,
+        "query_cache": query_cache.stats(),
+    }
+
+
+# Results returned per search
+SEARCH_RESULTS = 3
+query_cache = QueryResultCache()
+_query_embedding_fn: Optional[GoogleGenAIEmbeddingFunction] = None
+
 
 def search_company_policies(query: str) -> Dict:
     """Tool: Search company policies, culture, and performance standards using Vector Search.
@@ -103,24 +348,41 @@ def search_company_policies(query: str) -> Dict:
     Args:
         query: The search keywords or question.
     """
-    # Ensure index is up to date (simple approach: run indexer on every query)
-    # In production, this should be an async background task or triggered by file watch.
-    _index_documents()
+    global _query_embedding_fn
+    try:
+        indexer = _indexer
+        if indexer is None or not indexer.running:
+            # No background indexer: index here, only if files changed since the last run
+            _ensure_index()
 
-    collection = _get_collection()
+        # Repeated questions are answered from memory while the index is unchanged
+        version = _manifest.version()
+        embedding, cached = query_cache.get(query, version)
+        if cached is not None:
+            return cached
 
-    results = collection.query(
-        query_texts=[query],
-        n_results=3
-    )
+        collection = _get_collection()
+        if embedding is None:
+            if _query_embedding_fn is None:
+                _query_embedding_fn = GoogleGenAIEmbeddingFunction()
+            embedding = _query_embedding_fn([query])[0]
 
-    if not results['documents'][0]:
-        return {"status": "no_match", "text": "在知識庫中找不到相關資訊。"}
+        results = collection.query(
+            query_embeddings=[embedding],
+            n_results=SEARCH_RESULTS
+        )
+    except EmbeddingError as e:
+        return {"status": "error", "text": f"知識庫向量化失敗，請稍後再試：{e}"}
 
-    formatted_results = []
-    for i, doc in enumerate(results['documents'][0]):
-        source = results['metadatas'][0][i]['source']
-        formatted_results.append(f"來源: {source}\n內容:\n{doc}")
+    if not results['documents'][0]:
+        result = {"status": "no_match", "text": "在知識庫中找不到相關資訊。"}
+    else:
+        formatted_results = []
+        for i, doc in enumerate(results['documents'][0]):
+            source = results['metadatas'][0][i]['source']
+            formatted_results.append(f"來源: {source}\n內容:\n{doc}")
+        result = {"status": "success", "text": "\n\n---\n\n".join(formatted_results)}
 
-    return {"status": "success", "text": "\n\n---\n\n".join(formatted_results)}
+    query_cache.put(query, version, embedding, result)
+    return result
 
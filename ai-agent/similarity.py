@@ -0,0 +1,79 @@
+"""Vectorized cosine similarity against a fixed set of reference vectors.
+
+The culture scan compares every review comment embedding with every policy
+chunk embedding. `SimilarityIndex` L2-normalizes the reference vectors once;
+scoring a batch of queries is then a single matrix product (queries x
+references) instead of a Python dot-product and two norms per pair.
+
+Vectors with the wrong dimension or zero norm (e.g. a failed embedding)
+score 0 against everything, matching the old `_cosine_sim` fallback.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def normalize_rows(vectors: Sequence[Sequence[float]], dim: Optional[int] = None) -> np.ndarray:
+    """Return `vectors` as a float32 matrix with unit-length rows.
+
+    Rows whose length differs from `dim` (default: the first row's length)
+    and zero rows become all-zero rows.
+    """
+    if dim is None:
+        dim = len(vectors[0]) if len(vectors) else 0
+    try:
+        matrix = np.array(vectors, dtype=np.float32)
+    except (TypeError, ValueError):
+        # Ragged input (some rows missing or of the wrong length)
+        matrix = None
+    if matrix is None or matrix.ndim != 2 or matrix.shape[1] != dim:
+        matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+        for i, v in enumerate(vectors):
+            if v is not None and len(v) == dim:
+                matrix[i] = v
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+class SimilarityIndex:
+    """Pre-normalized reference vectors, scored against query batches by cosine similarity."""
+
+    def __init__(self, vectors: Sequence[Sequence[float]]):
+        self.matrix = normalize_rows(vectors)
+        self.dim = self.matrix.shape[1]
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def scores(self, queries: Sequence[Sequence[float]]) -> np.ndarray:
+        """Cosine similarity matrix of shape (len(queries), len(self))."""
+        if not len(queries) or not len(self):
+            return np.zeros((len(queries), len(self)), dtype=np.float32)
+        return normalize_rows(queries, self.dim) @ self.matrix.T
+
+    def best(self, queries: Sequence[Sequence[float]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Per query: index of the most similar reference (first on ties) and its score."""
+        sims = self.scores(queries)
+        if not sims.size:
+            return np.full(len(queries), -1), np.zeros(len(queries), dtype=np.float32)
+        idx = sims.argmax(axis=1)
+        return idx, sims[np.arange(len(idx)), idx]
+
+    def top_k(self, queries: Sequence[Sequence[float]], k: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """Per query: indices and scores of the `k` most similar references, best first."""
+        sims = self.scores(queries)
+        k = min(k, sims.shape[1])
+        if k <= 0:
+            return np.zeros((len(queries), 0), dtype=int), np.zeros((len(queries), 0), dtype=np.float32)
+        part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(sims, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+    def hits(self, queries: Sequence[Sequence[float]], threshold: float) -> List[Tuple[int, int, float]]:
+        """All `(query_idx, reference_idx, score)` pairs with score >= `threshold`."""
+        sims = self.scores(queries)
+        qi, ri = np.nonzero(sims >= threshold)
+        return [(int(q), int(r), float(sims[q, r])) for q, r in zip(qi, ri)]
@@ -0,0 +1,179 @@
+"""Aggregate analytics for the employee database.
+
+Each helper runs one GROUP BY query in SQLite and returns a small list of
+dicts, so questions like "average score by department" do not require
+loading every employee and their reviews into Python.
+
+Grouping is by `department` or `position` (or by nothing, for company-wide
+totals). Queries read through `get_read_connection`, so they use the
+in-memory snapshot when snapshot mode is on.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from data.snapshot import get_read_connection
+
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db"
+
+GROUP_COLUMNS = {"department", "position"}
+
+# strftime formats for hire-date cohorts
+COHORT_PERIODS = {
+    "year": "%Y",
+    "month": "%Y-%m",
+}
+
+
+def _group_expr(group_by: Optional[str], alias: str = "e") -> str:
+    if group_by is None:
+        return "'(all)'"
+    if group_by not in GROUP_COLUMNS:
+        raise ValueError(f"group_by must be one of {sorted(GROUP_COLUMNS)} or None")
+    return f"COALESCE(NULLIF({alias}.{group_by}, ''), '(none)')"
+
+
+def headcount_and_salary(group_by: Optional[str] = "department", db_path: Optional[Path | str] = None) -> List[Dict]:
+    """Headcount and salary min / avg / max per group, largest group first.
+
+    Returns dicts with: group, headcount, salary_count, min_salary, avg_salary, max_salary.
+    """
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    g = _group_expr(group_by)
+    cur = get_read_connection(db_path).execute(
+        f"""
+        SELECT
+            {g} AS "group",
+            COUNT(*) AS headcount,
+            COUNT(e.salary) AS salary_count,
+            MIN(e.salary) AS min_salary,
+            ROUND(AVG(e.salary), 2) AS avg_salary,
+            MAX(e.salary) AS max_salary
+        FROM employee e
+        GROUP BY 1
+        ORDER BY headcount DESC, 1
+        """
+    )
+    return [dict(r) for r in cur.fetchall()]
+
+
+def salary_bands(
+    band_size: float = 10000,
+    group_by: Optional[str] = None,
+    db_path: Optional[Path | str] = None,
+) -> List[Dict]:
+    """Headcount per salary band of width `band_size` (optionally per group).
+
+    Returns dicts with: group, band_start, band_end, headcount. Employees
+    without a salary are not counted.
+    """
+    if band_size <= 0:
+        raise ValueError("band_size must be positive")
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    g = _group_expr(group_by)
+    cur = get_read_connection(db_path).execute(
+        f"""
+        SELECT
+            {g} AS "group",
+            CAST(e.salary / :band AS INTEGER) * :band AS band_start,
+            CAST(e.salary / :band AS INTEGER) * :band + :band AS band_end,
+            COUNT(*) AS headcount
+        FROM employee e
+        WHERE e.salary IS NOT NULL
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        """,
+        {"band": band_size},
+    )
+    return [dict(r) for r in cur.fetchall()]
+
+
+def review_score_distribution(
+    group_by: Optional[str] = "department",
+    bucket_size: int = 10,
+    db_path: Optional[Path | str] = None,
+) -> List[Dict]:
+    """Review score summary and histogram per group.
+
+    Returns dicts with: group, employees_reviewed, review_count, avg_score,
+    min_score, max_score and `buckets`, a `{bucket_start: review_count}` map
+    of scores in `bucket_size`-wide buckets. Best average first.
+    """
+    if bucket_size <= 0:
+        raise ValueError("bucket_size must be positive")
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    g = _group_expr(group_by)
+    conn = get_read_connection(db_path)
+    summary = conn.execute(
+        f"""
+        SELECT
+            {g} AS "group",
+            COUNT(DISTINCT pr.employee_id) AS employees_reviewed,
+            COUNT(*) AS review_count,
+            ROUND(AVG(pr.score), 2) AS avg_score,
+            MIN(pr.score) AS min_score,
+            MAX(pr.score) AS max_score
+        FROM performance_review pr
+        JOIN employee e ON e.id = pr.employee_id
+        GROUP BY 1
+        ORDER BY avg_score DESC, 1
+        """
+    ).fetchall()
+    histogram = conn.execute(
+        f"""
+        SELECT {g} AS "group", CAST(pr.score / :bucket AS INTEGER) * :bucket AS bucket, COUNT(*) AS n
+        FROM performance_review pr
+        JOIN employee e ON e.id = pr.employee_id
+        WHERE pr.score IS NOT NULL
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        """,
+        {"bucket": bucket_size},
+    ).fetchall()
+    buckets: Dict[str, Dict[int, int]] = {}
+    for r in histogram:
+        buckets.setdefault(r["group"], {})[int(r["bucket"])] = r["n"]
+    return [dict(r, buckets=buckets.get(r["group"], {})) for r in summary]
+
+
+def hire_cohorts(
+    period: str = "year",
+    group_by: Optional[str] = None,
+    db_path: Optional[Path | str] = None,
+) -> List[Dict]:
+    """Headcount, average salary and average review score per hire-date cohort.
+
+    Args:
+        period: "year" or "month".
+        group_by: optional "department" / "position" to split each cohort.
+
+    Returns dicts with: cohort, group, headcount, avg_salary, avg_score
+    (mean over employees of each one's average review score).
+    Employees without a hire date are reported under cohort "(unknown)".
+    """
+    if period not in COHORT_PERIODS:
+        raise ValueError(f"period must be one of {sorted(COHORT_PERIODS)}")
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    g = _group_expr(group_by)
+    fmt = COHORT_PERIODS[period]
+    cur = get_read_connection(db_path).execute(
+        f"""
+        WITH scores AS (
+            SELECT employee_id, AVG(score) AS mean_score
+            FROM performance_review
+            GROUP BY employee_id
+        )
+        SELECT
+            COALESCE(strftime('{fmt}', e.hire_date), '(unknown)') AS cohort,
+            {g} AS "group",
+            COUNT(*) AS headcount,
+            ROUND(AVG(e.salary), 2) AS avg_salary,
+            ROUND(AVG(s.mean_score), 2) AS avg_score
+        FROM employee e
+        LEFT JOIN scores s ON s.employee_id = e.id
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        """
+    )
+    return [dict(r) for r in cur.fetchall()]
@@ -0,0 +1,118 @@
+"""Async access to the synchronous `data/*` helpers.
+
+The FastAPI server runs ADK agent turns on a single event loop. A blocking
+`sqlite3` call made directly from a tool stalls every session, including
+`/cancel`. This module runs such calls on a bounded thread pool instead:
+
+- `run_db(func, *args, **kwargs)` awaits `func(*args, **kwargs)` on a worker.
+- `db_tool(func)` wraps a synchronous agent tool as an async function with
+  the same name, docstring and signature, so ADK awaits it off the loop.
+
+The pool size (`DB_MAX_WORKERS`, default 4) bounds how many queries run at
+once; callers beyond that queue without blocking the loop. Each worker
+thread keeps its own pooled connection (see `data.connection`).
+
+Network-bound tools (e.g. the knowledge-base search, which calls the
+embedding API) use `run_io` / `io_tool` instead. They run on a separate pool
+(`IO_MAX_WORKERS`, default 8) so a slow remote call never holds a DB worker
+and queues the SQLite queries behind it.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+
+DEFAULT_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "4"))
+DEFAULT_IO_MAX_WORKERS = int(os.getenv("IO_MAX_WORKERS", "8"))
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_io_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Return the shared DB thread pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="db")
+        return _executor
+
+
+def shutdown_db_executor(wait: bool = True) -> None:
+    """Shut down the DB thread pool (e.g. on server shutdown). A later call to `run_db` starts a new one."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Return the shared thread pool for network-bound calls, creating it on first use."""
+    global _io_executor
+    with _executor_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(max_workers=DEFAULT_IO_MAX_WORKERS, thread_name_prefix="io")
+        return _io_executor
+
+
+def shutdown_io_executor(wait: bool = True) -> None:
+    """Shut down the network I/O thread pool. A later call to `run_io` starts a new one."""
+    global _io_executor
+    with _executor_lock:
+        executor, _io_executor = _io_executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+async def _run_on(executor: ThreadPoolExecutor, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(executor, call)
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking data-access call on the DB thread pool and await its result.
+
+    Cancelling the awaiting task returns control to the loop immediately; a
+    query already running on a worker finishes in the background.
+    """
+    return await _run_on(get_db_executor(), func, *args, **kwargs)
+
+
+async def run_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Like `run_db`, but on the network I/O pool (remote APIs rather than SQLite)."""
+    return await _run_on(get_io_executor(), func, *args, **kwargs)
+
+
+def db_tool(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """Wrap a synchronous agent tool so it runs on the DB thread pool.
+
+    `functools.wraps` keeps the name, docstring and (via `__wrapped__`) the
+    signature, which ADK uses to build the tool declaration.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await run_db(func, *args, **kwargs)
+
+    return wrapper
+
+
+def io_tool(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """Wrap a synchronous, network-bound agent tool so it runs on the I/O pool."""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await run_io(func, *args, **kwargs)
+
+    return wrapper
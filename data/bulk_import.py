@@ -0,0 +1,392 @@
+"""Bulk CSV / JSONL import for employees and performance reviews.
+
+Files are streamed record by record, validated, and written with
+`executemany` in chunked transactions (one commit per chunk). Employees are
+upserted on `email`, so re-running an import updates rows instead of failing;
+optional fields that are blank or absent keep their stored values.
+
+Employee records:
+    first_name, last_name, email (required)
+    department, position, salary, hire_date (YYYY-MM-DD),
+    supervisor_id or supervisor_email (optional)
+
+Supervisors given by email are resolved after all rows are written, so a
+report may appear in the file before their manager.
+
+Review records:
+    employee_id or employee_email, reviewer_employee_id or reviewer_email,
+    score (0-100), comments (required); created_at (optional)
+
+Usage:
+    python -m data.bulk_import employees new_hires.csv
+    python -m data.bulk_import reviews reviews_2025.jsonl --chunk-size 5000
+"""
+
+import argparse
+import csv
+import json
+import math
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from data.connection import get_connection, transaction
+from data.employee_cache import invalidate_all_employees
+
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db"
+DEFAULT_CHUNK_SIZE = 1000
+
+_EMPLOYEE_UPSERT = """
+INSERT INTO employee (first_name, last_name, email, department, position, salary, hire_date, supervisor_id)
+VALUES (?,?,?,?,?,?,?,?)
+ON CONFLICT(email) DO UPDATE SET
+    first_name = excluded.first_name,
+    last_name = excluded.last_name,
+    -- Optional columns left blank in the file keep their stored value, so a
+    -- partial re-import (e.g. only email and salary) does not erase them
+    department = COALESCE(excluded.department, employee.department),
+    position = COALESCE(excluded.position, employee.position),
+    salary = COALESCE(excluded.salary, employee.salary),
+    hire_date = COALESCE(excluded.hire_date, employee.hire_date),
+    supervisor_id = COALESCE(excluded.supervisor_id, employee.supervisor_id)
+"""
+
+_REVIEW_INSERT = (
+    "INSERT INTO performance_review (employee_id, reviewer_employee_id, score, comments, created_at) VALUES (?,?,?,?,?)"
+)
+
+ChunkCallback = Callable[[Dict[str, Any]], None]
+
+
+def iter_records(path: Path | str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield `(line_number, record)` pairs from a CSV or JSONL file.
+
+    Raises:
+        ValueError: if the file extension is not .csv, .jsonl or .ndjson.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with path.open(encoding="utf-8-sig", newline="") as fh:
+            # line 1 is the header row
+            for line_no, row in enumerate(csv.DictReader(fh), start=2):
+                yield line_no, row
+    elif suffix in (".jsonl", ".ndjson"):
+        with path.open(encoding="utf-8") as fh:
+            for line_no, line in enumerate(fh, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, {"__error__": f"invalid JSON: {e}"}
+                    continue
+                yield line_no, record if isinstance(record, dict) else {"__error__": "record is not an object"}
+    else:
+        raise ValueError(f"Unsupported import file type: {path.suffix} (expected .csv or .jsonl)")
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    s = str(value).strip()
+    return s or None
+
+
+def _int_or_none(value: Any, field: str) -> Optional[int]:
+    s = _text(value)
+    if s is None:
+        return None
+    try:
+        return int(float(s))
+    except (ValueError, OverflowError):
+        # OverflowError: "inf" / "1e400" parse as float but not as int
+        raise ValueError(f"{field} must be an integer")
+
+
+def _validate_employee(record: Dict[str, Any]) -> Tuple[Tuple, Optional[str]]:
+    """Return (row params, supervisor_email) or raise ValueError."""
+    if "__error__" in record:
+        raise ValueError(record["__error__"])
+    first_name = _text(record.get("first_name"))
+    last_name = _text(record.get("last_name"))
+    email = _text(record.get("email"))
+    missing = [k for k, v in (("first_name", first_name), ("last_name", last_name), ("email", email)) if v is None]
+    if missing:
+        raise ValueError(f"missing required field(s): {', '.join(missing)}")
+    if "@" not in email:
+        raise ValueError(f"invalid email: {email}")
+
+    salary = _text(record.get("salary"))
+    if salary is not None:
+        try:
+            salary = float(salary)
+        except (ValueError, OverflowError):
+            raise ValueError("salary must be a number")
+        if not math.isfinite(salary):
+            raise ValueError("salary must be a finite number")
+    hire_date = _text(record.get("hire_date"))
+    if hire_date is not None:
+        try:
+            datetime.strptime(hire_date, "%Y-%m-%d")
+        except ValueError:
+            raise ValueError("hire_date must be YYYY-MM-DD")
+
+    supervisor_id = _int_or_none(record.get("supervisor_id"), "supervisor_id")
+    supervisor_email = _text(record.get("supervisor_email"))
+    row = (
+        first_name,
+        last_name,
+        email,
+        _text(record.get("department")),
+        _text(record.get("position")),
+        salary,
+        hire_date,
+        supervisor_id,
+    )
+    return row, supervisor_email
+
+
+def _chunked(records: Iterable, size: int) -> Iterator[List]:
+    chunk: List = []
+    for item in records:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _write_chunk(db_path: Path, sql: str, rows: Sequence[Tuple[int, Tuple]], errors: List[Dict]) -> int:
+    """Write one chunk in a single transaction; returns rows written.
+
+    If the batch hits a constraint error, the chunk is retried row by row
+    (still in one transaction) so only the offending rows are rejected.
+    """
+    try:
+        with transaction(db_path) as conn:
+            conn.executemany(sql, [params for _, params in rows])
+        return len(rows)
+    except sqlite3.IntegrityError:
+        pass
+    written = 0
+    with transaction(db_path) as conn:
+        for line_no, params in rows:
+            try:
+                conn.execute(sql, params)
+                written += 1
+            except sqlite3.IntegrityError as e:
+                errors.append({"line": line_no, "error": str(e)})
+    return written
+
+
+def _report_chunk(report: Dict, index: int, rows: int, started: float, on_chunk: Optional[ChunkCallback]) -> None:
+    seconds = time.perf_counter() - started
+    stats = {
+        "chunk": index,
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(rows / seconds, 1) if seconds > 0 else None,
+    }
+    report["chunks"].append(stats)
+    if on_chunk is not None:
+        on_chunk(stats)
+
+
+def _count(db_path: Path, table: str) -> int:
+    return get_connection(db_path).execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def import_employees(
+    path: Path | str,
+    db_path: Optional[Path | str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_chunk: Optional[ChunkCallback] = None,
+) -> Dict[str, Any]:
+    """Stream employees from a CSV/JSONL file into the `employee` table.
+
+    See `import_employee_records` for the report format.
+    """
+    return import_employee_records(iter_records(path), db_path=db_path, chunk_size=chunk_size, on_chunk=on_chunk)
+
+
+def import_employee_records(
+    records: Iterable[Tuple[int, Dict[str, Any]]],
+    db_path: Optional[Path | str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_chunk: Optional[ChunkCallback] = None,
+) -> Dict[str, Any]:
+    """Validate and upsert employee records in chunked transactions.
+
+    Args:
+        records: `(line_number, record)` pairs, e.g. from `iter_records`.
+        db_path: optional DB path.
+        chunk_size: rows per transaction.
+        on_chunk: optional callback receiving each chunk's throughput stats.
+
+    Returns:
+        Report dict with `inserted`, `updated`, `rejected` (rows not written),
+        `errors` (line + message, including unresolved supervisors), per-chunk
+        `chunks` stats and overall `rows_per_sec`.
+    """
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    report: Dict[str, Any] = {"inserted": 0, "updated": 0, "rejected": 0, "errors": [], "chunks": []}
+    errors: List[Dict] = report["errors"]
+    pending_supervisors: List[Tuple[int, str, str]] = []  # (line, email, supervisor_email)
+
+    def valid_rows() -> Iterator[Tuple[int, Tuple]]:
+        for line_no, record in records:
+            try:
+                row, supervisor_email = _validate_employee(record)
+            except ValueError as e:
+                errors.append({"line": line_no, "error": str(e)})
+                continue
+            if supervisor_email and row[7] is None:
+                pending_supervisors.append((line_no, row[2], supervisor_email))
+            yield line_no, row
+
+    before = _count(db_path, "employee")
+    total_started = time.perf_counter()
+    written = 0
+    for index, chunk in enumerate(_chunked(valid_rows(), chunk_size), start=1):
+        started = time.perf_counter()
+        n = _write_chunk(db_path, _EMPLOYEE_UPSERT, chunk, errors)
+        written += n
+        _report_chunk(report, index, n, started, on_chunk)
+
+    # Rows that were not written; supervisor problems below leave the row in place.
+    report["rejected"] = len({e["line"] for e in errors})
+
+    # Second pass: resolve supervisor emails now that every row exists.
+    for chunk in _chunked(pending_supervisors, chunk_size):
+        with transaction(db_path) as conn:
+            for line_no, email, supervisor_email in chunk:
+                row = conn.execute("SELECT id FROM employee WHERE email = ?", (supervisor_email,)).fetchone()
+                if row is None:
+                    errors.append({"line": line_no, "error": f"supervisor not found: {supervisor_email}"})
+                    continue
+                try:
+                    conn.execute("UPDATE employee SET supervisor_id = ? WHERE email = ?", (row[0], email))
+                except sqlite3.IntegrityError as e:
+                    # e.g. the supervisor loop check from the hierarchy index
+                    errors.append({"line": line_no, "error": str(e)})
+
+    # Upserts may have changed any cached row
+    invalidate_all_employees(db_path)
+
+    elapsed = time.perf_counter() - total_started
+    inserted = _count(db_path, "employee") - before
+    report["inserted"] = inserted
+    report["updated"] = written - inserted
+    report["seconds"] = round(elapsed, 4)
+    report["rows_per_sec"] = round(written / elapsed, 1) if elapsed > 0 else None
+    return report
+
+
+def _resolve_employee_id(conn: sqlite3.Connection, cache: Dict[str, Optional[int]], record: Dict, id_key: str, email_key: str) -> int:
+    emp_id = _int_or_none(record.get(id_key), id_key)
+    if emp_id is not None:
+        return emp_id
+    email = _text(record.get(email_key))
+    if email is None:
+        raise ValueError(f"missing {id_key} or {email_key}")
+    if email not in cache:
+        row = conn.execute("SELECT id FROM employee WHERE email = ?", (email,)).fetchone()
+        cache[email] = row[0] if row else None
+    if cache[email] is None:
+        raise ValueError(f"employee not found: {email}")
+    return cache[email]
+
+
+def import_performance_reviews(
+    path: Path | str,
+    db_path: Optional[Path | str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_chunk: Optional[ChunkCallback] = None,
+) -> Dict[str, Any]:
+    """Stream performance reviews from a CSV/JSONL file into `performance_review`.
+
+    See `import_review_records` for the report format.
+    """
+    return import_review_records(iter_records(path), db_path=db_path, chunk_size=chunk_size, on_chunk=on_chunk)
+
+
+def import_review_records(
+    records: Iterable[Tuple[int, Dict[str, Any]]],
+    db_path: Optional[Path | str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_chunk: Optional[ChunkCallback] = None,
+) -> Dict[str, Any]:
+    """Validate and insert review records in chunked transactions.
+
+    Employees and reviewers may be given by id or email. Returns a report dict
+    shaped like `import_employee_records` (with `inserted` and no `updated`).
+    """
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    report: Dict[str, Any] = {"inserted": 0, "rejected": 0, "errors": [], "chunks": []}
+    errors: List[Dict] = report["errors"]
+    conn = get_connection(db_path)
+    email_cache: Dict[str, Optional[int]] = {}
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def valid_rows() -> Iterator[Tuple[int, Tuple]]:
+        for line_no, record in records:
+            try:
+                if "__error__" in record:
+                    raise ValueError(record["__error__"])
+                employee_id = _resolve_employee_id(conn, email_cache, record, "employee_id", "employee_email")
+                reviewer_id = _resolve_employee_id(conn, email_cache, record, "reviewer_employee_id", "reviewer_email")
+                score = _int_or_none(record.get("score"), "score")
+                if score is None or score < 0 or score > 100:
+                    raise ValueError("score must be an integer between 0 and 100")
+                comments = _text(record.get("comments"))
+                if comments is None:
+                    raise ValueError("missing required field(s): comments")
+            except ValueError as e:
+                errors.append({"line": line_no, "error": str(e)})
+                continue
+            yield line_no, (employee_id, reviewer_id, score, comments, _text(record.get("created_at")) or now)
+
+    total_started = time.perf_counter()
+    written = 0
+    for index, chunk in enumerate(_chunked(valid_rows(), chunk_size), start=1):
+        started = time.perf_counter()
+        n = _write_chunk(db_path, _REVIEW_INSERT, chunk, errors)
+        written += n
+        _report_chunk(report, index, n, started, on_chunk)
+
+    elapsed = time.perf_counter() - total_started
+    report["inserted"] = written
+    report["rejected"] = len({e["line"] for e in errors})
+    report["seconds"] = round(elapsed, 4)
+    report["rows_per_sec"] = round(written / elapsed, 1) if elapsed > 0 else None
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import employees or performance reviews from CSV/JSONL")
+    parser.add_argument("kind", choices=["employees", "reviews"], help="What the file contains")
+    parser.add_argument("path", help="CSV or JSONL file to import")
+    parser.add_argument("--db", help="SQLite DB path (defaults to data/employee.db)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per transaction")
+    args = parser.parse_args()
+
+    def progress(stats: Dict[str, Any]) -> None:
+        print(f"chunk {stats['chunk']}: {stats['rows']} rows in {stats['seconds']}s ({stats['rows_per_sec']} rows/s)")
+
+    importer = import_employees if args.kind == "employees" else import_performance_reviews
+    report = importer(args.path, db_path=args.db, chunk_size=args.chunk_size, on_chunk=progress)
+    summary = {k: v for k, v in report.items() if k not in ("chunks", "errors")}
+    print(json.dumps(summary, ensure_ascii=False))
+    for err in report["errors"][:20]:
+        print(f"  line {err['line']}: {err['error']}")
+    if len(report["errors"]) > 20:
+        print(f"  ... {len(report['errors']) - 20} more errors")
+
+
+if __name__ == "__main__":
+    main()
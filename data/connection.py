@@ -0,0 +1,163 @@
+"""Shared SQLite connection manager for the `data` package.
+
+Every helper in this package used to open and close its own connection per
+call. This module keeps one pooled connection per (thread, database file)
+instead, opened once with WAL journaling and tuned pragmas, so repeated
+helper calls reuse it.
+
+Usage:
+
+    from data.connection import get_connection, transaction
+
+    conn = get_connection(db_path)          # reads
+    with transaction(db_path) as conn:      # writes (nested calls join the outer transaction)
+        conn.execute("UPDATE employee SET salary=? WHERE id=?", (90000, 1))
+
+Because connections are per thread, helpers called inside an outer
+`transaction(db_path)` block on the same thread share that transaction and
+only the outermost block commits.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db"
+
+# Pragmas applied once when a pooled connection is opened.
+# WAL lets readers run alongside a writer; synchronous=NORMAL is durable in
+# WAL mode and avoids an fsync on every commit.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA mmap_size = 134217728",
+)
+BUSY_TIMEOUT_SECONDS = 5.0
+
+_local = threading.local()
+# All pooled connections across threads, so `close_all_connections` can reach them.
+_all_connections: List[sqlite3.Connection] = []
+_all_lock = threading.Lock()
+# Bumped by `close_all_connections` so other threads drop their closed connections.
+_generation = 0
+
+
+def _resolve(db_path: Optional[Path | str]) -> str:
+    path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    return str(path.resolve()) if str(path) != ":memory:" else ":memory:"
+
+
+def _thread_pool() -> Dict[str, sqlite3.Connection]:
+    pool = getattr(_local, "pool", None)
+    if pool is None or _local.generation != _generation:
+        pool = {}
+        _local.pool = pool
+        _local.depth = {}
+        _local.generation = _generation
+    return pool
+
+
+def _open(key: str) -> sqlite3.Connection:
+    # isolation_level=None: we issue BEGIN/COMMIT ourselves in `transaction`.
+    # check_same_thread=False only so `close_all_connections` can close
+    # connections owned by other threads; each connection is used by one thread.
+    conn = sqlite3.connect(key, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for pragma in CONNECTION_PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except sqlite3.DatabaseError:
+            # e.g. journal_mode cannot change on a read-only file; keep going
+            pass
+    return conn
+
+
+def get_connection(db_path: Optional[Path | str] = None) -> sqlite3.Connection:
+    """Return this thread's pooled connection to `db_path`, opening it on first use.
+
+    The connection uses `sqlite3.Row` rows and autocommit mode; wrap writes in
+    `transaction(db_path)`. Callers must not close it.
+    """
+    key = _resolve(db_path)
+    pool = _thread_pool()
+    conn = pool.get(key)
+    if conn is None:
+        conn = _open(key)
+        pool[key] = conn
+        with _all_lock:
+            _all_connections.append(conn)
+    return conn
+
+
+@contextmanager
+def transaction(db_path: Optional[Path | str] = None) -> Iterator[sqlite3.Connection]:
+    """Run a block in one transaction on this thread's pooled connection.
+
+    Nested `transaction` blocks for the same DB on the same thread join the
+    outermost one; only the outermost block commits (or rolls back on error).
+    """
+    key = _resolve(db_path)
+    conn = get_connection(key)
+    depth = _local.depth
+    level = depth.get(key, 0)
+    if level == 0:
+        conn.execute("BEGIN IMMEDIATE")
+    depth[key] = level + 1
+    try:
+        yield conn
+    except BaseException:
+        depth[key] = level
+        if level == 0 and conn.in_transaction:
+            conn.rollback()
+        raise
+    else:
+        depth[key] = level
+        if level == 0 and conn.in_transaction:
+            conn.commit()
+
+
+def in_transaction(db_path: Optional[Path | str] = None) -> bool:
+    """Return True if this thread is inside a `transaction` block for `db_path`."""
+    depth = getattr(_local, "depth", None) or {}
+    return depth.get(_resolve(db_path), 0) > 0
+
+
+def is_missing_table(error: sqlite3.OperationalError) -> bool:
+    """True if `error` means an optional table (or the module behind it) is absent.
+
+    Optional indexes fall back to a slower query in that case; locks, I/O
+    errors and bad SQL must propagate instead of being masked by the fallback.
+    """
+    message = str(error)
+    return message.startswith(("no such table", "no such module", "no such tokenizer"))
+
+
+def close_connection(db_path: Optional[Path | str] = None) -> None:
+    """Close this thread's pooled connection to `db_path`, if open."""
+    key = _resolve(db_path)
+    conn = _thread_pool().pop(key, None)
+    _local.depth.pop(key, None)
+    if conn is not None:
+        with _all_lock:
+            if conn in _all_connections:
+                _all_connections.remove(conn)
+        conn.close()
+
+
+def close_all_connections() -> None:
+    """Close every pooled connection on every thread (e.g. at shutdown or in tests)."""
+    global _generation
+    with _all_lock:
+        conns = list(_all_connections)
+        _all_connections.clear()
+        _generation += 1
+    for conn in conns:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
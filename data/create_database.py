@@ -2,7 +2,8 @@
 
 This module provides a function `create_database(db_path)` that ensures the
 SQLite database and the `employee` table exist. It does NOT perform seeding on
-import; seeding is provided by `insert_data.py`.
+import; seeding is provided by `insert_data.py`. Later schema changes (indexes,
+columns added to older DBs) are versioned in `migrations.py`.
 """
 
 import sqlite3
@@ -45,12 +46,6 @@ def create_database_employee(db_path: Optional[Path | str] = None) -> Path:
         cur = conn.cursor()
         cur.executescript(schema)
         conn.commit()
-        # Ensure supervisor_id column exists for older DBs created without it
-        cur.execute("PRAGMA table_info(employee)")
-        cols = [r[1] for r in cur.fetchall()]
-        if 'supervisor_id' not in cols:
-            cur.execute("ALTER TABLE employee ADD COLUMN supervisor_id INTEGER")
-            conn.commit()
     finally:
         conn.close()
 
@@ -79,7 +74,7 @@ def create_performance_table(db_path: Optional[Path | str] = None) -> Path:
         FOREIGN KEY(reviewer_employee_id) REFERENCES employee(id) ON DELETE SET NULL
     );
 
-    CREATE INDEX IF NOT EXISTS idx_performance_employee ON performance_review(employee_id);
+    CREATE INDEX IF NOT EXISTS idx_performance_employee_created ON performance_review(employee_id, created_at DESC);
     CREATE INDEX IF NOT EXISTS idx_performance_reviewer ON performance_review(reviewer_employee_id);
     """
 
@@ -101,4 +96,8 @@ if __name__ == "__main__":
     p = create_database_employee()
     print(f"Database initialized at: {p}")
     p2 = create_performance_table(p)
-    print(f"Performance table ensured in DB: {p2}")
\ No newline at end of file
+    print(f"Performance table ensured in DB: {p2}")
+    # Indexes, hierarchy and search tables (run as `python -m data.create_database`)
+    from data.migrations import migrate
+    v = migrate(p)
+    print(f"Schema migrated to version {v}")
\ No newline at end of file
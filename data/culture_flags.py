@@ -0,0 +1,222 @@
+"""Persisted culture-scan results for incremental scans.
+
+`culture_flag` holds one row per (review, matched culture dimension) found
+by the culture scan. `culture_scan_state` is a single-row watermark: the
+highest review id processed and the version of the rules / policy it was
+processed with. A scan only needs to look at reviews above the watermark,
+unless the rules version changed, in which case it starts over from 0.
+
+Triggers keep the flags honest when history changes:
+
+- deleting a review deletes its flags;
+- editing a review's comments or employee deletes its flags and lowers the
+  watermark below it, so the next scan re-evaluates it (and everything
+  after it; `save_culture_flags` clears flags above the resume point first).
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from data.connection import get_connection, is_missing_table, transaction
+from data.snapshot import get_read_connection
+
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db"
+
+CULTURE_FLAG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS culture_flag (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    review_id INTEGER NOT NULL,
+    employee_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    description TEXT,
+    highlight TEXT,
+    similarity REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_culture_flag_employee ON culture_flag(employee_id);
+CREATE INDEX IF NOT EXISTS idx_culture_flag_review ON culture_flag(review_id);
+-- A review is flagged at most once per kind and dimension, even if two scans overlap
+CREATE UNIQUE INDEX IF NOT EXISTS idx_culture_flag_unique ON culture_flag(review_id, kind, dimension);
+
+CREATE TABLE IF NOT EXISTS culture_scan_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    last_review_id INTEGER NOT NULL,
+    rules_version TEXT NOT NULL,
+    updated_at TEXT DEFAULT (datetime('now'))
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_culture_flag_review_delete
+AFTER DELETE ON performance_review
+BEGIN
+    DELETE FROM culture_flag WHERE review_id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_culture_flag_review_update
+AFTER UPDATE OF comments, employee_id ON performance_review
+BEGIN
+    DELETE FROM culture_flag WHERE review_id = OLD.id;
+    UPDATE culture_scan_state SET last_review_id = MIN(last_review_id, OLD.id - 1);
+END;
+"""
+
+# Run before creating `idx_culture_flag_unique` on a DB where overlapping scans
+# already stored duplicate flags; keeps the first row of each group.
+CULTURE_FLAG_DEDUPE_SQL = """
+DELETE FROM culture_flag WHERE id NOT IN (
+    SELECT MIN(id) FROM culture_flag GROUP BY review_id, kind, dimension
+);
+"""
+
+_FLAG_COLUMNS = ("review_id", "employee_id", "kind", "dimension", "description", "highlight", "similarity")
+
+
+def create_culture_flag_tables(db_path: Optional[Path | str] = None) -> Path:
+    """Ensure the `culture_flag` / `culture_scan_state` tables and triggers exist."""
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    conn = get_connection(db_path)
+    try:
+        conn.executescript(CULTURE_FLAG_SCHEMA)
+    except sqlite3.IntegrityError:
+        # Duplicates from before the unique index existed
+        conn.executescript(CULTURE_FLAG_DEDUPE_SQL + CULTURE_FLAG_SCHEMA)
+    return db_path
+
+
+def get_culture_scan_state(db_path: Optional[Path | str] = None) -> Optional[Dict]:
+    """Return `{last_review_id, rules_version, updated_at}`, or None if no scan has run."""
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    try:
+        row = get_connection(db_path).execute(
+            "SELECT last_review_id, rules_version, updated_at FROM culture_scan_state WHERE id = 1"
+        ).fetchone()
+    except sqlite3.OperationalError as e:
+        if not is_missing_table(e):
+            raise
+        return None
+    return dict(row) if row else None
+
+
+def has_culture_flags_after(review_id: int, db_path: Optional[Path | str] = None) -> bool:
+    """True if flags exist for reviews above `review_id` (left behind by an edit that lowered the watermark)."""
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    row = get_connection(db_path).execute(
+        "SELECT 1 FROM culture_flag WHERE review_id > ? LIMIT 1", (int(review_id),)
+    ).fetchone()
+    return row is not None
+
+
+def iter_reviews_after(
+    after_id: int,
+    db_path: Optional[Path | str] = None,
+    page_size: int = 1000,
+) -> Iterator[Dict]:
+    """Yield reviews with `id > after_id` in id order (keyset-paginated), with their employee_id."""
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    conn = get_read_connection(db_path)
+    last_id = int(after_id)
+    while True:
+        page = conn.execute(
+            """
+            SELECT id, employee_id, score, comments, created_at
+            FROM performance_review
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+            """,
+            (last_id, page_size),
+        ).fetchall()
+        for r in page:
+            yield dict(r)
+        if len(page) < page_size:
+            return
+        last_id = page[-1]["id"]
+
+
+def save_culture_flags(
+    flags: Iterable[Dict],
+    last_review_id: int,
+    rules_version: str,
+    db_path: Optional[Path | str] = None,
+    resume_from: Optional[int] = None,
+) -> int:
+    """Store flags for a batch of processed reviews and advance the watermark, atomically.
+
+    Args:
+        flags: dicts with review_id, employee_id, kind, dimension, description,
+               highlight and optional similarity.
+        last_review_id: highest review id covered by this batch.
+        rules_version: version of the rules / policy the batch was scanned with.
+        resume_from: if given, flags for reviews above this id are deleted
+                     first (start of a scan that resumes or restarts there).
+
+    Returns:
+        Number of flag rows written (flags already stored are skipped).
+    """
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    rows = [tuple(f.get(c) for c in _FLAG_COLUMNS) for f in flags]
+    written = 0
+    with transaction(db_path) as conn:
+        if resume_from is not None:
+            conn.execute("DELETE FROM culture_flag WHERE review_id > ?", (int(resume_from),))
+        if rows:
+            written = conn.executemany(
+                f"INSERT OR IGNORE INTO culture_flag ({', '.join(_FLAG_COLUMNS)}) VALUES ({', '.join('?' * len(_FLAG_COLUMNS))})",
+                rows,
+            ).rowcount
+        conn.execute(
+            """
+            INSERT INTO culture_scan_state (id, last_review_id, rules_version, updated_at)
+            VALUES (1, ?, ?, datetime('now'))
+            ON CONFLICT(id) DO UPDATE SET
+                last_review_id = excluded.last_review_id,
+                rules_version = excluded.rules_version,
+                updated_at = excluded.updated_at
+            """,
+            (int(last_review_id), rules_version),
+        )
+    return written
+
+
+def query_culture_flags(db_path: Optional[Path | str] = None) -> List[Dict]:
+    """Return every flag with its review and employee, grouped as `[{employee, reasons}]`.
+
+    Employees are ordered by id; each one's reasons by review date (newest
+    first), then in the order they were found. Flags of deleted employees
+    are skipped.
+    """
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    try:
+        cur = get_connection(db_path).execute(
+            """
+            SELECT
+                f.employee_id, f.kind, f.dimension, f.description, f.highlight, f.similarity,
+                pr.id AS review_id, pr.comments, pr.score, pr.created_at
+            FROM culture_flag f
+            JOIN performance_review pr ON pr.id = f.review_id
+            WHERE EXISTS (SELECT 1 FROM employee e WHERE e.id = f.employee_id)
+            ORDER BY f.employee_id, pr.created_at DESC, f.id
+            """
+        )
+        rows = cur.fetchall()
+    except sqlite3.OperationalError as e:
+        if not is_missing_table(e):
+            raise
+        return []
+    grouped: Dict[int, List[Dict]] = {}
+    for r in rows:
+        reason = {
+            "dimension": r["dimension"],
+            "description": r["description"],
+            "evidence": r["comments"] or "",
+            "highlight": r["highlight"],
+            "score": r["score"],
+            "date": r["created_at"],
+            "review_id": r["review_id"],
+        }
+        if r["kind"] == "semantic":
+            reason["similarity"] = r["similarity"]
+        grouped.setdefault(r["employee_id"], []).append(reason)
+    return [{"employee_id": emp_id, "reasons": reasons} for emp_id, reasons in grouped.items()]
@@ -1,12 +1,15 @@
 """Delete utilities for the employee database (by id).
 
-Contains `delete_employee_by_id` which deletes a row by primary key id.
+Contains `delete_employee_by_id` which deletes a row by primary key id, and
+`delete_employees_by_id` which deletes many ids in one transaction.
 """
 
 import sqlite3
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict, Iterable
 
+from data.connection import transaction
+from data.employee_cache import invalidate_employees
 from data.query_data import query_employees
 
 
@@ -16,14 +19,28 @@ DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db
 def delete_employee_by_id(emp_id: int, db_path: Optional[Path | str] = None) -> int:
     """Delete an employee row by id. Returns number of rows deleted (0 or 1)."""
     db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
-    conn = sqlite3.connect(db_path)
-    try:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM employee WHERE id=?", (emp_id,))
-        conn.commit()
-        return cur.rowcount
-    finally:
-        conn.close()
+    with transaction(db_path) as conn:
+        cur = conn.execute("DELETE FROM employee WHERE id=?", (emp_id,))
+    invalidate_employees([emp_id], db_path)
+    return cur.rowcount
+
+
+def delete_employees_by_id(emp_ids: Iterable[int], db_path: Optional[Path | str] = None) -> Dict[int, int]:
+    """Delete many employees in a single transaction. Returns {emp_id: rows deleted (0 or 1)}.
+
+    Either every delete is applied or, if any statement fails, none are.
+    """
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    results: Dict[int, int] = {}
+    with transaction(db_path) as conn:
+        for emp_id in emp_ids:
+            try:
+                cur = conn.execute("DELETE FROM employee WHERE id=?", (int(emp_id),))
+            except sqlite3.Error as e:
+                raise type(e)(f"employee id={emp_id}: {e}") from e
+            results[int(emp_id)] = cur.rowcount
+    invalidate_employees(results.keys(), db_path)
+    return results
 
 
 if __name__ == "__main__":
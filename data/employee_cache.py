@@ -0,0 +1,230 @@
+"""In-process LRU cache of employee rows, keyed by id and by email.
+
+Agent tools resolve the same few employees many times per turn; this cache
+serves those lookups from memory. It is bounded (`EMPLOYEE_CACHE_SIZE`,
+default 1024 rows) and records hit / miss counts via `stats()` so it can be
+sized.
+
+Coherence:
+- Write helpers in `insert_data`, `update_data`, `delete_data` and
+  `bulk_import` call `invalidate` / `invalidate_all` after committing, so
+  writes made through them are visible to the next lookup.
+- Writes from other processes (or raw SQL) are detected with SQLite's
+  `PRAGMA data_version` on a dedicated connection per DB. It is checked at
+  most once per `EMPLOYEE_CACHE_CHECK_SECONDS` (default 0.5), which bounds
+  how long such a write can go unseen while keeping the hit path to a dict
+  lookup.
+- Each DB has a generation number, bumped by every invalidation. A reader
+  that missed passes the generation it saw before its SELECT to `put`; if a
+  write invalidated the DB in between, the possibly stale row is not stored.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from data.connection import BUSY_TIMEOUT_SECONDS, get_connection
+
+
+DEFAULT_MAXSIZE = int(os.getenv("EMPLOYEE_CACHE_SIZE", "1024"))
+DEFAULT_CHECK_SECONDS = float(os.getenv("EMPLOYEE_CACHE_CHECK_SECONDS", "0.5"))
+
+
+class EmployeeCache:
+    """Bounded LRU of employee rows per database, with an email -> id index."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, check_seconds: float = DEFAULT_CHECK_SECONDS):
+        self.maxsize = maxsize
+        self.check_seconds = check_seconds
+        self._rows: "OrderedDict[Tuple[str, int], Dict]" = OrderedDict()
+        self._emails: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        # Per DB: dedicated connection for data_version, last version seen,
+        # when it was checked, and the invalidation generation.
+        self._sources: Dict[str, sqlite3.Connection] = {}
+        self._versions: Dict[str, int] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # -- coherence -----------------------------------------------------
+
+    def _sync_locked(self, db_key: str) -> None:
+        """Drop this DB's rows if another connection committed; runs at most once per `check_seconds`."""
+        now = time.monotonic()
+        if now - self._checked_at.get(db_key, float("-inf")) < self.check_seconds:
+            return
+        self._checked_at[db_key] = now
+        source = self._sources.get(db_key)
+        if source is None:
+            # Own connection, used only under self._lock, so its data_version
+            # moves on commits from every pooled connection and other processes.
+            source = self._sources[db_key] = sqlite3.connect(db_key, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        version = source.execute("PRAGMA data_version").fetchone()[0]
+        if self._versions.get(db_key) != version:
+            self._versions[db_key] = version
+            self._invalidate_all_locked(db_key)
+
+    def generation(self, db_key: str) -> int:
+        """Current invalidation generation of `db_key`; pass it to `put` after reading the row."""
+        with self._lock:
+            self._sync_locked(db_key)
+            return self._generations.get(db_key, 0)
+
+    # -- lookups -------------------------------------------------------
+
+    def _hit_locked(self, key: Optional[Tuple[str, int]]) -> Optional[Dict]:
+        row = self._rows.get(key) if key is not None else None
+        if row is None:
+            self.misses += 1
+            return None
+        self._rows.move_to_end(key)
+        self.hits += 1
+        return dict(row)
+
+    def get_by_id(self, db_key: str, emp_id: int) -> Optional[Dict]:
+        with self._lock:
+            self._sync_locked(db_key)
+            return self._hit_locked((db_key, int(emp_id)))
+
+    def get_by_email(self, db_key: str, email: str) -> Optional[Dict]:
+        with self._lock:
+            self._sync_locked(db_key)
+            emp_id = self._emails.get((db_key, email))
+            return self._hit_locked((db_key, emp_id) if emp_id is not None else None)
+
+    def put(self, db_key: str, row: Dict, generation: Optional[int] = None) -> bool:
+        """Cache `row`; skipped (returns False) if `db_key` was invalidated since `generation`."""
+        key = (db_key, int(row["id"]))
+        with self._lock:
+            if generation is not None and generation != self._generations.get(db_key, 0):
+                return False
+            old = self._rows.pop(key, None)
+            if old is not None and old.get("email"):
+                self._emails.pop((db_key, old["email"]), None)
+            self._rows[key] = dict(row)
+            if row.get("email"):
+                self._emails[(db_key, row["email"])] = key[1]
+            while len(self._rows) > self.maxsize:
+                (evicted_db, _), evicted = self._rows.popitem(last=False)
+                if evicted.get("email"):
+                    self._emails.pop((evicted_db, evicted["email"]), None)
+                self.evictions += 1
+            return True
+
+    # -- invalidation --------------------------------------------------
+
+    def invalidate(self, db_key: str, emp_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._generations[db_key] = self._generations.get(db_key, 0) + 1
+            for emp_id in emp_ids:
+                row = self._rows.pop((db_key, int(emp_id)), None)
+                if row is not None:
+                    if row.get("email"):
+                        self._emails.pop((db_key, row["email"]), None)
+                    self.invalidations += 1
+
+    def _invalidate_all_locked(self, db_key: Optional[str]) -> None:
+        if db_key is None:
+            for key in set(self._generations) | {k[0] for k in self._rows}:
+                self._generations[key] = self._generations.get(key, 0) + 1
+            self.invalidations += len(self._rows)
+            self._rows.clear()
+            self._emails.clear()
+            return
+        self._generations[db_key] = self._generations.get(db_key, 0) + 1
+        for key in [k for k in self._rows if k[0] == db_key]:
+            row = self._rows.pop(key)
+            if row.get("email"):
+                self._emails.pop((db_key, row["email"]), None)
+            self.invalidations += 1
+
+    def invalidate_all(self, db_key: Optional[str] = None) -> None:
+        with self._lock:
+            self._invalidate_all_locked(db_key)
+
+    def close(self) -> None:
+        """Drop every row and close the data_version connections."""
+        with self._lock:
+            self._invalidate_all_locked(None)
+            sources = list(self._sources.values())
+            self._sources.clear()
+            self._versions.clear()
+            self._checked_at.clear()
+        for source in sources:
+            source.close()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._rows),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+
+employee_cache = EmployeeCache()
+
+
+@lru_cache(maxsize=64)
+def _db_key(db_path: str) -> str:
+    # Memoized: resolving the path costs more than a cache hit
+    return str(Path(db_path).resolve())
+
+
+def _cached_employee(column: str, value, db_path: Path | str) -> Optional[Dict]:
+    key = _db_key(str(db_path))
+    if column == "id":
+        row = employee_cache.get_by_id(key, value)
+    else:
+        row = employee_cache.get_by_email(key, value)
+    if row is not None:
+        return row
+    generation = employee_cache.generation(key)
+    found = get_connection(key).execute(f"SELECT * FROM employee WHERE {column} = ?", (value,)).fetchone()
+    if found is None:
+        return None
+    employee_cache.put(key, dict(found), generation)
+    return dict(found)
+
+
+def cached_employee_by_id(emp_id: int, db_path: Path | str) -> Optional[Dict]:
+    """Return the employee row for `emp_id`, from cache or the DB (None if missing)."""
+    return _cached_employee("id", int(emp_id), db_path)
+
+
+def cached_employee_by_email(email: str, db_path: Path | str) -> Optional[Dict]:
+    """Return the employee row for `email`, from cache or the DB (None if missing)."""
+    return _cached_employee("email", email, db_path)
+
+
+def invalidate_employees(emp_ids: Iterable[int], db_path: Path | str) -> None:
+    """Drop cached rows for `emp_ids` after they were written."""
+    employee_cache.invalidate(_db_key(str(db_path)), emp_ids)
+
+
+def invalidate_all_employees(db_path: Optional[Path | str] = None) -> None:
+    """Drop every cached row (for one DB, or all DBs when `db_path` is None)."""
+    employee_cache.invalidate_all(_db_key(str(db_path)) if db_path is not None else None)
+
+
+def employee_cache_stats() -> Dict:
+    """Hit / miss / eviction counters and current size, for sizing the cache."""
+    return employee_cache.stats()
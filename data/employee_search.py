@@ -0,0 +1,107 @@
+"""Full-text index for employee name / role lookup.
+
+`employee_fts` is an FTS5 table using the trigram tokenizer, so substring
+matches work for English and CJK names alike (e.g. "王小明", "alice wa").
+Rows share their rowid with `employee.id` and are kept in sync by triggers.
+
+Trigram matching needs at least 3 characters; shorter queries (and DBs
+without the index) are served by the LIKE scan in `insert_data.find_employees`.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from data.connection import get_connection, is_missing_table, transaction
+
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db"
+
+# Shortest query the trigram tokenizer can match.
+MIN_FTS_QUERY_LENGTH = 3
+
+EMPLOYEE_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS employee_fts USING fts5(
+    full_name, first_name, last_name, position, department,
+    tokenize = 'trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_employee_fts_insert
+AFTER INSERT ON employee
+BEGIN
+    INSERT INTO employee_fts (rowid, full_name, first_name, last_name, position, department)
+    VALUES (NEW.id, NEW.first_name || ' ' || NEW.last_name, NEW.first_name, NEW.last_name, NEW.position, NEW.department);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_employee_fts_delete
+AFTER DELETE ON employee
+BEGIN
+    DELETE FROM employee_fts WHERE rowid = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_employee_fts_update
+AFTER UPDATE OF first_name, last_name, position, department ON employee
+BEGIN
+    DELETE FROM employee_fts WHERE rowid = OLD.id;
+    INSERT INTO employee_fts (rowid, full_name, first_name, last_name, position, department)
+    VALUES (NEW.id, NEW.first_name || ' ' || NEW.last_name, NEW.first_name, NEW.last_name, NEW.position, NEW.department);
+END;
+"""
+
+EMPLOYEE_FTS_REBUILD_SQL = """
+INSERT INTO employee_fts (rowid, full_name, first_name, last_name, position, department)
+SELECT id, first_name || ' ' || last_name, first_name, last_name, position, department FROM employee
+"""
+
+# bm25 column weights: full_name, first_name, last_name, position, department.
+# Name hits rank above role / department hits.
+_BM25_WEIGHTS = "10.0, 5.0, 5.0, 1.0, 1.0"
+
+
+def create_employee_search_index(db_path: Optional[Path | str] = None) -> Path:
+    """Ensure the `employee_fts` table and its triggers exist, then rebuild it."""
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    get_connection(db_path).executescript(EMPLOYEE_FTS_SCHEMA)
+    rebuild_employee_search_index(db_path)
+    return db_path
+
+
+def rebuild_employee_search_index(db_path: Optional[Path | str] = None) -> int:
+    """Repopulate `employee_fts` from `employee`. Returns the number of indexed rows."""
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    with transaction(db_path) as conn:
+        conn.execute("DELETE FROM employee_fts")
+        cur = conn.execute(EMPLOYEE_FTS_REBUILD_SQL)
+        return cur.rowcount
+
+
+def search_employees_fts(query: str, db_path: Optional[Path | str] = None, limit: int = 10) -> Optional[List[Dict]]:
+    """Ranked full-text employee search.
+
+    Returns matching rows (best match first), or None when the index cannot
+    answer the query (too short, no `employee_fts` table, or no FTS5 / trigram
+    support in this SQLite build) so the caller can fall back to LIKE. Other
+    errors are raised.
+    """
+    q = (query or "").strip()
+    if len(q) < MIN_FTS_QUERY_LENGTH:
+        return None
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    # Quote as a single FTS5 string so user input is never parsed as query syntax
+    match = '"' + q.replace('"', '""') + '"'
+    try:
+        cur = get_connection(db_path).execute(
+            f"""
+            SELECT e.* FROM employee_fts
+            JOIN employee e ON e.id = employee_fts.rowid
+            WHERE employee_fts MATCH ?
+            ORDER BY bm25(employee_fts, {_BM25_WEIGHTS}), e.id
+            LIMIT ?
+            """,
+            (match, limit),
+        )
+        return [dict(r) for r in cur.fetchall()]
+    except sqlite3.OperationalError as e:
+        if not is_missing_table(e):
+            raise
+        return None
@@ -0,0 +1,237 @@
+"""Deterministic synthetic org generator for scale testing.
+
+Builds a realistic company (names, departments, a supervisor tree of a given
+depth, salaries by level) plus performance reviews written by each
+employee's supervisor, with a mix of Chinese and English comments. A known
+fraction of reviews contains a culture-trigger phrase so culture-scan
+results can be checked against the planted count.
+
+Everything is derived from `seed`, so the same arguments always produce the
+same data. Rows are written through `bulk_import` (chunked `executemany`
+transactions), the same path used for real imports.
+
+Usage:
+    python -m data.generate_data --employees 20000 --depth 6 --reviews 4 --db data/scale.db
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from data.bulk_import import DEFAULT_CHUNK_SIZE, import_employee_records, import_review_records
+from data.migrations import migrate
+
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db"
+
+EN_FIRST_NAMES = ["Alice", "Bob", "Carol", "David", "Emma", "Frank", "Grace", "Henry", "Ivy", "Jack", "Karen", "Leo", "Mia", "Nina", "Oscar", "Paul"]
+EN_LAST_NAMES = ["Wang", "Chen", "Lin", "Huang", "Chang", "Lee", "Wu", "Liu", "Tsai", "Yang", "Smith", "Brown", "Jones", "Miller"]
+ZH_SURNAMES = ["王", "陳", "林", "黃", "張", "李", "吳", "劉", "蔡", "楊", "許", "鄭", "謝", "郭"]
+ZH_GIVEN_NAMES = ["小明", "怡君", "家豪", "雅婷", "志偉", "淑芬", "俊傑", "美玲", "建宏", "佳穎", "冠宇", "欣怡"]
+
+DEPARTMENTS = {
+    "Engineering": ["Software Engineer", "Senior Software Engineer", "QA Engineer", "DevOps Engineer"],
+    "Sales": ["Account Executive", "Account Manager", "Sales Representative"],
+    "HR": ["HR Specialist", "Recruiter", "HR Business Partner"],
+    "Finance": ["Accountant", "Financial Analyst"],
+    "Marketing": ["Marketing Specialist", "Content Strategist", "Product Marketing Manager"],
+    "Support": ["Support Engineer", "Customer Success Manager"],
+}
+MANAGER_TITLES = ["CEO", "Vice President", "Director", "Senior Manager", "Manager", "Team Lead"]
+
+# Neutral comment fragments; none contain a culture trigger phrase.
+ZH_COMMENTS = [
+    "本季目標達成率良好，專案如期交付。",
+    "工作品質穩定，能主動回報進度。",
+    "專業技能扎實，解決問題速度快。",
+    "與客戶溝通順暢，獲得正面回饋。",
+    "持續學習新技術，表現值得肯定。",
+    "文件撰寫完整，交接清楚。",
+]
+EN_COMMENTS = [
+    "Delivered the quarterly roadmap on schedule.",
+    "Consistently high quality work and clear status updates.",
+    "Strong technical skills; resolves incidents quickly.",
+    "Customers report positive experiences working with them.",
+    "Mentors new teammates and documents decisions well.",
+    "Met most goals this period with steady output.",
+]
+# Phrases that the agent's built-in culture rules look for.
+ZH_CULTURE_TRIGGERS = ["隱瞞", "缺乏團隊", "合作不足", "抗拒改變", "文化不符", "違反流程"]
+EN_CULTURE_TRIGGERS = ["integrity issue", "poor collaboration", "resistant to change", "culture mismatch"]
+
+# Reviews and hire dates are spread backwards from a fixed date for reproducibility.
+BASE_DATE = datetime(2025, 1, 1)
+
+
+def _org_levels(rng: random.Random, employees: int, depth: int) -> Tuple[List[Optional[int]], List[int]]:
+    """Return each employee's supervisor index (None for the root) and tree level.
+
+    The first `depth` employees form a chain so the tree reaches the requested
+    depth; the rest report to a random employee above the bottom level, which
+    gives a wide, bushy org like a real company.
+    """
+    supervisors: List[Optional[int]] = [None]
+    levels = [0]
+    managers = [0] if depth > 1 else []
+    for i in range(1, employees):
+        if i < depth:
+            sup = i - 1
+        else:
+            sup = managers[rng.randrange(len(managers))]
+        level = levels[sup] + 1
+        supervisors.append(sup)
+        levels.append(level)
+        if level < depth - 1:
+            managers.append(i)
+    return supervisors, levels
+
+
+def generate_org(
+    employees: int = 1000,
+    depth: int = 5,
+    reviews_per_employee: float = 3.0,
+    zh_ratio: float = 0.5,
+    culture_trigger_rate: float = 0.05,
+    seed: int = 42,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Any]]:
+    """Generate employee and review records.
+
+    Args:
+        employees: number of employees (>= 1).
+        depth: number of levels in the supervisor tree (>= 1; >= 2 when employees > 1).
+        reviews_per_employee: average reviews per non-root employee.
+        zh_ratio: fraction of Chinese names and comments.
+        culture_trigger_rate: fraction of reviews containing a culture trigger phrase.
+        seed: random seed; identical arguments give identical output.
+
+    Returns:
+        `(employee_records, review_records, summary)`; records use the
+        `bulk_import` field names, and `summary` includes the exact number of
+        reviews planted with a culture trigger.
+    """
+    if employees < 1 or depth < 1:
+        raise ValueError("employees and depth must be at least 1")
+    if depth == 1 and employees > 1:
+        # A one-level tree is just the root; there is nobody for the others to report to
+        raise ValueError("depth=1 allows only one employee; use depth >= 2 for a larger org")
+    rng = random.Random(seed)
+    supervisors, levels = _org_levels(rng, employees, depth)
+
+    emp_records: List[Dict[str, Any]] = []
+    for i in range(employees):
+        zh = rng.random() < zh_ratio
+        if zh:
+            first, last = rng.choice(ZH_GIVEN_NAMES), rng.choice(ZH_SURNAMES)
+        else:
+            first, last = rng.choice(EN_FIRST_NAMES), rng.choice(EN_LAST_NAMES)
+        department = rng.choice(list(DEPARTMENTS))
+        is_manager = levels[i] < depth - 1 and i < employees - 1
+        if i == 0:
+            position = MANAGER_TITLES[0]
+        elif is_manager:
+            position = MANAGER_TITLES[min(levels[i], len(MANAGER_TITLES) - 1)]
+        else:
+            position = rng.choice(DEPARTMENTS[department])
+        base_salary = 45000 + 15000 * max(0, depth - 1 - levels[i])
+        hire_date = BASE_DATE - timedelta(days=rng.randrange(0, 365 * 10))
+        sup = supervisors[i]
+        emp_records.append({
+            "first_name": first,
+            "last_name": last,
+            "email": f"emp{i:06d}@example.com",
+            "department": department,
+            "position": position,
+            "salary": round(base_salary * rng.uniform(0.85, 1.25), -2),
+            "hire_date": hire_date.strftime("%Y-%m-%d"),
+            "supervisor_email": f"emp{sup:06d}@example.com" if sup is not None else None,
+        })
+
+    review_records: List[Dict[str, Any]] = []
+    planted = 0
+    for i in range(1, employees):
+        # Uniform around the requested mean
+        count = rng.randint(0, int(round(2 * reviews_per_employee)))
+        for _ in range(count):
+            zh = rng.random() < zh_ratio
+            parts = rng.sample(ZH_COMMENTS if zh else EN_COMMENTS, 2)
+            if rng.random() < culture_trigger_rate:
+                trigger = rng.choice(ZH_CULTURE_TRIGGERS if zh else EN_CULTURE_TRIGGERS)
+                parts.append(f"但有{trigger}的情況。" if zh else f"However, there is a {trigger} to address.")
+                planted += 1
+            created_at = BASE_DATE - timedelta(minutes=rng.randrange(0, 60 * 24 * 365 * 3))
+            review_records.append({
+                "employee_email": f"emp{i:06d}@example.com",
+                "reviewer_email": f"emp{supervisors[i]:06d}@example.com",
+                "score": rng.randint(40, 100),
+                "comments": ("" if zh else " ").join(parts),
+                "created_at": created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            })
+
+    summary = {
+        "employees": employees,
+        "depth": max(levels) + 1,
+        "reviews": len(review_records),
+        "culture_trigger_reviews": planted,
+        "seed": seed,
+    }
+    return emp_records, review_records, summary
+
+
+def populate_database(
+    db_path: Optional[Path | str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """Generate an org with `generate_org(**kwargs)` and load it via the bulk import path.
+
+    The DB schema is created / migrated first. Returns the generator summary
+    plus the employee and review import reports.
+    """
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    migrate(db_path)
+    emp_records, review_records, summary = generate_org(**kwargs)
+
+    def numbered(records: List[Dict[str, Any]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        return enumerate(records, start=1)
+
+    summary["employee_import"] = import_employee_records(numbered(emp_records), db_path=db_path, chunk_size=chunk_size)
+    summary["review_import"] = import_review_records(numbered(review_records), db_path=db_path, chunk_size=chunk_size)
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic org for scale testing")
+    parser.add_argument("--db", help="SQLite DB path (defaults to data/employee.db)")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=5, help="Levels in the supervisor tree")
+    parser.add_argument("--reviews", type=float, default=3.0, help="Average reviews per employee")
+    parser.add_argument("--zh-ratio", type=float, default=0.5, help="Fraction of Chinese names / comments")
+    parser.add_argument("--culture-rate", type=float, default=0.05, help="Fraction of reviews with a culture trigger")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+    if args.employees < 1 or args.depth < 1 or (args.depth == 1 and args.employees > 1):
+        parser.error("--employees and --depth must be at least 1, and --depth 1 allows only one employee")
+
+    summary = populate_database(
+        db_path=args.db,
+        chunk_size=args.chunk_size,
+        employees=args.employees,
+        depth=args.depth,
+        reviews_per_employee=args.reviews,
+        zh_ratio=args.zh_ratio,
+        culture_trigger_rate=args.culture_rate,
+        seed=args.seed,
+    )
+    for key in ("employee_import", "review_import"):
+        report = summary[key]
+        summary[key] = {k: report.get(k) for k in ("inserted", "updated", "rejected", "seconds", "rows_per_sec") if k in report}
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
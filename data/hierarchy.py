@@ -0,0 +1,183 @@
+"""Org hierarchy index for the employee database.
+
+`employee_hierarchy` is a closure table: one row per (ancestor, descendant)
+pair along the `supervisor_id` chain, including a depth-0 row for every
+employee. Triggers on `employee` keep it current on insert, delete and
+`supervisor_id` updates, so "is X above Y" and "everyone under X" are single
+indexed lookups instead of one SELECT per level.
+
+If the table has not been created yet (older DBs), lookups fall back to a
+recursive CTE over `employee.supervisor_id`.
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from data.connection import get_connection, is_missing_table, transaction
+
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db"
+
+HIERARCHY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS employee_hierarchy (
+    ancestor_id INTEGER NOT NULL,
+    descendant_id INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_hierarchy_descendant ON employee_hierarchy(descendant_id, ancestor_id);
+
+-- Reject supervisor loops: the new supervisor may not be the employee or one of their reports.
+CREATE TRIGGER IF NOT EXISTS trg_employee_hierarchy_no_cycle
+BEFORE UPDATE OF supervisor_id ON employee
+WHEN NEW.supervisor_id IS NOT NULL AND EXISTS (
+    SELECT 1 FROM employee_hierarchy WHERE ancestor_id = NEW.id AND descendant_id = NEW.supervisor_id
+)
+BEGIN
+    SELECT RAISE(ABORT, 'supervisor cycle: an employee cannot report to themselves or their own reports');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_employee_hierarchy_insert
+AFTER INSERT ON employee
+BEGIN
+    INSERT OR IGNORE INTO employee_hierarchy (ancestor_id, descendant_id, depth) VALUES (NEW.id, NEW.id, 0);
+    INSERT OR IGNORE INTO employee_hierarchy (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, NEW.id, depth + 1 FROM employee_hierarchy WHERE descendant_id = NEW.supervisor_id;
+    -- Attach existing rows that already named this id as their supervisor.
+    INSERT OR IGNORE INTO employee_hierarchy (ancestor_id, descendant_id, depth)
+        SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1
+        FROM employee c
+        JOIN employee_hierarchy a ON a.descendant_id = NEW.id
+        JOIN employee_hierarchy d ON d.ancestor_id = c.id
+        WHERE c.supervisor_id = NEW.id AND c.id <> NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_employee_hierarchy_update
+AFTER UPDATE OF supervisor_id ON employee
+WHEN OLD.supervisor_id IS NOT NEW.supervisor_id
+BEGIN
+    DELETE FROM employee_hierarchy
+    WHERE descendant_id IN (SELECT descendant_id FROM employee_hierarchy WHERE ancestor_id = NEW.id)
+      AND ancestor_id IN (SELECT ancestor_id FROM employee_hierarchy WHERE descendant_id = NEW.id AND ancestor_id <> NEW.id);
+    INSERT OR IGNORE INTO employee_hierarchy (ancestor_id, descendant_id, depth)
+        SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1
+        FROM employee_hierarchy a
+        JOIN employee_hierarchy d ON d.ancestor_id = NEW.id
+        WHERE a.descendant_id = NEW.supervisor_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_employee_hierarchy_delete
+AFTER DELETE ON employee
+BEGIN
+    DELETE FROM employee_hierarchy
+    WHERE descendant_id IN (SELECT descendant_id FROM employee_hierarchy WHERE ancestor_id = OLD.id)
+      AND ancestor_id IN (SELECT ancestor_id FROM employee_hierarchy WHERE descendant_id = OLD.id);
+END;
+"""
+
+# Depth is bounded by the employee count so a pre-existing supervisor loop
+# still terminates; MIN(depth) keeps the shortest path for each pair.
+HIERARCHY_REBUILD_SQL = """
+INSERT INTO employee_hierarchy (ancestor_id, descendant_id, depth)
+WITH RECURSIVE chain(ancestor_id, descendant_id, depth) AS (
+    SELECT id, id, 0 FROM employee
+    UNION
+    SELECT e.supervisor_id, chain.descendant_id, chain.depth + 1
+    FROM chain
+    JOIN employee e ON e.id = chain.ancestor_id
+    JOIN employee s ON s.id = e.supervisor_id
+    WHERE chain.depth < (SELECT COUNT(*) FROM employee)
+)
+SELECT ancestor_id, descendant_id, MIN(depth) FROM chain GROUP BY ancestor_id, descendant_id
+"""
+
+
+def create_hierarchy_index(db_path: Optional[Path | str] = None) -> Path:
+    """Ensure the `employee_hierarchy` closure table and its triggers exist, then rebuild it."""
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    get_connection(db_path).executescript(HIERARCHY_SCHEMA)
+    rebuild_hierarchy_index(db_path)
+    return db_path
+
+
+def rebuild_hierarchy_index(db_path: Optional[Path | str] = None) -> int:
+    """Recompute `employee_hierarchy` from `employee.supervisor_id`. Returns the row count."""
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    with transaction(db_path) as conn:
+        conn.execute("DELETE FROM employee_hierarchy")
+        conn.execute(HIERARCHY_REBUILD_SQL)
+        return conn.execute("SELECT COUNT(*) FROM employee_hierarchy").fetchone()[0]
+
+
+def is_ancestor(ancestor_id: int, descendant_id: int, db_path: Optional[Path | str] = None) -> bool:
+    """Return True if `ancestor_id` is somewhere above `descendant_id` in the supervisor chain."""
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    conn = get_connection(db_path)
+    try:
+        row = conn.execute(
+            "SELECT 1 FROM employee_hierarchy WHERE ancestor_id = ? AND descendant_id = ? AND depth > 0",
+            (int(ancestor_id), int(descendant_id)),
+        ).fetchone()
+    except sqlite3.OperationalError as e:
+        if not is_missing_table(e):
+            raise
+        # No closure table yet: walk the chain in SQL. UNION de-duplicates ids,
+        # so a supervisor loop ends the recursion instead of spinning.
+        row = conn.execute(
+            """
+            WITH RECURSIVE chain(id) AS (
+                SELECT supervisor_id FROM employee WHERE id = ?
+                UNION
+                SELECT e.supervisor_id FROM employee e JOIN chain ON e.id = chain.id
+            )
+            SELECT 1 FROM chain WHERE id = ?
+            """,
+            (int(descendant_id), int(ancestor_id)),
+        ).fetchone()
+    return row is not None
+
+
+def get_reports(manager_id: int, direct_only: bool = False, db_path: Optional[Path | str] = None) -> List[Dict]:
+    """Return employee rows under `manager_id`, nearest first.
+
+    Args:
+        manager_id: id of the manager.
+        direct_only: only return direct reports (depth 1).
+        db_path: optional DB path.
+    """
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    conn = get_connection(db_path)
+    max_depth = 1 if direct_only else -1
+    try:
+        cur = conn.execute(
+            """
+            SELECT e.*, h.depth AS depth
+            FROM employee_hierarchy h
+            JOIN employee e ON e.id = h.descendant_id
+            WHERE h.ancestor_id = ? AND h.depth > 0 AND (? < 0 OR h.depth <= ?)
+            ORDER BY h.depth, e.id
+            """,
+            (int(manager_id), max_depth, max_depth),
+        )
+    except sqlite3.OperationalError as e:
+        if not is_missing_table(e):
+            raise
+        cur = conn.execute(
+            """
+            WITH RECURSIVE reports(id, depth) AS (
+                SELECT id, 1 FROM employee WHERE supervisor_id = ?
+                UNION
+                SELECT e.id, reports.depth + 1 FROM employee e JOIN reports ON e.supervisor_id = reports.id
+                WHERE reports.depth < (SELECT COUNT(*) FROM employee)
+            )
+            SELECT e.*, MIN(reports.depth) AS depth
+            FROM reports JOIN employee e ON e.id = reports.id
+            WHERE e.id <> ? AND (? < 0 OR reports.depth <= ?)
+            GROUP BY e.id
+            ORDER BY depth, e.id
+            """,
+            (int(manager_id), int(manager_id), max_depth, max_depth),
+        )
+    return [dict(r) for r in cur.fetchall()]
@@ -12,6 +12,10 @@ import random
 from datetime import datetime, timedelta
 import sys
 
+from data.connection import get_connection, transaction
+from data.employee_cache import cached_employee_by_email, cached_employee_by_id, invalidate_employees
+from data.employee_search import search_employees_fts
+from data.hierarchy import is_ancestor
 
 DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db"
 
@@ -35,8 +39,7 @@ def insert_employee_data(db_path: Optional[Path | str] = None, data: Optional[Se
     db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
     data = data if data is not None else employee_data
 
-    conn = sqlite3.connect(db_path)
-    try:
+    with transaction(db_path) as conn:
         cur = conn.cursor()
         cur.execute("SELECT COUNT(1) FROM employee")
         row = cur.fetchone()
@@ -46,11 +49,8 @@ def insert_employee_data(db_path: Optional[Path | str] = None, data: Optional[Se
                 "INSERT INTO employee (first_name,last_name,email,department,position,salary,hire_date) VALUES (?,?,?,?,?,?,?)",
                 data,
             )
-            conn.commit()
             return len(data)
         return 0
-    finally:
-        conn.close()
 
 def insert_performance_review_data(db_path: Optional[Path | str] = None, data: Optional[Sequence[Tuple]] = None, force: bool = False) -> int:
     """Insert sample rows into the `employee` table if it's empty.
@@ -65,8 +65,7 @@ def insert_performance_review_data(db_path: Optional[Path | str] = None, data: O
     # If data is None there's nothing to insert
     db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
     print("data::::",data)
-    conn = sqlite3.connect(db_path)
-    try:
+    with transaction(db_path) as conn:
         cur = conn.cursor()
         cur.execute("SELECT COUNT(1) FROM performance_review")
         row = cur.fetchone()
@@ -78,89 +77,68 @@ def insert_performance_review_data(db_path: Optional[Path | str] = None, data: O
                 "INSERT INTO performance_review (employee_id, reviewer_employee_id, score, comments, created_at) VALUES (?,?,?,?,?)",
                 data,
             )
-            conn.commit()
             return len(data)
         return 0
-    finally:
-        conn.close()
 
 
 def find_employees(query: str, db_path: Optional[Path | str] = None, limit: int = 10):
-    """Search employees by name / position / department using LIKE (case-insensitive).
+    """Search employees by name / position / department (case-insensitive).
+
+    Uses the ranked `employee_fts` index when available (see
+    `data.employee_search`) and falls back to a LIKE scan for short queries
+    or DBs without the index.
 
     Returns list of dict rows.
     """
     db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    ranked = search_employees_fts(query, db_path=db_path, limit=limit)
+    if ranked is not None:
+        return ranked
     q = f"%{query.strip()}%"
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT * FROM employee
-            WHERE (first_name || ' ' || last_name) LIKE ?
-               OR first_name LIKE ?
-               OR last_name LIKE ?
-               OR position LIKE ?
-               OR department LIKE ?
-            ORDER BY id
-            LIMIT ?
-            """,
-            (q, q, q, q, q, limit),
-        )
-        return [dict(r) for r in cur.fetchall()]
-    finally:
-        conn.close()
+    conn = get_connection(db_path)
+    cur = conn.execute(
+        """
+        SELECT * FROM employee
+        WHERE (first_name || ' ' || last_name) LIKE ?
+           OR first_name LIKE ?
+           OR last_name LIKE ?
+           OR position LIKE ?
+           OR department LIKE ?
+        ORDER BY id
+        LIMIT ?
+        """,
+        (q, q, q, q, q, limit),
+    )
+    return [dict(r) for r in cur.fetchall()]
 
 
 def resolve_employee_identifier(identifier, db_path: Optional[Path | str] = None):
     """Resolve an identifier (id, email, or fuzzy name/role) to matching employee rows.
 
+    Id and email lookups are served from the employee cache when possible.
+
     Returns a list (may be empty or contain multiple candidates).
     """
     db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        cur = conn.cursor()
-        # numeric id
-        if isinstance(identifier, int) or (isinstance(identifier, str) and str(identifier).isdigit()):
-            eid = int(identifier)
-            cur.execute("SELECT * FROM employee WHERE id = ?", (eid,))
-            row = cur.fetchone()
-            return [dict(row)] if row else []
-        # email
-        if isinstance(identifier, str) and "@" in identifier:
-            cur.execute("SELECT * FROM employee WHERE email = ?", (identifier.strip(),))
-            row = cur.fetchone()
-            return [dict(row)] if row else []
-        # fallback fuzzy search
-        return find_employees(str(identifier), db_path=db_path, limit=20)
-    finally:
-        conn.close()
+    # numeric id
+    if isinstance(identifier, int) or (isinstance(identifier, str) and str(identifier).isdigit()):
+        row = cached_employee_by_id(int(identifier), db_path)
+        return [row] if row else []
+    # email
+    if isinstance(identifier, str) and "@" in identifier:
+        row = cached_employee_by_email(identifier.strip(), db_path)
+        return [row] if row else []
+    # fallback fuzzy search
+    return find_employees(str(identifier), db_path=db_path, limit=20)
 
 
 def is_manager_of(reviewer_id: int, target_id: int, db_path: Optional[Path | str] = None) -> bool:
-    """Return True if reviewer_id is an ancestor (manager) of target_id via supervisor_id chain."""
+    """Return True if reviewer_id is an ancestor (manager) of target_id via supervisor_id chain.
+
+    Answered from the `employee_hierarchy` closure table (see `data.hierarchy`).
+    """
     db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
-    conn = sqlite3.connect(db_path)
-    try:
-        cur = conn.cursor()
-        current = int(target_id)
-        while True:
-            cur.execute("SELECT supervisor_id FROM employee WHERE id = ?", (current,))
-            row = cur.fetchone()
-            if not row:
-                return False
-            supervisor_id = row[0]
-            if supervisor_id is None:
-                return False
-            if int(supervisor_id) == int(reviewer_id):
-                return True
-            current = int(supervisor_id)
-    finally:
-        conn.close()
+    return is_ancestor(int(reviewer_id), int(target_id), db_path=db_path)
 
 
 def insert_performance_review(
@@ -174,17 +152,12 @@ def insert_performance_review(
     """Insert a single performance review and return the new review id."""
     db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
     created_at = created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    conn = sqlite3.connect(db_path)
-    try:
-        cur = conn.cursor()
-        cur.execute(
+    with transaction(db_path) as conn:
+        cur = conn.execute(
             "INSERT INTO performance_review (employee_id, reviewer_employee_id, score, comments, created_at) VALUES (?,?,?,?,?)",
             (int(employee_id), int(reviewer_employee_id), int(score), str(comments), created_at),
         )
-        conn.commit()
         return cur.lastrowid
-    finally:
-        conn.close()
 
 
 def insert_employee(
@@ -204,10 +177,8 @@ def insert_employee(
     create a single employee row without touching the seeding helpers.
     """
     db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
-    conn = sqlite3.connect(db_path)
-    try:
-        cur = conn.cursor()
-        cur.execute(
+    with transaction(db_path) as conn:
+        cur = conn.execute(
             "INSERT INTO employee (first_name, last_name, email, department, position, salary, hire_date, supervisor_id) VALUES (?,?,?,?,?,?,?,?)",
             (
                 str(first_name),
@@ -220,10 +191,8 @@ def insert_employee(
                 int(supervisor_id) if supervisor_id is not None else None,
             ),
         )
-        conn.commit()
-        return cur.lastrowid
-    finally:
-        conn.close()
+    invalidate_employees([cur.lastrowid], db_path)
+    return cur.lastrowid
 
 
 def prepare_and_insert_review(
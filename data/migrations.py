@@ -0,0 +1,119 @@
+"""Versioned schema migrations for the employee database.
+
+The schema version is stored in SQLite's `PRAGMA user_version`. `migrate()`
+applies every migration newer than the stored version, each in its own
+transaction together with the version bump, so a failed migration leaves the
+DB at the previous version. Adding an index later is a new entry at the end
+of `MIGRATIONS`; existing DBs pick it up without being rebuilt.
+
+Run from the repository root:
+
+    python -m data.migrations
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+
+from data.connection import get_connection, transaction
+from data.create_database import create_database_employee, create_performance_table
+from data.culture_flags import CULTURE_FLAG_DEDUPE_SQL, CULTURE_FLAG_SCHEMA
+from data.employee_search import EMPLOYEE_FTS_REBUILD_SQL, EMPLOYEE_FTS_SCHEMA
+from data.hierarchy import HIERARCHY_REBUILD_SQL, HIERARCHY_SCHEMA
+from data.review_stats import REVIEW_STATS_REBUILD_SQL, REVIEW_STATS_SCHEMA
+
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db"
+
+
+def _add_supervisor_id(conn: sqlite3.Connection) -> None:
+    # DBs created before supervisor_id existed
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(employee)")]
+    if "supervisor_id" not in cols:
+        conn.execute("ALTER TABLE employee ADD COLUMN supervisor_id INTEGER")
+
+
+# (version, description, SQL script or callable(conn)). Append only; never renumber.
+MIGRATIONS: List[Tuple[int, str, Union[str, Callable[[sqlite3.Connection], None]]]] = [
+    (1, "employee.supervisor_id column", _add_supervisor_id),
+    (
+        2,
+        "performance_review (employee_id, created_at DESC) index",
+        """
+        CREATE INDEX IF NOT EXISTS idx_performance_employee_created ON performance_review(employee_id, created_at DESC);
+        -- the composite index covers every lookup the single-column one served
+        DROP INDEX IF EXISTS idx_performance_employee;
+        """,
+    ),
+    (
+        3,
+        "employee(supervisor_id) index",
+        "CREATE INDEX IF NOT EXISTS idx_employee_supervisor ON employee(supervisor_id);",
+    ),
+    (
+        4,
+        "employee department / position indexes",
+        """
+        CREATE INDEX IF NOT EXISTS idx_employee_department_position ON employee(department, position);
+        CREATE INDEX IF NOT EXISTS idx_employee_position ON employee(position);
+        """,
+    ),
+    (5, "employee_hierarchy closure table", HIERARCHY_SCHEMA + "DELETE FROM employee_hierarchy;" + HIERARCHY_REBUILD_SQL),
+    (6, "employee_fts full-text index", EMPLOYEE_FTS_SCHEMA + "DELETE FROM employee_fts;" + EMPLOYEE_FTS_REBUILD_SQL),
+    (7, "review_stats per-employee summary table", REVIEW_STATS_SCHEMA + REVIEW_STATS_REBUILD_SQL),
+    (8, "culture_flag / culture_scan_state tables", CULTURE_FLAG_SCHEMA),
+    (9, "unique culture_flag per review, kind and dimension", CULTURE_FLAG_DEDUPE_SQL + CULTURE_FLAG_SCHEMA),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(db_path: Optional[Path | str] = None) -> int:
+    """Return the DB's current `user_version`."""
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    return get_connection(db_path).execute("PRAGMA user_version").fetchone()[0]
+
+
+def _apply(conn: sqlite3.Connection, db_path: Path, version: int, step) -> None:
+    if callable(step):
+        with transaction(db_path) as tx:
+            step(tx)
+            tx.execute(f"PRAGMA user_version = {int(version)}")
+        return
+    # executescript commits any open transaction first, so the script
+    # carries its own BEGIN/COMMIT to keep the DDL and version bump atomic.
+    try:
+        conn.executescript(f"BEGIN IMMEDIATE;\n{step};\nPRAGMA user_version = {int(version)};\nCOMMIT;")
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+
+
+def migrate(db_path: Optional[Path | str] = None, target: Optional[int] = None) -> int:
+    """Create the base tables if needed and apply pending migrations.
+
+    Args:
+        db_path: optional DB path.
+        target: optional version to stop at (defaults to the latest).
+
+    Returns:
+        The schema version after migrating.
+    """
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    create_database_employee(db_path)
+    create_performance_table(db_path)
+    conn = get_connection(db_path)
+    current = get_schema_version(db_path)
+    target = LATEST_VERSION if target is None else int(target)
+    for version, description, step in MIGRATIONS:
+        if current < version <= target:
+            print(f"Applying migration {version}: {description}")
+            _apply(conn, db_path, version, step)
+            current = version
+    return current
+
+
+if __name__ == "__main__":
+    v = migrate()
+    print(f"Database schema at version {v} ({DEFAULT_DB_PATH})")
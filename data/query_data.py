@@ -1,11 +1,18 @@
 """Query utilities for the employee database.
 
-Provides `query_employees(db_path, limit)` which returns rows as dictionaries.
+Provides `query_employees(db_path, limit)` which returns rows as dictionaries,
+`iter_employees` for streaming the whole table, plus review lookups for one employee or many employees at once.
+Whole-table reads go through `get_read_connection`, so they use the
+in-memory snapshot when snapshot mode is on (see `data.snapshot`).
 """
 
-import sqlite3
+import json
+from itertools import groupby
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+
+from data.connection import get_connection
+from data.snapshot import get_read_connection
 
 
 DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db"
@@ -19,15 +26,42 @@ def query_employees(db_path: Optional[Path | str] = None, limit: int = 100) -> L
         limit: Max rows to return.
     """
     db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM employee ORDER BY id LIMIT ?", (limit,))
-        rows = [dict(r) for r in cur.fetchall()]
-        return rows
-    finally:
-        conn.close()
+    conn = get_read_connection(db_path)
+    cur = conn.execute("SELECT * FROM employee ORDER BY id LIMIT ?", (limit,))
+    return [dict(r) for r in cur.fetchall()]
+
+
+def iter_employees(
+    db_path: Optional[Path | str] = None,
+    page_size: int = 500,
+    after_id: Optional[int] = None,
+) -> Iterator[Dict]:
+    """Yield every employee row as a dict, in id order, one page at a time.
+
+    Uses keyset pagination on `id` (`WHERE id > last_id LIMIT page_size`), so
+    each page is an index range scan and only one page is held in memory.
+
+    Args:
+        db_path: Optional path to SQLite DB file. Uses default if omitted.
+        page_size: Rows fetched per query.
+        after_id: Optional id to resume after (exclusive).
+    """
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    conn = get_read_connection(db_path)
+    last_id = int(after_id) if after_id is not None else None
+    while True:
+        if last_id is None:
+            cur = conn.execute("SELECT * FROM employee ORDER BY id LIMIT ?", (page_size,))
+        else:
+            cur = conn.execute("SELECT * FROM employee WHERE id > ? ORDER BY id LIMIT ?", (last_id, page_size))
+        page = cur.fetchall()
+        for r in page:
+            yield dict(r)
+        if len(page) < page_size:
+            return
+        last_id = page[-1]["id"]
 
 
 def query_performance_reviews(employee_id: int, db_path: Optional[Path | str] = None) -> List[Dict]:
@@ -36,30 +70,76 @@ def query_performance_reviews(employee_id: int, db_path: Optional[Path | str] =
     Returns a list of dictionaries containing review details.
     """
     db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT
-                pr.id,
-                pr.score,
-                pr.comments,
-                pr.created_at,
-                e.first_name || ' ' || e.last_name as reviewer_name
-            FROM performance_review pr
-            LEFT JOIN employee e ON pr.reviewer_employee_id = e.id
-            WHERE pr.employee_id = ?
-            ORDER BY pr.created_at DESC
-            """,
-            (employee_id,),
-        )
-        return [dict(r) for r in cur.fetchall()]
-    finally:
-        conn.close()
+    conn = get_connection(db_path)
+    cur = conn.execute(
+        """
+        SELECT
+            pr.id,
+            pr.score,
+            pr.comments,
+            pr.created_at,
+            e.first_name || ' ' || e.last_name as reviewer_name
+        FROM performance_review pr
+        LEFT JOIN employee e ON pr.reviewer_employee_id = e.id
+        WHERE pr.employee_id = ?
+        ORDER BY pr.created_at DESC
+        """,
+        (employee_id,),
+    )
+    return [dict(r) for r in cur.fetchall()]
+
 
+def iter_reviews_by_employee(
+    employee_ids: Optional[Iterable[int]] = None,
+    db_path: Optional[Path | str] = None,
+) -> Iterator[Tuple[int, List[Dict]]]:
+    """Stream performance reviews grouped by employee in a single query.
 
+    Yields `(employee_id, reviews)` pairs in ascending employee id order; each
+    `reviews` list has the same shape as `query_performance_reviews` (newest
+    first). Employees without reviews are not yielded.
+
+    Args:
+        employee_ids: Optional ids to restrict to. If omitted, every review in
+                      the company is returned.
+        db_path: Optional path to SQLite DB file. Uses default if omitted.
+    """
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    conn = get_read_connection(db_path)
+    sql = """
+        SELECT
+            pr.employee_id,
+            pr.id,
+            pr.score,
+            pr.comments,
+            pr.created_at,
+            e.first_name || ' ' || e.last_name as reviewer_name
+        FROM performance_review pr
+        LEFT JOIN employee e ON pr.reviewer_employee_id = e.id
+    """
+    params: Tuple = ()
+    if employee_ids is not None:
+        ids = sorted({int(i) for i in employee_ids})
+        if not ids:
+            return
+        # json_each keeps this a single statement regardless of how many ids are passed
+        sql += " WHERE pr.employee_id IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(ids),)
+    sql += " ORDER BY pr.employee_id, pr.created_at DESC"
 
+    cur = conn.execute(sql, params)
+    for employee_id, rows in groupby(cur, key=lambda r: r["employee_id"]):
+        reviews = []
+        for r in rows:
+            review = dict(r)
+            review.pop("employee_id")
+            reviews.append(review)
+        yield employee_id, reviews
 
 
+def query_reviews_by_employee(
+    employee_ids: Optional[Iterable[int]] = None,
+    db_path: Optional[Path | str] = None,
+) -> Dict[int, List[Dict]]:
+    """Return `{employee_id: reviews}` for the given employees (or everyone) in one query."""
+    return dict(iter_reviews_by_employee(employee_ids, db_path=db_path))
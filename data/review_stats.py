@@ -0,0 +1,151 @@
+"""Materialized per-employee review statistics.
+
+`review_stats` holds one row per reviewed employee: review count, score sum
+(for the mean), min, max and the latest review's score and date. Triggers on
+`performance_review` keep it current:
+
+- INSERT updates the row in place (count / sum / min / max / latest).
+- UPDATE and DELETE recompute the affected employees from their reviews,
+  since min / max / latest cannot be rolled back incrementally.
+
+"How is X doing" questions then read one row instead of rescanning history.
+DBs without the table (before migration 7) fall back to an aggregate query.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from data.connection import get_connection, is_missing_table
+
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db"
+
+# Aggregate for one employee's reviews; shared by the triggers and the rebuild.
+_RECOMPUTE_SELECT = """
+SELECT
+    pr.employee_id,
+    COUNT(*),
+    COUNT(pr.score),
+    TOTAL(pr.score),
+    MIN(pr.score),
+    MAX(pr.score),
+    (SELECT l.score FROM performance_review l WHERE l.employee_id = pr.employee_id ORDER BY l.created_at DESC, l.id DESC LIMIT 1),
+    (SELECT l.created_at FROM performance_review l WHERE l.employee_id = pr.employee_id ORDER BY l.created_at DESC, l.id DESC LIMIT 1)
+FROM performance_review pr
+"""
+
+_COLUMNS = "employee_id, review_count, scored_count, score_sum, min_score, max_score, latest_score, latest_at"
+
+REVIEW_STATS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS review_stats (
+    employee_id INTEGER PRIMARY KEY,
+    review_count INTEGER NOT NULL,
+    scored_count INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    min_score REAL,
+    max_score REAL,
+    latest_score REAL,
+    latest_at TEXT
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_review_stats_insert
+AFTER INSERT ON performance_review
+BEGIN
+    INSERT INTO review_stats ({_COLUMNS})
+    VALUES (NEW.employee_id, 1, NEW.score IS NOT NULL, COALESCE(NEW.score, 0), NEW.score, NEW.score, NEW.score, NEW.created_at)
+    ON CONFLICT(employee_id) DO UPDATE SET
+        review_count = review_count + 1,
+        scored_count = scored_count + (NEW.score IS NOT NULL),
+        score_sum = score_sum + COALESCE(NEW.score, 0),
+        min_score = CASE WHEN NEW.score IS NULL THEN min_score WHEN min_score IS NULL OR NEW.score < min_score THEN NEW.score ELSE min_score END,
+        max_score = CASE WHEN NEW.score IS NULL THEN max_score WHEN max_score IS NULL OR NEW.score > max_score THEN NEW.score ELSE max_score END,
+        latest_score = CASE WHEN latest_at IS NULL OR NEW.created_at >= latest_at THEN NEW.score ELSE latest_score END,
+        latest_at = CASE WHEN latest_at IS NULL OR NEW.created_at >= latest_at THEN NEW.created_at ELSE latest_at END;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_review_stats_delete
+AFTER DELETE ON performance_review
+BEGIN
+    DELETE FROM review_stats WHERE employee_id = OLD.employee_id;
+    INSERT INTO review_stats ({_COLUMNS})
+    {_RECOMPUTE_SELECT} WHERE pr.employee_id = OLD.employee_id GROUP BY pr.employee_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_review_stats_update
+AFTER UPDATE OF employee_id, score, created_at ON performance_review
+BEGIN
+    DELETE FROM review_stats WHERE employee_id IN (OLD.employee_id, NEW.employee_id);
+    INSERT INTO review_stats ({_COLUMNS})
+    {_RECOMPUTE_SELECT} WHERE pr.employee_id IN (OLD.employee_id, NEW.employee_id) GROUP BY pr.employee_id;
+END;
+"""
+
+REVIEW_STATS_REBUILD_SQL = f"""
+DELETE FROM review_stats;
+INSERT INTO review_stats ({_COLUMNS})
+{_RECOMPUTE_SELECT} GROUP BY pr.employee_id;
+"""
+
+_STATS_SELECT = """
+SELECT
+    employee_id,
+    review_count,
+    CASE WHEN scored_count > 0 THEN score_sum / scored_count END AS mean_score,
+    min_score,
+    max_score,
+    latest_score,
+    latest_at
+FROM {source}
+"""
+
+# Same shape computed on the fly, for DBs without `review_stats`.
+_FALLBACK_SOURCE = f"""(
+    SELECT
+        pr.employee_id,
+        COUNT(*) AS review_count,
+        COUNT(pr.score) AS scored_count,
+        TOTAL(pr.score) AS score_sum,
+        MIN(pr.score) AS min_score,
+        MAX(pr.score) AS max_score,
+        (SELECT l.score FROM performance_review l WHERE l.employee_id = pr.employee_id ORDER BY l.created_at DESC, l.id DESC LIMIT 1) AS latest_score,
+        (SELECT l.created_at FROM performance_review l WHERE l.employee_id = pr.employee_id ORDER BY l.created_at DESC, l.id DESC LIMIT 1) AS latest_at
+    FROM performance_review pr
+    {{where}}
+    GROUP BY pr.employee_id
+)"""
+
+
+def query_review_stats(employee_id: int, db_path: Optional[Path | str] = None) -> Optional[Dict]:
+    """Return review statistics for one employee, or None if they have no reviews.
+
+    Keys: employee_id, review_count, mean_score, min_score, max_score,
+    latest_score, latest_at.
+    """
+    rows = query_review_stats_many([employee_id], db_path=db_path)
+    return rows[0] if rows else None
+
+
+def query_review_stats_many(employee_ids: Optional[Iterable[int]] = None, db_path: Optional[Path | str] = None) -> List[Dict]:
+    """Return review statistics for the given employees (or everyone), ordered by employee id."""
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    conn = get_connection(db_path)
+    params: tuple = ()
+    where = ""
+    if employee_ids is not None:
+        ids = sorted({int(i) for i in employee_ids})
+        if not ids:
+            return []
+        where = " WHERE employee_id IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(ids),)
+    try:
+        cur = conn.execute(_STATS_SELECT.format(source="review_stats") + where + " ORDER BY employee_id", params)
+    except sqlite3.OperationalError as e:
+        if not is_missing_table(e):
+            raise
+        # Older DB without the `review_stats` table: aggregate on the fly
+        fallback_where = where.replace("employee_id", "pr.employee_id", 1)
+        source = _FALLBACK_SOURCE.format(where=fallback_where)
+        cur = conn.execute(_STATS_SELECT.format(source=source) + " ORDER BY employee_id", params)
+    return [dict(r) for r in cur.fetchall()]
@@ -0,0 +1,171 @@
+"""In-memory read-only snapshot of the employee DB for heavy reports.
+
+Whole-table reports (the culture scan, listing everyone, department
+rollups) hold a read transaction on `employee.db` for as long as they run.
+In snapshot mode they read from a copy of the DB held in memory instead:
+
+- The copy is made with SQLite's online backup API, which reads the live
+  file once and briefly; writers are not blocked afterwards.
+- Before each report, `PRAGMA data_version` on a dedicated source
+  connection tells whether anyone has committed since the last copy. If so,
+  the snapshot is refreshed, at most once per `SNAPSHOT_MIN_REFRESH_SECONDS`
+  (default 0, i.e. reports always see committed data).
+- A refresh builds a new in-memory DB and swaps it in; a report still
+  iterating the old copy keeps its reference until it finishes.
+
+A refresh copies the whole file on the thread that asked for the report,
+so it only pays off when reports are long relative to the size of the DB;
+raise `SNAPSHOT_MIN_REFRESH_SECONDS` to bound how often that cost is paid.
+
+Snapshot mode is off unless `EMPLOYEE_DB_SNAPSHOT=1` is set or
+`enable_snapshots()` is called; when off, or if the copy fails,
+`get_read_connection` returns the normal pooled connection. Point lookups
+and all writes always use the live DB.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from data.connection import BUSY_TIMEOUT_SECONDS, get_connection
+
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db"
+
+DEFAULT_MIN_REFRESH_SECONDS = float(os.getenv("SNAPSHOT_MIN_REFRESH_SECONDS", "0"))
+
+_enabled = os.getenv("EMPLOYEE_DB_SNAPSHOT", "").lower() in ("1", "true", "yes")
+
+
+class AnalyticsSnapshot:
+    """In-memory copy of one DB file, refreshed when the file's data changes."""
+
+    def __init__(self, db_path: Path | str, min_refresh_seconds: float = DEFAULT_MIN_REFRESH_SECONDS):
+        self.db_path = Path(db_path)
+        self.min_refresh_seconds = min_refresh_seconds
+        self._lock = threading.Lock()
+        self._source: Optional[sqlite3.Connection] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._version: Optional[int] = None
+        self.refreshed_at = 0.0
+        self.refreshes = 0
+        self.last_refresh_seconds = 0.0
+
+    def _source_connection(self) -> sqlite3.Connection:
+        # Own connection, used only under self._lock, so its data_version
+        # reflects commits made by every other connection.
+        if self._source is None:
+            self._source = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        return self._source
+
+    def _refresh_locked(self) -> sqlite3.Connection:
+        start = time.perf_counter()
+        source = self._source_connection()
+        version = source.execute("PRAGMA data_version").fetchone()[0]
+        mem = sqlite3.connect(":memory:", check_same_thread=False)
+        source.backup(mem)
+        mem.row_factory = sqlite3.Row
+        mem.execute("PRAGMA query_only = 1")
+        # Swap; readers of the previous copy keep it alive until they finish
+        self._conn = mem
+        self._version = version
+        self.refreshed_at = time.monotonic()
+        self.refreshes += 1
+        self.last_refresh_seconds = time.perf_counter() - start
+        return mem
+
+    def refresh(self) -> sqlite3.Connection:
+        """Copy the DB file into a new in-memory DB now and return its connection."""
+        with self._lock:
+            return self._refresh_locked()
+
+    def is_stale(self) -> bool:
+        """True if someone has committed to the DB file since the last copy."""
+        with self._lock:
+            if self._conn is None:
+                return True
+            return self._source_connection().execute("PRAGMA data_version").fetchone()[0] != self._version
+
+    def connection(self) -> sqlite3.Connection:
+        """Return the snapshot connection, refreshing it first if the file has changed."""
+        with self._lock:
+            if self._conn is None:
+                return self._refresh_locked()
+            if time.monotonic() - self.refreshed_at >= self.min_refresh_seconds:
+                version = self._source_connection().execute("PRAGMA data_version").fetchone()[0]
+                if version != self._version:
+                    return self._refresh_locked()
+            return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._source is not None:
+                self._source.close()
+            self._source = None
+            self._conn = None
+            self._version = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "db_path": str(self.db_path),
+                "loaded": self._conn is not None,
+                "refreshes": self.refreshes,
+                "age_seconds": round(time.monotonic() - self.refreshed_at, 3) if self._conn is not None else None,
+                "last_refresh_seconds": round(self.last_refresh_seconds, 4),
+            }
+
+
+_snapshots: Dict[str, AnalyticsSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def enable_snapshots(enabled: bool = True) -> None:
+    """Turn snapshot mode on or off for `get_read_connection`."""
+    global _enabled
+    _enabled = enabled
+
+
+def snapshots_enabled() -> bool:
+    return _enabled
+
+
+def get_snapshot(db_path: Optional[Path | str] = None) -> AnalyticsSnapshot:
+    """Return the shared snapshot for `db_path`, creating it on first use."""
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    key = str(db_path.resolve())
+    with _snapshots_lock:
+        snap = _snapshots.get(key)
+        if snap is None:
+            snap = _snapshots[key] = AnalyticsSnapshot(key)
+        return snap
+
+
+def get_read_connection(db_path: Optional[Path | str] = None) -> sqlite3.Connection:
+    """Connection for read-only reports: the in-memory snapshot in snapshot mode, else the live DB."""
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    if _enabled and db_path.exists():
+        try:
+            return get_snapshot(db_path).connection()
+        except sqlite3.Error as e:
+            print(f"Snapshot unavailable for {db_path}, reading live DB: {e}")
+    return get_connection(db_path)
+
+
+def close_snapshots() -> None:
+    """Drop every snapshot and close its source connection."""
+    with _snapshots_lock:
+        snaps = list(_snapshots.values())
+        _snapshots.clear()
+    for snap in snaps:
+        snap.close()
+
+
+def snapshot_stats() -> Dict[str, Dict]:
+    """Per-DB refresh count and age, keyed by DB path."""
+    with _snapshots_lock:
+        snaps = list(_snapshots.values())
+    return {s.stats()["db_path"]: s.stats() for s in snaps}
@@ -1,12 +1,15 @@
 """Update utilities for the employee database (by id).
 
-Contains `update_employee_by_id` which updates allowed columns for a given id.
+Contains `update_employee_by_id` which updates allowed columns for a given id,
+and `update_employees_by_id` which applies many updates in one transaction.
 """
 
 import sqlite3
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Mapping
 
+from data.connection import transaction
+from data.employee_cache import invalidate_employees
 from data.query_data import query_employees
 
 DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "employee.db"
@@ -34,14 +37,39 @@ def update_employee_by_id(emp_id: int, updates: Dict[str, Any], db_path: Optiona
     set_clause = ", ".join([f"{k}=?" for k in keys])
     params = [updates[k] for k in keys] + [emp_id]
 
-    conn = sqlite3.connect(db_path)
-    try:
-        cur = conn.cursor()
-        cur.execute(f"UPDATE employee SET {set_clause} WHERE id=?", params)
-        conn.commit()
-        return cur.rowcount
-    finally:
-        conn.close()
+    with transaction(db_path) as conn:
+        cur = conn.execute(f"UPDATE employee SET {set_clause} WHERE id=?", params)
+    invalidate_employees([emp_id], db_path)
+    return cur.rowcount
+
+
+def update_employees_by_id(changes: Mapping[int, Dict[str, Any]], db_path: Optional[Path | str] = None) -> Dict[int, int]:
+    """Apply many updates in a single transaction. Returns {emp_id: rows updated (0 or 1)}.
+
+    Either every update is applied or, if any statement fails, none are. The
+    raised error names the employee id whose update failed.
+
+    Args:
+        changes: mapping of employee id -> dict of column->value to update
+        db_path: optional DB path
+    """
+    db_path = Path(db_path) if db_path is not None else DEFAULT_DB_PATH
+    results: Dict[int, int] = {}
+    with transaction(db_path) as conn:
+        for emp_id, updates in changes.items():
+            keys = [k for k in (updates or {}).keys() if k in ALLOWED_COLUMNS]
+            if not keys:
+                results[int(emp_id)] = 0
+                continue
+            set_clause = ", ".join([f"{k}=?" for k in keys])
+            params = [updates[k] for k in keys] + [int(emp_id)]
+            try:
+                cur = conn.execute(f"UPDATE employee SET {set_clause} WHERE id=?", params)
+            except sqlite3.Error as e:
+                raise type(e)(f"employee id={emp_id}: {e}") from e
+            results[int(emp_id)] = cur.rowcount
+    invalidate_employees(results.keys(), db_path)
+    return results
 
 
 if __name__ == "__main__":
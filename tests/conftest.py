@@ -0,0 +1,184 @@
+"""Shared test setup: import paths, a fresh employee DB and SDK mocks for the agent."""
+
+import hashlib
+import importlib
+import importlib.util
+import os
+import pkgutil
+import sys
+import types
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 'ai-agent' has a hyphen, so its modules are imported bare (e.g. `import rag_tool`)
+AGENT_DIR = os.path.join(REPO_ROOT, "ai-agent")
+for p in (REPO_ROOT, AGENT_DIR):
+    if p not in sys.path:
+        sys.path.insert(0, p)
+
+from data.connection import close_all_connections
+from data.create_database import create_database_employee, create_performance_table
+from data.employee_cache import employee_cache
+
+
+TRACKED_DATA_FILES = (
+    os.path.join(REPO_ROOT, "data", "employee.db"),
+    os.path.join(REPO_ROOT, "data", "chroma_db", "chroma.sqlite3"),
+)
+
+
+def _fingerprint(path):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+@pytest.fixture(autouse=True, scope="session")
+def tracked_data_untouched():
+    """Fail the run if any test wrote to the DBs committed under `data/`."""
+    before = {p: _fingerprint(p) for p in TRACKED_DATA_FILES}
+    yield
+    changed = [p for p in TRACKED_DATA_FILES if _fingerprint(p) != before[p]]
+    assert not changed, f"tests modified tracked data files: {changed}"
+
+
+@pytest.fixture()
+def db_file(tmp_path):
+    """Path for a test DB (not created); pooled connections and cached employees are dropped afterwards."""
+    yield tmp_path / "employee.db"
+    employee_cache.close()
+    close_all_connections()
+
+
+@pytest.fixture()
+def db_path(db_file):
+    """A fresh DB with the `employee` and `performance_review` tables."""
+    create_database_employee(db_file)
+    create_performance_table(db_file)
+    return db_file
+
+
+def _mock_external_deps():
+    """Install minimal mocks for google.adk.agents, dotenv, chromadb, google.genai
+    so importing `ai-agent/agent.py` works in test environments without the SDKs.
+    """
+    google_mod = types.ModuleType('google')
+    adk_mod = types.ModuleType('google.adk')
+    agents_mod = types.ModuleType('google.adk.agents')
+
+    class DummyLlmAgent:
+        def __init__(self, *args, **kwargs):
+            self.tools = kwargs.get('tools', [])
+
+    agents_mod.LlmAgent = DummyLlmAgent
+    sys.modules['google'] = google_mod
+    sys.modules['google.adk'] = adk_mod
+    sys.modules['google.adk.agents'] = agents_mod
+
+    dotenv_mod = types.ModuleType('dotenv')
+    dotenv_mod.load_dotenv = lambda *a, **k: None
+    dotenv_mod.dotenv_values = lambda *a, **k: {}
+    sys.modules['dotenv'] = dotenv_mod
+
+    chromadb_mod = types.ModuleType('chromadb')
+    class DummyCollection:
+        def __init__(self):
+            self.docs = {}
+        def upsert(self, documents=(), ids=(), metadatas=None, **k):
+            for i, doc in enumerate(documents):
+                self.docs[ids[i]] = (doc, metadatas[i] if metadatas else None)
+        def delete(self, ids=(), **k):
+            for i in ids:
+                self.docs.pop(i, None)
+        def count(self):
+            return len(self.docs)
+        def get(self, *a, **k):
+            ids = list(self.docs)
+            return {'ids': ids, 'documents': [self.docs[i][0] for i in ids], 'metadatas': [self.docs[i][1] for i in ids]}
+        def query(self, *a, **k):
+            return {'documents': [[]], 'metadatas': [[]]}
+    class DummyPersistentClient:
+        def __init__(self, path=None):
+            pass
+        def get_or_create_collection(self, name, embedding_function=None):
+            return DummyCollection()
+    chromadb_mod.PersistentClient = DummyPersistentClient
+    sys.modules['chromadb'] = chromadb_mod
+    sys.modules['chromadb.utils'] = types.ModuleType('chromadb.utils')
+    sys.modules['chromadb.utils.embedding_functions'] = types.ModuleType('chromadb.utils.embedding_functions')
+    setattr(sys.modules['chromadb.utils.embedding_functions'], 'EmbeddingFunction', object)
+
+    genai_mod = types.ModuleType('google.genai')
+    class DummyModels:
+        def embed_content(self, *a, contents=(), **k):
+            class R:
+                def __init__(self):
+                    class E:
+                        def __init__(self):
+                            self.values = [0.0] * 8
+                    self.embeddings = [E() for _ in contents]
+            return R()
+    class DummyClient:
+        def __init__(self, api_key=None):
+            self.models = DummyModels()
+    genai_mod.Client = DummyClient
+    sys.modules['google.genai'] = genai_mod
+    sys.modules['google.genai.types'] = types.ModuleType('google.genai.types')
+
+
+def _data_modules():
+    """Every `data.*` module, imported, so each one's DEFAULT_DB_PATH can be redirected."""
+    mods = []
+    for info in pkgutil.iter_modules([os.path.join(REPO_ROOT, "data")]):
+        mod = importlib.import_module(f"data.{info.name}")
+        if hasattr(mod, "DEFAULT_DB_PATH"):
+            mods.append(mod)
+    return mods
+
+
+def _import_agent_with_db(db_path, patch=setattr):
+    """Load a fresh `agent.py` whose data helpers all default to `db_path`.
+
+    `patch` is `setattr` by default; pass `monkeypatch.setattr` to undo the
+    redirection after the test.
+    """
+    for mod in _data_modules():
+        patch(mod, "DEFAULT_DB_PATH", db_path)
+
+    spec = importlib.util.spec_from_file_location('agent_mod', os.path.join(AGENT_DIR, 'agent.py'))
+    agent_mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(agent_mod)
+    return agent_mod
+
+
+@pytest.fixture()
+def mock_external_deps():
+    """Mock the ADK / GenAI / Chroma / dotenv modules so agent code imports without the SDKs."""
+    _mock_external_deps()
+
+
+@pytest.fixture()
+def import_agent(mock_external_deps, tmp_path, monkeypatch):
+    """Return a function loading a fresh `agent.py` whose data helpers default to the given DB.
+
+    The policy cache, embedding cache and index manifest are moved under
+    `tmp_path` too, so tests never write to the tracked files in `data/`.
+    """
+
+    def load(db_path):
+        agent = _import_agent_with_db(db_path, patch=monkeypatch.setattr)
+        import rag_tool
+        from embedding_cache import EmbeddingCache
+        from kb_manifest import MANIFEST_FILENAME, IndexManifest
+
+        embeddings = EmbeddingCache(tmp_path / "embedding_cache.db")
+        monkeypatch.setattr(rag_tool, "embedding_cache", embeddings)
+        monkeypatch.setattr(rag_tool, "CHROMA_DB_PATH", tmp_path / "chroma_db")
+        monkeypatch.setattr(rag_tool, "_manifest", IndexManifest(tmp_path / "chroma_db" / MANIFEST_FILENAME))
+        agent.policy_cache = agent.PolicyRulesCache(tmp_path / "policy_cache.json")
+        return agent
+
+    return load
@@ -1,10 +1,6 @@
-import importlib.util
-import importlib
 import os
 import sqlite3
-import sys
 import tempfile
-import types
 
 import pytest
 
@@ -49,100 +45,16 @@ def _make_temp_db():
 def tmp_db_path():
     path = _make_temp_db()
     yield path
+    from data.connection import close_all_connections
+    close_all_connections()
     try:
         os.remove(path)
     except Exception:
         pass
 
 
-def _mock_external_deps():
-    """Install minimal mocks for google.adk.agents, dotenv, chromadb, google.genai
-    so importing `ai-agent/agent.py` works in test environments without the SDKs.
-    """
-    google_mod = types.ModuleType('google')
-    adk_mod = types.ModuleType('google.adk')
-    agents_mod = types.ModuleType('google.adk.agents')
-
-    class DummyLlmAgent:
-        def __init__(self, *args, **kwargs):
-            self.tools = kwargs.get('tools', [])
-
-    agents_mod.LlmAgent = DummyLlmAgent
-    sys.modules['google'] = google_mod
-    sys.modules['google.adk'] = adk_mod
-    sys.modules['google.adk.agents'] = agents_mod
-
-    dotenv_mod = types.ModuleType('dotenv')
-    dotenv_mod.load_dotenv = lambda *a, **k: None
-    dotenv_mod.dotenv_values = lambda *a, **k: {}
-    sys.modules['dotenv'] = dotenv_mod
-
-    chromadb_mod = types.ModuleType('chromadb')
-    class DummyCollection:
-        def upsert(self, *a, **k):
-            return None
-        def query(self, *a, **k):
-            return {'documents': [[]], 'metadatas': [[]]}
-    class DummyPersistentClient:
-        def __init__(self, path=None):
-            pass
-        def get_or_create_collection(self, name, embedding_function=None):
-            return DummyCollection()
-    chromadb_mod.PersistentClient = DummyPersistentClient
-    sys.modules['chromadb'] = chromadb_mod
-    sys.modules['chromadb.utils'] = types.ModuleType('chromadb.utils')
-    sys.modules['chromadb.utils.embedding_functions'] = types.ModuleType('chromadb.utils.embedding_functions')
-    setattr(sys.modules['chromadb.utils.embedding_functions'], 'EmbeddingFunction', object)
-
-    genai_mod = types.ModuleType('google.genai')
-    class DummyModels:
-        def embed_content(self, *a, **k):
-            class R:
-                def __init__(self):
-                    class E:
-                        def __init__(self):
-                            self.values = [0.0] * 8
-                    self.embeddings = [E()]
-            return R()
-    class DummyClient:
-        def __init__(self, api_key=None):
-            self.models = DummyModels()
-    genai_mod.Client = DummyClient
-    sys.modules['google.genai'] = genai_mod
-    sys.modules['google.genai.types'] = types.ModuleType('google.genai.types')
-
-
-def _import_agent_with_db(db_path):
-    # Ensure package imports resolve
-    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    if repo_root not in sys.path:
-        sys.path.insert(0, repo_root)
-    # Insert data dir so local modules that use bare imports find them
-    data_dir = os.path.join(repo_root, 'data')
-    if data_dir not in sys.path:
-        sys.path.insert(0, data_dir)
-
-    # Import data modules and override their DEFAULT_DB_PATH to our temp DB
-    import data.insert_data as insert_data
-    import data.query_data as query_data
-    import data.update_data as update_data
-    import data.delete_data as delete_data
-
-    insert_data.DEFAULT_DB_PATH = db_path
-    query_data.DEFAULT_DB_PATH = db_path
-    update_data.DEFAULT_DB_PATH = db_path
-    delete_data.DEFAULT_DB_PATH = db_path
-
-    # Now import agent
-    spec = importlib.util.spec_from_file_location('agent_mod', os.path.join(repo_root, 'ai-agent', 'agent.py'))
-    agent_mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(agent_mod)
-    return agent_mod
-
-
-def test_agent_crud_flow(tmp_db_path):
-    _mock_external_deps()
-    agent = _import_agent_with_db(tmp_db_path)
+def test_agent_crud_flow(tmp_db_path, import_agent):
+    agent = import_agent(tmp_db_path)
 
     # Create
     r = agent.create_employee('Py', 'Test', 'py.test@example.com', 'Dev', 'Engineer', 70000, '2025-01-01')
@@ -163,3 +75,41 @@ def test_agent_crud_flow(tmp_db_path):
     d = agent.delete_employee('py.test@example.com')
     assert d['status'] == 'success'
     assert d['rows_deleted'] == 1
+
+
+def test_agent_batch_update_and_delete(tmp_db_path, import_agent):
+    agent = import_agent(tmp_db_path)
+
+    boss = agent.create_employee('Boss', 'One', 'boss@example.com')['id']
+    ids = [agent.create_employee('E', str(i), f'e{i}@example.com', 'Dev', 'Engineer', 50000)['id'] for i in range(3)]
+
+    r = agent.update_employees_batch(ids + [999], {'supervisor_id': boss, 'department': 'Platform'})
+    assert r['status'] == 'success'
+    assert r['results'] == [{'id': i, 'rows_updated': 1} for i in ids] + [{'id': 999, 'rows_updated': 0}]
+    assert agent.get_employee(str(ids[2]))['employee']['supervisor_id'] == boss
+
+    # A failing row (duplicate email) rolls back the whole batch
+    r = agent.update_employees_batch(ids, {'email': 'same@example.com', 'salary': 1})
+    assert r['status'] == 'error'
+    assert all(agent.get_employee(str(i))['employee']['salary'] == 50000 for i in ids)
+
+    r = agent.delete_employees_batch(ids[:2])
+    assert [x['rows_deleted'] for x in r['results']] == [1, 1]
+    assert agent.get_employee(str(ids[0]))['status'] == 'error'
+
+
+def test_list_all_employees_pages_with_after_id(tmp_db_path, import_agent):
+    agent = import_agent(tmp_db_path)
+    agent.EMPLOYEE_LIST_LIMIT = 2
+    ids = [agent.create_employee('E', str(i), f'e{i}@example.com')['id'] for i in range(5)]
+
+    seen, after_id = [], None
+    while True:
+        page = agent.list_all_employees(after_id)
+        assert len(page['employees']) <= 2 and len(page['text'].splitlines()) <= 4
+        seen.extend(e['id'] for e in page['employees'])
+        after_id = page['next_after_id']
+        if after_id is None:
+            break
+    assert seen == ids
+    assert agent.list_all_employees(ids[-1])['text'] == '沒有找到任何員工資料。'
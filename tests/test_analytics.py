@@ -0,0 +1,51 @@
+import pytest
+
+from data.analytics import headcount_and_salary, hire_cohorts, review_score_distribution, salary_bands
+from data.insert_data import insert_employee, insert_performance_review
+
+
+@pytest.fixture()
+def db_path(db_path):
+    path = db_path
+    boss = insert_employee("Boss", "Lee", "boss@example.com", "Sales", "Manager", 90000, "2020-03-01", db_path=path)
+    a = insert_employee("Ann", "Wu", "ann@example.com", "Engineering", "Engineer", 70000, "2021-05-01", db_path=path)
+    b = insert_employee("Bob", "Lin", "bob@example.com", "Engineering", "Engineer", 85000, "2021-08-01", db_path=path)
+    insert_employee("Cat", "Chen", "cat@example.com", "", "Intern", None, None, db_path=path)
+    insert_performance_review(a, boss, 80, "x", db_path=path)
+    insert_performance_review(a, boss, 90, "y", db_path=path)
+    insert_performance_review(b, boss, 65, "z", db_path=path)
+    return path
+
+
+def test_headcount_and_salary(db_path):
+    rows = {r["group"]: r for r in headcount_and_salary("department", db_path=db_path)}
+    assert rows["Engineering"]["headcount"] == 2
+    assert rows["Engineering"]["avg_salary"] == 77500
+    assert rows["(none)"]["salary_count"] == 0
+    total = headcount_and_salary(None, db_path=db_path)
+    assert total == [{"group": "(all)", "headcount": 4, "salary_count": 3, "min_salary": 70000, "avg_salary": 81666.67, "max_salary": 90000}]
+    with pytest.raises(ValueError):
+        headcount_and_salary("salary; DROP TABLE employee", db_path=db_path)
+
+
+def test_salary_bands(db_path):
+    bands = [(r["band_start"], r["headcount"]) for r in salary_bands(20000, db_path=db_path)]
+    assert bands == [(60000, 1), (80000, 2)]
+
+
+def test_review_score_distribution(db_path):
+    rows = review_score_distribution("position", db_path=db_path)
+    assert len(rows) == 1
+    eng = rows[0]
+    assert (eng["group"], eng["employees_reviewed"], eng["review_count"]) == ("Engineer", 2, 3)
+    assert eng["avg_score"] == 78.33
+    assert eng["buckets"] == {60: 1, 80: 1, 90: 1}
+
+
+def test_hire_cohorts(db_path):
+    rows = {r["cohort"]: r for r in hire_cohorts("year", db_path=db_path)}
+    assert rows["2021"]["headcount"] == 2
+    # Ann averages 85, Bob 65
+    assert rows["2021"]["avg_score"] == 75
+    assert rows["(unknown)"]["headcount"] == 1
+    assert [r["cohort"] for r in hire_cohorts("month", db_path=db_path)][:2] == ["(unknown)", "2020-03"]
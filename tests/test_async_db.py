@@ -0,0 +1,86 @@
+import asyncio
+import inspect
+import threading
+
+import data.async_db as async_db
+from data.async_db import db_tool, io_tool, run_db, shutdown_db_executor, shutdown_io_executor
+from data.insert_data import insert_employee
+from data.query_data import query_employees
+
+
+def test_run_db_does_not_block_the_loop(db_path):
+    insert_employee("Ann", "Wu", "ann@example.com", db_path=db_path)
+    started = []
+    release = threading.Event()
+
+    def slow_query():
+        started.append(threading.current_thread().name)
+        # Only the loop can release the workers, so a blocked loop times out here
+        if not release.wait(timeout=5):
+            raise TimeoutError("event loop was blocked")
+        return threading.current_thread().name, query_employees(db_path=db_path)
+
+    async def wait_until_both_started():
+        while len(started) < 2:
+            await asyncio.sleep(0.001)
+
+    async def main():
+        queries = asyncio.gather(run_db(slow_query), run_db(slow_query))
+        await asyncio.wait_for(wait_until_both_started(), timeout=5)
+        release.set()
+        return await queries
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        shutdown_db_executor()
+    # Both queries were in flight on separate workers while the loop kept running
+    assert len(set(started)) == 2
+    assert all(name.startswith("db") for name, _ in results)
+    assert results[0][1][0]["email"] == "ann@example.com"
+
+
+def test_db_tool_keeps_tool_metadata():
+    def lookup(identifier: str, limit: int = 5) -> dict:
+        """Look something up."""
+        return {"status": "success", "identifier": identifier, "limit": limit}
+
+    tool = db_tool(lookup)
+    assert inspect.iscoroutinefunction(tool)
+    assert tool.__name__ == "lookup" and tool.__doc__ == "Look something up."
+    assert list(inspect.signature(tool).parameters) == ["identifier", "limit"]
+    try:
+        assert asyncio.run(tool("ann", limit=2)) == {"status": "success", "identifier": "ann", "limit": 2}
+    finally:
+        shutdown_db_executor()
+
+
+def test_io_tool_does_not_wait_for_busy_db_workers(monkeypatch):
+    monkeypatch.setattr(async_db, "DEFAULT_MAX_WORKERS", 1)
+    release = threading.Event()
+
+    def slow_query():
+        release.wait(timeout=5)
+        return "db"
+
+    def search(query: str) -> dict:
+        """Search the knowledge base."""
+        return {"status": "success", "thread": threading.current_thread().name}
+
+    tool = io_tool(search)
+    assert tool.__name__ == "search" and list(inspect.signature(tool).parameters) == ["query"]
+
+    async def main():
+        # The only DB worker is busy until the search has finished
+        query = asyncio.ensure_future(run_db(slow_query))
+        result = await asyncio.wait_for(tool("leave policy"), timeout=5)
+        release.set()
+        return result, await query
+
+    try:
+        result, db_result = asyncio.run(main())
+    finally:
+        release.set()
+        shutdown_db_executor()
+        shutdown_io_executor()
+    assert result["thread"].startswith("io") and db_result == "db"
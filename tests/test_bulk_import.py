@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from data.bulk_import import import_employees, import_performance_reviews
+from data.hierarchy import create_hierarchy_index
+from data.insert_data import is_manager_of, resolve_employee_identifier
+from data.query_data import query_reviews_by_employee
+
+
+@pytest.fixture()
+def db_path(db_path):
+    create_hierarchy_index(db_path)
+    return db_path
+
+
+def test_import_employees_and_reviews(db_path, tmp_path):
+    csv_path = tmp_path / "employees.csv"
+    csv_path.write_text(
+        "first_name,last_name,email,department,position,salary,hire_date,supervisor_email\n"
+        "Dev,One,dev@example.com,Eng,Engineer,70000,2024-01-02,boss@example.com\n"
+        "Boss,Two,boss@example.com,Eng,Manager,90000,2020-05-06,\n"
+        "Bad,Row,not-an-email,Eng,Engineer,1,2024-01-01,\n"
+        "Bad,Date,bad.date@example.com,Eng,Engineer,1,01/02/2024,\n",
+        encoding="utf-8",
+    )
+    chunks = []
+    report = import_employees(csv_path, db_path=db_path, chunk_size=1, on_chunk=chunks.append)
+    assert report["inserted"] == 2 and report["updated"] == 0 and report["rejected"] == 2
+    assert [e["line"] for e in report["errors"]] == [4, 5]
+    assert len(chunks) == 2 and all(c["rows"] == 1 for c in chunks)
+
+    dev = resolve_employee_identifier("dev@example.com", db_path=db_path)[0]
+    boss = resolve_employee_identifier("boss@example.com", db_path=db_path)[0]
+    assert dev["supervisor_id"] == boss["id"]
+    assert is_manager_of(boss["id"], dev["id"], db_path=db_path)
+
+    # Re-importing upserts on email instead of failing
+    jsonl_path = tmp_path / "employees.jsonl"
+    jsonl_path.write_text(json.dumps({"first_name": "Dev", "last_name": "One", "email": "dev@example.com", "salary": 75000}) + "\n")
+    report = import_employees(jsonl_path, db_path=db_path)
+    assert report["inserted"] == 0 and report["updated"] == 1
+    dev = resolve_employee_identifier("dev@example.com", db_path=db_path)[0]
+    assert dev["salary"] == 75000 and dev["supervisor_id"] == boss["id"]
+    # Columns missing from the partial file keep their stored values
+    assert (dev["department"], dev["position"], dev["hire_date"]) == ("Eng", "Engineer", "2024-01-02")
+
+    reviews_path = tmp_path / "reviews.jsonl"
+    reviews_path.write_text(
+        "\n".join(
+            json.dumps(r)
+            for r in [
+                {"employee_email": "dev@example.com", "reviewer_email": "boss@example.com", "score": 88, "comments": "solid"},
+                {"employee_email": "ghost@example.com", "reviewer_email": "boss@example.com", "score": 50, "comments": "x"},
+                {"employee_id": dev["id"], "reviewer_employee_id": boss["id"], "score": 101, "comments": "too high"},
+            ]
+        )
+    )
+    report = import_performance_reviews(reviews_path, db_path=db_path)
+    assert report["inserted"] == 1 and report["rejected"] == 2
+    assert [r["comments"] for r in query_reviews_by_employee(db_path=db_path)[dev["id"]]] == ["solid"]
+
+
+def test_out_of_range_numbers_are_rejected_per_row(db_path, tmp_path):
+    path = tmp_path / "employees.jsonl"
+    rows = [
+        {"first_name": "Ok", "last_name": "One", "email": "ok@example.com"},
+        {"first_name": "Big", "last_name": "Sup", "email": "big@example.com", "supervisor_id": "1e400"},
+        {"first_name": "Inf", "last_name": "Pay", "email": "inf@example.com", "salary": "inf"},
+        {"first_name": "Ok", "last_name": "Two", "email": "ok2@example.com"},
+    ]
+    path.write_text("\n".join(json.dumps(r) for r in rows) + "\n")
+    report = import_employees(path, db_path=db_path, chunk_size=1)
+    assert report["inserted"] == 2 and report["rejected"] == 2
+    assert [e["line"] for e in report["errors"]] == [2, 3]
@@ -0,0 +1,58 @@
+from chunker import chunk_markdown, split_text
+
+POLICY = """# 公司文化
+
+## 1. 誠信正直 (Integrity)
+
+我們堅持最高的道德標準。
+
+## 2. 團隊合作 (Teamwork)
+
+透過協作達成共同目標。
+
+# 考核標準
+
+## 評分等級
+
+- S: 卓越
+- A: 優秀
+"""
+
+
+def test_small_sibling_sections_are_packed_under_their_heading_path():
+    chunks = chunk_markdown(POLICY, max_chars=200)
+    assert [c["headings"] for c in chunks] == [["公司文化"], ["考核標準", "評分等級"]]
+    # No bare-heading fragments; headings stay as Markdown lines
+    assert chunks[0]["text"].startswith("# 公司文化\n\n## 1. 誠信正直 (Integrity)\n\n我們堅持")
+    assert "## 2. 團隊合作 (Teamwork)" in chunks[0]["text"]
+    assert chunks[1]["text"] == "# 考核標準\n## 評分等級\n\n- S: 卓越\n- A: 優秀"
+
+
+def test_sections_that_do_not_fit_together_are_separate_chunks():
+    chunks = chunk_markdown(POLICY, max_chars=60)
+    assert [c["headings"] for c in chunks] == [
+        ["公司文化", "1. 誠信正直 (Integrity)"],
+        ["公司文化", "2. 團隊合作 (Teamwork)"],
+        ["考核標準", "評分等級"],
+    ]
+    assert all(len(c["text"]) <= 60 for c in chunks)
+
+
+def test_long_sections_are_split_with_overlap_and_bounded_size():
+    body = "".join(f"第{i}句話說明公司的規範。" for i in range(60))
+    chunks = chunk_markdown("## 規範\n\n" + body, max_chars=120, overlap=20)
+    assert len(chunks) > 1
+    assert all(len(c["text"]) <= 120 and c["text"].startswith("## 規範\n\n") for c in chunks)
+    # Cuts fall on sentence ends, and each piece repeats the tail of the previous one
+    pieces = [c["text"][len("## 規範\n\n"):] for c in chunks]
+    assert all(p.endswith("。") for p in pieces)
+    assert pieces[0][-10:] in pieces[1]
+
+
+def test_headings_inside_code_fences_are_ignored():
+    chunks = chunk_markdown("# Guide\n\n```\n# not a heading\n```\n")
+    assert len(chunks) == 1 and chunks[0]["headings"] == ["Guide"]
+
+
+def test_split_text_hard_cuts_without_boundaries():
+    assert split_text("a" * 50, 20, 5) == ["a" * 20, "a" * 20, "a" * 20]
@@ -0,0 +1,51 @@
+import sqlite3
+import threading
+
+import pytest
+
+from data.connection import get_connection, transaction
+from data.insert_data import insert_employee
+
+
+@pytest.fixture()
+def db_path(db_file):
+    path = db_file
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE employee (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT, last_name TEXT, email TEXT UNIQUE,
+            department TEXT, position TEXT, salary REAL, hire_date TEXT,
+            supervisor_id INTEGER
+        );
+        """
+    )
+    conn.close()
+    return path
+
+
+def test_connection_is_pooled_per_thread(db_path):
+    conn = get_connection(db_path)
+    assert get_connection(str(db_path)) is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(get_connection(db_path)))
+    t.start()
+    t.join()
+    assert other[0] is not conn
+
+
+def test_nested_helpers_share_outer_transaction(db_path):
+    with pytest.raises(RuntimeError):
+        with transaction(db_path):
+            insert_employee("A", "One", "a@example.com", db_path=db_path)
+            insert_employee("B", "Two", "b@example.com", db_path=db_path)
+            raise RuntimeError("abort")
+    assert get_connection(db_path).execute("SELECT COUNT(*) FROM employee").fetchone()[0] == 0
+
+    with transaction(db_path):
+        insert_employee("A", "One", "a@example.com", db_path=db_path)
+        insert_employee("B", "Two", "b@example.com", db_path=db_path)
+    assert get_connection(db_path).execute("SELECT COUNT(*) FROM employee").fetchone()[0] == 2
@@ -0,0 +1,157 @@
+import sqlite3
+
+import pytest
+
+from data.connection import get_connection
+from data.insert_data import insert_employee, insert_performance_review
+
+
+@pytest.fixture()
+def agent(db_path, import_agent):
+    mod = import_agent(db_path)
+    mod.policy = {"policy_text": "", "rules": [], "chunks": [], "embeddings": []}
+    mod._load_policy_context = lambda: mod.policy
+    mod.db_path = db_path
+    return mod
+
+
+def _ids(result):
+    return {item["employee"]["id"]: [r["review_id"] for r in item["reasons"]] for item in result["employees"]}
+
+
+def test_incremental_scan_processes_only_new_reviews(agent):
+    db = agent.db_path
+    boss = insert_employee("Boss", "Lee", "boss@example.com", db_path=db)
+    ann = insert_employee("Ann", "Wu", "ann@example.com", db_path=db)
+    r1 = insert_performance_review(ann, boss, 50, "他有時隱瞞資訊", db_path=db)
+    insert_performance_review(ann, boss, 90, "表現良好", db_path=db)
+
+    first = agent.find_culture_misaligned_employees()
+    assert first["scan"]["reviews_scanned"] == 2 and first["scan"]["full_rescan"]
+    assert _ids(first) == {ann: [r1]}
+
+    conn = get_connection(db)
+    changes = conn.total_changes
+    again = agent.find_culture_misaligned_employees()
+    assert again["scan"]["reviews_scanned"] == 0
+    # Nothing new: the scan commits nothing, so a snapshot would not be refreshed
+    assert conn.total_changes == changes
+    assert again["employees"] == first["employees"]
+
+    r3 = insert_performance_review(boss, ann, 60, "poor collaboration this quarter", db_path=db)
+    third = agent.find_culture_misaligned_employees()
+    assert third["scan"]["reviews_scanned"] == 1
+    assert _ids(third) == {boss: [r3], ann: [r1]}
+
+
+def test_edits_deletes_and_rule_changes(agent):
+    db = agent.db_path
+    boss = insert_employee("Boss", "Lee", "boss@example.com", db_path=db)
+    ann = insert_employee("Ann", "Wu", "ann@example.com", db_path=db)
+    r1 = insert_performance_review(ann, boss, 50, "他有時隱瞞資訊", db_path=db)
+    r2 = insert_performance_review(ann, boss, 80, "按時交付", db_path=db)
+    r3 = insert_performance_review(boss, ann, 80, "文化不符", db_path=db)
+    assert _ids(agent.find_culture_misaligned_employees()) == {ann: [r1], boss: [r3]}
+
+    conn = get_connection(db)
+    conn.execute("UPDATE performance_review SET comments = '按時交付但抗拒改變' WHERE id = ?", (r2,))
+    conn.execute("DELETE FROM performance_review WHERE id = ?", (r3,))
+    res = agent.find_culture_misaligned_employees()
+    # Only the edited review onward is rescanned
+    assert res["scan"]["reviews_scanned"] == 1
+    assert sorted(_ids(res)[ann]) == [r1, r2] and boss not in _ids(res)
+
+    # New policy-derived rule: everything is rescanned
+    agent.policy = {"policy_text": "x", "rules": [{"dimension": "準時", "description": "", "triggers": ["按時交付"]}], "chunks": [], "embeddings": []}
+    res = agent.find_culture_misaligned_employees()
+    assert res["scan"]["full_rescan"] and res["scan"]["reviews_scanned"] == 2
+    dims = [r["dimension"] for r in res["employees"][0]["reasons"]]
+    assert dims.count("準時") == 1
+    assert conn.execute("SELECT COUNT(*) FROM culture_flag").fetchone()[0] == 3
+
+
+def test_state_and_flag_reads_only_tolerate_missing_tables(db_path):
+    from data.culture_flags import get_culture_scan_state, query_culture_flags
+
+    assert get_culture_scan_state(db_path) is None and query_culture_flags(db_path) == []
+    # Broken tables are errors, not "never scanned" (which would force a full rescan)
+    conn = get_connection(db_path)
+    conn.execute("CREATE TABLE culture_scan_state (id INTEGER PRIMARY KEY)")
+    conn.execute("CREATE TABLE culture_flag (id INTEGER PRIMARY KEY)")
+    with pytest.raises(sqlite3.OperationalError, match="no such column"):
+        get_culture_scan_state(db_path)
+    with pytest.raises(sqlite3.OperationalError, match="no such column"):
+        query_culture_flags(db_path)
+
+
+def test_concurrent_scans_do_not_duplicate_flags(agent, monkeypatch):
+    import threading
+
+    db = agent.db_path
+    boss = insert_employee("Boss", "Lee", "boss@example.com", db_path=db)
+    ann = insert_employee("Ann", "Wu", "ann@example.com", db_path=db)
+    r1 = insert_performance_review(ann, boss, 50, "他有時隱瞞資訊", db_path=db)
+    r2 = insert_performance_review(ann, boss, 60, "poor collaboration this quarter", db_path=db)
+
+    # Hold each scan just after it read the watermark, so unserialized scans
+    # would both start from the same point
+    read_state = agent.get_culture_scan_state
+    both_read = threading.Barrier(2)
+
+    def get_state_and_wait():
+        state = read_state()
+        try:
+            both_read.wait(timeout=0.5)
+        except threading.BrokenBarrierError:
+            pass
+        return state
+
+    monkeypatch.setattr(agent, "get_culture_scan_state", get_state_and_wait)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(agent.find_culture_misaligned_employees())) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(r["scan"]["reviews_scanned"] for r in results) == [0, 2]
+    assert all(list(_ids(r)) == [ann] and sorted(_ids(r)[ann]) == [r1, r2] for r in results)
+    assert get_connection(db).execute("SELECT COUNT(*) FROM culture_flag").fetchone()[0] == 2
+
+
+def test_duplicate_flags_are_ignored_and_cleaned_up(db_path):
+    from data.culture_flags import create_culture_flag_tables, save_culture_flags
+
+    create_culture_flag_tables(db_path)
+    flag = {"review_id": 1, "employee_id": 1, "kind": "keyword", "dimension": "誠信"}
+    assert save_culture_flags([flag], 1, "v", db_path=db_path) == 1
+    assert save_culture_flags([flag], 1, "v", db_path=db_path) == 0
+
+    # A DB written before the unique index existed is de-duplicated on open
+    conn = get_connection(db_path)
+    conn.execute("DROP INDEX idx_culture_flag_unique")
+    conn.execute("INSERT INTO culture_flag (review_id, employee_id, kind, dimension) VALUES (1, 1, 'keyword', '誠信')")
+    create_culture_flag_tables(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM culture_flag").fetchone()[0] == 1
+
+
+def test_culture_scan_tool_runs_on_the_io_pool(agent):
+    import asyncio
+    import threading
+
+    from data.async_db import shutdown_io_executor
+
+    threads = []
+
+    def load_policy():
+        threads.append(threading.current_thread().name)
+        return agent.policy
+
+    agent._load_policy_context = load_policy
+    tool = next(t for t in agent.root_agent.tools if t.__name__ == "find_culture_misaligned_employees")
+    try:
+        assert asyncio.run(tool())["status"] == "success"
+    finally:
+        shutdown_io_executor()
+    # Embedding calls during the scan must not hold one of the few DB workers
+    assert threads and threads[0].startswith("io")
@@ -0,0 +1,50 @@
+from culture_matcher import CultureMatcher, get_culture_matcher, rule_set_version
+
+
+RULES = [
+    {"dimension": "誠信", "description": "d1", "triggers": ["隱瞞資訊", "隱瞞", "Integrity Issue"]},
+    {"dimension": "團隊", "description": "d2", "triggers": ["缺乏團隊", "團隊"]},
+    {"dimension": "bad", "description": "d3", "triggers": [None, 3, "she"]},
+]
+
+
+def _substring_matches(comment, rules):
+    # Reference behaviour: first listed trigger contained in the comment, per rule
+    out = []
+    for r in rules:
+        for t in r["triggers"]:
+            if isinstance(t, str) and t.lower() in comment.lower():
+                out.append({"dimension": r["dimension"], "phrase": t, "description": r["description"], "comment": comment})
+                break
+    return out
+
+
+def test_matches_substring_semantics():
+    matcher = CultureMatcher(RULES)
+    for comment in [
+        "他有時隱瞞資訊，缺乏團隊精神",
+        "只有隱瞞",
+        "an INTEGRITY ISSUE was raised; he shares",
+        "團隊合作良好",
+        "nothing here",
+        "ushers",
+    ]:
+        assert matcher.match(comment) == _substring_matches(comment, RULES)
+    # Earliest-listed trigger wins even if a later one occurs first in the text
+    assert matcher.match("隱瞞……隱瞞資訊")[0]["phrase"] == "隱瞞資訊"
+    assert matcher.match("") == []
+
+
+def test_overlapping_and_suffix_patterns():
+    rules = [{"dimension": "x", "description": "", "triggers": ["abcd", "bc"]}, {"dimension": "y", "description": "", "triggers": ["cde"]}]
+    matcher = CultureMatcher(rules)
+    assert [m["phrase"] for m in matcher.match("zabcdez")] == ["abcd", "cde"]
+    assert [m["phrase"] for m in matcher.match("abce")] == ["bc"]
+
+
+def test_compiled_once_per_rule_set_version():
+    a = get_culture_matcher(RULES)
+    assert get_culture_matcher([dict(r) for r in RULES]) is a
+    changed = RULES[:1] + [{"dimension": "團隊", "description": "d2", "triggers": ["合作不足"]}]
+    assert rule_set_version(changed) != a.version
+    assert get_culture_matcher(changed) is not a
@@ -0,0 +1,153 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from data.connection import close_all_connections
+from embedding_cache import EmbeddingCache
+
+
+@pytest.fixture()
+def cache(tmp_path):
+    yield EmbeddingCache(tmp_path / "embedding_cache.db", max_rows=3)
+    close_all_connections()
+
+
+def test_embed_only_calls_for_uncached_distinct_texts(cache):
+    calls = []
+
+    def embed_fn(texts):
+        calls.append(list(texts))
+        return [[float(len(t)), 0.5] for t in texts]
+
+    first = cache.embed("m", ["alpha", "beta", "alpha"], embed_fn)
+    assert first == [[5.0, 0.5], [4.0, 0.5], [5.0, 0.5]]
+    assert calls == [["alpha", "beta"]]
+    # Whitespace-only differences share an entry; other models do not
+    assert cache.embed("m", ["  alpha\n", "beta"], embed_fn) == [[5.0, 0.5], [4.0, 0.5]]
+    assert len(calls) == 1
+    cache.embed("other", ["alpha"], embed_fn)
+    assert len(calls) == 2
+    assert cache.stats()["hits"] == 2
+
+
+def test_failed_embeddings_are_not_stored(cache):
+    assert cache.embed("m", ["x"], lambda texts: [[0.0] * 4 for _ in texts]) == [[0.0] * 4]
+    assert cache.get_many("m", ["x"]) == [None]
+
+
+def test_float32_storage_and_lru_eviction(cache, monkeypatch):
+    import embedding_cache as mod
+
+    clock = iter(range(100, 200))
+    monkeypatch.setattr(mod.time, "time", lambda: next(clock))
+    cache.touch_seconds = 1
+    for text, first in (("a", 0.1), ("b", 0.2), ("c", 0.3)):
+        cache.put_many("m", [text], [[first, 1.0]])
+    assert cache.get_many("m", ["a"])[0] == pytest.approx([0.1, 1.0], rel=1e-6)
+    # "a" was just used, so "b" is the least recently used and goes first
+    cache.put_many("m", ["d"], [[0.4, 1.0]])
+    assert [v is not None for v in cache.get_many("m", ["a", "b", "c", "d"])] == [True, False, True, True]
+    assert cache.stats()["rows"] == 3 and cache.stats()["evictions"] == 1
+
+
+def test_hits_only_bump_last_used_after_touch_interval(cache, monkeypatch):
+    import embedding_cache as mod
+
+    now = [1000]
+    monkeypatch.setattr(mod.time, "time", lambda: now[0])
+    cache.touch_seconds = 60
+    cache.put_many("m", ["a"], [[0.1, 1.0]])
+    conn = cache._conn()
+
+    def last_used():
+        return conn.execute("SELECT last_used FROM embedding").fetchone()[0]
+
+    changes = conn.total_changes
+    now[0] += 59
+    assert cache.get_many("m", ["a"])[0] is not None
+    # A warm hit inside the interval reads only: no UPDATE, no write transaction
+    assert conn.total_changes == changes and last_used() == 1000
+    now[0] += 1
+    cache.get_many("m", ["a"])
+    assert last_used() == 1060
+
+
+class StubModels:
+    """Local stand-in for `genai.Client().models`: one [len(text), i] vector per content."""
+
+    def __init__(self, fail_times=0, code=None):
+        self.calls = []
+        self.fail_times = fail_times
+        self.code = code
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def embed_content(self, model, contents):
+        with self._lock:
+            self.calls.append(list(contents))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fail = self.fail_times > 0
+            self.fail_times -= 1
+        try:
+            time.sleep(0.01)
+            if fail:
+                err = RuntimeError("stub failure")
+                err.code = self.code
+                raise err
+            return SimpleNamespace(embeddings=[SimpleNamespace(values=[float(len(t)), float(i)]) for i, t in enumerate(contents)])
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture
+def rag_tool(tmp_path, mock_external_deps):
+    import importlib
+
+    import rag_tool
+
+    rag_tool = importlib.reload(rag_tool)
+    rag_tool.embedding_cache = EmbeddingCache(tmp_path / "embedding_cache.db")
+    yield rag_tool
+    close_all_connections()
+
+
+def test_rag_embedding_function_uses_cache(rag_tool):
+    models = StubModels()
+    rag_tool.client.models = models
+    ef = rag_tool.GoogleGenAIEmbeddingFunction()
+    assert ef(["hello", "world"]) == [[5.0, 0.0], [5.0, 1.0]]
+    assert ef(["hello"]) == [[5.0, 0.0]]
+    assert models.calls == [["hello", "world"]]
+
+
+def test_embedding_batches_are_bounded_and_ordered(rag_tool):
+    models = StubModels()
+    ef = rag_tool.GoogleGenAIEmbeddingFunction(client=SimpleNamespace(models=models), batch_size=3)
+    texts = [f"text {i:02d}" for i in range(10)]
+    vectors = ef._embed_uncached(texts)
+    assert sorted(len(c) for c in models.calls) == [1, 3, 3, 3]
+    assert vectors == [[7.0, float(i % 3)] for i in range(10)]
+    assert 1 < models.max_in_flight <= rag_tool.EMBEDDING_MAX_CONCURRENCY
+
+
+def test_embedding_retries_transient_errors(rag_tool):
+    models = StubModels(fail_times=2, code=503)
+    ef = rag_tool.GoogleGenAIEmbeddingFunction(client=SimpleNamespace(models=models), max_retries=2, retry_base_delay=0)
+    assert ef._embed_uncached(["a", "bb"]) == [[1.0, 0.0], [2.0, 1.0]]
+    assert len(models.calls) == 3
+
+
+def test_embedding_failures_raise_instead_of_zero_vectors(rag_tool):
+    models = StubModels(fail_times=1, code=400)
+    ef = rag_tool.GoogleGenAIEmbeddingFunction(client=SimpleNamespace(models=models), max_retries=3, retry_base_delay=0)
+    with pytest.raises(rag_tool.EmbeddingError) as exc:
+        ef(["a", "bb"])
+    # Client errors are not retried, and nothing was cached
+    assert len(models.calls) == 1
+    assert exc.value.failed == [0, 1]
+    assert rag_tool.embedding_cache.stats()["rows"] == 0
@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+
+from data import employee_cache as cache_module
+from data.delete_data import delete_employee_by_id
+from data.employee_cache import EmployeeCache, employee_cache, employee_cache_stats
+from data.insert_data import insert_employee, resolve_employee_identifier
+from data.update_data import update_employee_by_id
+
+
+@pytest.fixture()
+def db_path(db_path):
+    employee_cache.invalidate_all()
+    employee_cache.reset_stats()
+    return db_path
+
+
+def _write_from_other_process(db_path, emp, salary):
+    other = sqlite3.connect(db_path)
+    other.execute("UPDATE employee SET salary = ? WHERE id = ?", (salary, emp))
+    other.commit()
+    other.close()
+
+
+def test_lookups_hit_cache_and_writes_invalidate(db_path):
+    emp = insert_employee("Ann", "Wu", "ann@example.com", salary=1, db_path=db_path)
+
+    assert resolve_employee_identifier(emp, db_path=db_path)[0]["salary"] == 1
+    assert resolve_employee_identifier("ann@example.com", db_path=db_path)[0]["id"] == emp
+    assert resolve_employee_identifier(str(emp), db_path=db_path)[0]["id"] == emp
+    stats = employee_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+
+    update_employee_by_id(emp, {"salary": 2, "email": "ann.wu@example.com"}, db_path=db_path)
+    assert resolve_employee_identifier(emp, db_path=db_path)[0]["salary"] == 2
+    assert resolve_employee_identifier("ann@example.com", db_path=db_path) == []
+
+    delete_employee_by_id(emp, db_path=db_path)
+    assert resolve_employee_identifier(emp, db_path=db_path) == []
+
+
+def test_writes_from_other_connections_are_detected(db_path, monkeypatch):
+    monkeypatch.setattr(employee_cache, "check_seconds", 0)
+    emp = insert_employee("Ann", "Wu", "ann@example.com", salary=1, db_path=db_path)
+    assert resolve_employee_identifier(emp, db_path=db_path)[0]["salary"] == 1
+
+    _write_from_other_process(db_path, emp, 3)
+    assert resolve_employee_identifier(emp, db_path=db_path)[0]["salary"] == 3
+
+
+def test_data_version_is_checked_once_per_interval(db_path, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(employee_cache, "check_seconds", 1.0)
+    emp = insert_employee("Ann", "Wu", "ann@example.com", salary=1, db_path=db_path)
+    assert resolve_employee_identifier(emp, db_path=db_path)[0]["salary"] == 1
+
+    # Within the interval an outside write is not seen yet...
+    _write_from_other_process(db_path, emp, 3)
+    clock[0] += 0.5
+    assert resolve_employee_identifier(emp, db_path=db_path)[0]["salary"] == 1
+    # ...after it, the data_version check drops the stale row
+    clock[0] += 1.0
+    assert resolve_employee_identifier(emp, db_path=db_path)[0]["salary"] == 3
+
+
+def test_put_is_skipped_if_invalidated_since_the_read():
+    cache = EmployeeCache(check_seconds=float("inf"))
+    cache._checked_at["db"] = 0.0
+    generation = cache.generation("db")
+    # A writer invalidates between this reader's SELECT and its put
+    cache.invalidate("db", [1])
+    assert not cache.put("db", {"id": 1, "email": "a@example.com"}, generation)
+    assert cache.get_by_id("db", 1) is None
+    assert cache.put("db", {"id": 1, "email": "a@example.com"}, cache.generation("db"))
+    assert cache.get_by_email("db", "a@example.com")["id"] == 1
+
+
+def test_cache_is_bounded():
+    cache = EmployeeCache(maxsize=2)
+    for i in range(3):
+        cache.put("db", {"id": i, "email": f"e{i}@example.com"})
+    assert cache.stats()["size"] == 2 and cache.stats()["evictions"] == 1
+    assert "e0@example.com" not in {email for _, email in cache._emails}
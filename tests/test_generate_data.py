@@ -0,0 +1,38 @@
+import pytest
+
+from data.connection import get_connection
+from data.generate_data import generate_org, populate_database
+from data.hierarchy import get_reports
+
+
+def test_generate_org_is_deterministic():
+    a = generate_org(employees=200, depth=4, seed=7)
+    b = generate_org(employees=200, depth=4, seed=7)
+    assert a == b
+    assert generate_org(employees=200, depth=4, seed=8) != a
+    assert a[2]["depth"] == 4
+
+
+def test_generate_org_rejects_single_level_with_many_employees():
+    with pytest.raises(ValueError, match="depth=1"):
+        generate_org(employees=2, depth=1)
+    employees, reviews, _ = generate_org(employees=1, depth=1)
+    assert len(employees) == 1 and employees[0]["supervisor_email"] is None and reviews == []
+
+
+def test_populate_database_loads_org(db_file):
+    summary = populate_database(db_file, employees=300, depth=5, reviews_per_employee=2, culture_trigger_rate=0.2, seed=1)
+    conn = get_connection(db_file)
+    assert conn.execute("SELECT COUNT(*) FROM employee").fetchone()[0] == 300
+    assert conn.execute("SELECT COUNT(*) FROM performance_review").fetchone()[0] == summary["reviews"]
+    assert conn.execute("SELECT COUNT(*) FROM employee WHERE supervisor_id IS NULL").fetchone()[0] == 1
+
+    root = conn.execute("SELECT id FROM employee WHERE email = 'emp000000@example.com'").fetchone()[0]
+    assert len(get_reports(root, direct_only=False, db_path=db_file)) == 299
+    max_depth = conn.execute("SELECT MAX(depth) FROM employee_hierarchy").fetchone()[0]
+    assert max_depth == 4
+
+    planted = conn.execute(
+        "SELECT COUNT(*) FROM performance_review WHERE comments LIKE '%However, there is a%' OR comments LIKE '%但有%的情況。%'"
+    ).fetchone()[0]
+    assert planted == summary["culture_trigger_reviews"] > 0
@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+from data.connection import get_connection
+from data.delete_data import delete_employee_by_id
+from data.hierarchy import create_hierarchy_index, get_reports, is_ancestor, rebuild_hierarchy_index
+from data.insert_data import insert_employee, is_manager_of
+from data.update_data import update_employee_by_id
+
+
+def _org(db_path):
+    ceo = insert_employee("Ceo", "A", "ceo@example.com", db_path=db_path)
+    vp = insert_employee("Vp", "B", "vp@example.com", supervisor_id=ceo, db_path=db_path)
+    mgr = insert_employee("Mgr", "C", "mgr@example.com", supervisor_id=vp, db_path=db_path)
+    dev = insert_employee("Dev", "D", "dev@example.com", supervisor_id=mgr, db_path=db_path)
+    return ceo, vp, mgr, dev
+
+
+def _closure(db_path):
+    return sorted(tuple(r) for r in get_connection(db_path).execute("SELECT * FROM employee_hierarchy"))
+
+
+def test_triggers_keep_closure_table_in_sync(db_path):
+    create_hierarchy_index(db_path)
+    ceo, vp, mgr, dev = _org(db_path)
+
+    assert is_manager_of(ceo, dev, db_path=db_path)
+    assert not is_manager_of(dev, ceo, db_path=db_path)
+    assert not is_manager_of(dev, dev, db_path=db_path)
+    assert [r["id"] for r in get_reports(vp, db_path=db_path)] == [mgr, dev]
+    assert [r["id"] for r in get_reports(ceo, direct_only=True, db_path=db_path)] == [vp]
+
+    # Re-parent the manager's subtree directly under the CEO
+    update_employee_by_id(mgr, {"supervisor_id": ceo}, db_path=db_path)
+    assert not is_manager_of(vp, dev, db_path=db_path)
+    assert is_manager_of(ceo, dev, db_path=db_path)
+
+    delete_employee_by_id(mgr, db_path=db_path)
+    assert not is_manager_of(ceo, dev, db_path=db_path)
+
+    incremental = _closure(db_path)
+    rebuild_hierarchy_index(db_path)
+    assert _closure(db_path) == incremental
+
+
+def test_supervisor_cycles_are_rejected(db_path):
+    create_hierarchy_index(db_path)
+    ceo, vp, mgr, dev = _org(db_path)
+    with pytest.raises(sqlite3.IntegrityError):
+        update_employee_by_id(ceo, {"supervisor_id": dev}, db_path=db_path)
+    with pytest.raises(sqlite3.IntegrityError):
+        update_employee_by_id(ceo, {"supervisor_id": ceo}, db_path=db_path)
+
+
+def test_fallback_without_closure_table_survives_cycles(db_path):
+    ceo, vp, mgr, dev = _org(db_path)
+    # Legacy data with a loop: no closure table, so nothing rejects this
+    update_employee_by_id(ceo, {"supervisor_id": dev}, db_path=db_path)
+
+    assert is_ancestor(vp, dev, db_path=db_path)
+    assert not is_ancestor(999, dev, db_path=db_path)
+    assert {r["id"] for r in get_reports(mgr, db_path=db_path)} == {dev, ceo, vp}
+
+    # Building the index over looping data still terminates
+    create_hierarchy_index(db_path)
+    assert is_ancestor(vp, dev, db_path=db_path)
+
+
+def test_other_errors_are_not_masked_by_the_fallback(db_path):
+    ceo, vp, mgr, dev = _org(db_path)
+    # A broken closure table is an error, not a reason to silently walk the chain
+    get_connection(db_path).execute("CREATE TABLE employee_hierarchy (ancestor_id INTEGER, descendant_id INTEGER)")
+    with pytest.raises(sqlite3.OperationalError, match="no such column"):
+        is_ancestor(ceo, dev, db_path=db_path)
+    with pytest.raises(sqlite3.OperationalError, match="no such column"):
+        get_reports(ceo, db_path=db_path)
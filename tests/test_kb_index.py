@@ -0,0 +1,180 @@
+import functools
+import sys
+
+import pytest
+
+from chunker import chunk_markdown
+from data.connection import close_all_connections
+
+
+@pytest.fixture
+def rag(tmp_path, mock_external_deps):
+    import importlib
+
+    import rag_tool
+    from embedding_cache import EmbeddingCache
+    from kb_manifest import IndexManifest
+
+    rag_tool = importlib.reload(rag_tool)
+    rag_tool.embedding_cache = EmbeddingCache(tmp_path / "embedding_cache.db")
+    kb = tmp_path / "kb"
+    kb.mkdir()
+    rag_tool.KNOWLEDGE_BASE_PATH = kb
+    rag_tool._manifest = IndexManifest(tmp_path / "chroma" / "kb_manifest.json")
+    # Small chunks so each top-level section below is its own chunk
+    rag_tool.chunk_markdown = functools.partial(chunk_markdown, max_chars=12, overlap=0)
+    collection = sys.modules["chromadb"].PersistentClient().get_or_create_collection("kb")
+    upserts = []
+    original_upsert = collection.upsert
+
+    def recording_upsert(documents=(), ids=(), metadatas=None):
+        upserts.append(list(ids))
+        original_upsert(documents=documents, ids=ids, metadatas=metadatas)
+
+    collection.upsert = recording_upsert
+    rag_tool._get_collection = lambda: collection
+    rag_tool.collection = collection
+    rag_tool.upserts = upserts
+    yield rag_tool
+    close_all_connections()
+
+
+def test_only_changed_chunks_are_upserted_and_stale_ids_deleted(rag):
+    path = rag.KNOWLEDGE_BASE_PATH / "policy.md"
+    path.write_text("# A\nalpha\n\n# B\nbeta\n\n# C\ngamma", encoding="utf-8")
+    stats = rag._index_documents()
+    assert stats["chunks_upserted"] == 3
+    assert sorted(rag.collection.docs) == ["policy.md_0", "policy.md_1", "policy.md_2"]
+    assert rag.collection.docs["policy.md_1"] == ("# B\n\nbeta", {"source": "policy.md", "headings": "B"})
+
+    # Unchanged files are skipped without reading them
+    assert rag._index_documents()["files_indexed"] == 0
+
+    # Editing one chunk and dropping the last re-embeds one chunk and deletes the stale id
+    path.write_text("# A\nalpha\n\n# B\nBETA", encoding="utf-8")
+    stats = rag._index_documents()
+    assert rag.upserts[-1] == ["policy.md_1"]
+    assert stats["chunks_deleted"] == 1
+    assert sorted(rag.collection.docs) == ["policy.md_0", "policy.md_1"]
+
+    # Removing the file deletes its chunks
+    path.unlink()
+    stats = rag._index_documents()
+    assert stats["files_removed"] == 1 and rag.collection.docs == {}
+
+
+def test_existing_store_without_manifest_is_not_reembedded(rag):
+    (rag.KNOWLEDGE_BASE_PATH / "policy.md").write_text("# A\none\n\n# B\ntwo", encoding="utf-8")
+    rag._index_documents()
+    rag._manifest.clear()
+    rag.upserts.clear()
+    stats = rag._index_documents()
+    assert rag.upserts == [] and stats["files_indexed"] == 1
+    assert rag._manifest.chunk_count() == 2
+
+
+def test_chunker_change_rebuilds_unchanged_files(rag):
+    (rag.KNOWLEDGE_BASE_PATH / "policy.md").write_text("# A\none\n\n# B\ntwo", encoding="utf-8")
+    rag._index_documents()
+    rag.CHUNKER_VERSION = "other-settings"
+    rag.chunk_markdown = chunk_markdown
+    stats = rag._index_documents()
+    assert stats["files_indexed"] == 1 and stats["chunks_deleted"] == 1
+    assert list(rag.collection.docs) == ["policy.md_0"]
+
+
+def test_queries_skip_indexing_while_files_are_unchanged(rag):
+    path = rag.KNOWLEDGE_BASE_PATH / "policy.md"
+    path.write_text("one", encoding="utf-8")
+    calls = []
+    original = rag._index_documents
+    rag._index_documents = lambda: calls.append(1) or original()
+    rag.search_company_policies("one")
+    rag.search_company_policies("one")
+    assert calls == [1]
+    path.write_text("one\n\ntwo", encoding="utf-8")
+    rag.search_company_policies("two")
+    assert calls == [1, 1]
+
+
+def test_queries_leave_indexing_to_the_background_indexer(rag, monkeypatch):
+    (rag.KNOWLEDGE_BASE_PATH / "policy.md").write_text("one", encoding="utf-8")
+    monkeypatch.setenv("KB_BACKGROUND_INDEXER", "1")
+    indexer = rag.start_background_indexer()
+    try:
+        assert rag.start_background_indexer() is indexer
+        assert indexer.wait_until_idle()
+        assert sorted(rag.collection.docs) == ["policy.md_0"]
+        calls = []
+        rag._ensure_index = lambda *a, **k: calls.append(1)
+        rag.search_company_policies("one")
+        assert calls == []
+        status = rag.index_status()
+        assert status["chunks"] == 1 and status["indexer"]["runs"] == 1
+    finally:
+        rag.stop_background_indexer()
+
+
+def test_chroma_client_and_collection_are_shared(mock_external_deps):
+    import importlib
+    import threading
+
+    import rag_tool
+
+    rag_tool = importlib.reload(rag_tool)
+    opened = []
+    base = rag_tool.chromadb.PersistentClient
+
+    class CountingClient(base):
+        def __init__(self, path=None):
+            opened.append(path)
+            super().__init__(path)
+
+    rag_tool.chromadb.PersistentClient = CountingClient
+    try:
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(rag_tool._get_collection())) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(opened) == 1 and all(c is results[0] for c in results)
+
+        reloaded = rag_tool.reload_collection()
+        assert reloaded is not results[0] and len(opened) == 2
+        assert rag_tool._get_collection() is reloaded
+
+        rag_tool.close_collection()
+        assert rag_tool._collection is None and len(opened) == 2
+    finally:
+        rag_tool.chromadb.PersistentClient = base
+        rag_tool.close_collection()
+
+
+def test_repeated_queries_are_served_from_memory(rag):
+    path = rag.KNOWLEDGE_BASE_PATH / "policy.md"
+    path.write_text("one", encoding="utf-8")
+    embedded, searched = [], []
+
+    class QueryEmbedding:
+        def __call__(self, texts):
+            embedded.append(list(texts))
+            return [[1.0, 0.0] for _ in texts]
+
+    rag._query_embedding_fn = QueryEmbedding()
+    original_query = rag.collection.query
+
+    def recording_query(*a, **k):
+        searched.append(k["query_embeddings"])
+        return original_query(*a, **k)
+
+    rag.collection.query = recording_query
+    first = rag.search_company_policies("Culture policy")
+    assert rag.search_company_policies("culture  POLICY") == first
+    assert len(embedded) == 1 and len(searched) == 1
+
+    # Changing the knowledge base invalidates the result, not the query embedding
+    path.write_text("one\n\ntwo", encoding="utf-8")
+    rag.search_company_policies("culture policy")
+    assert len(embedded) == 1 and len(searched) == 2
+    assert rag.index_status()["query_cache"]["hits"] == 1
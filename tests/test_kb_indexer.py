@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+from kb_indexer import KnowledgeBaseIndexer
+
+
+@pytest.fixture
+def kb(tmp_path):
+    path = tmp_path / "kb"
+    path.mkdir()
+    (path / "policy.md").write_text("one", encoding="utf-8")
+    return path
+
+
+def make_indexer(kb, index_fn, **kwargs):
+    kwargs.setdefault("debounce_seconds", 0.05)
+    kwargs.setdefault("poll_seconds", 0.05)
+    return KnowledgeBaseIndexer(kb, index_fn, use_watchdog=False, **kwargs)
+
+
+def test_indexes_at_start_and_after_changes(kb):
+    runs = []
+    indexer = make_indexer(kb, lambda: runs.append(1) or {"files_indexed": 1}).start()
+    try:
+        assert indexer.wait_until_idle()
+        assert len(runs) == 1
+        status = indexer.status()
+        assert status["mode"] == "polling" and not status["pending"] and status["lag_seconds"] == 0.0
+        assert status["last_stats"] == {"files_indexed": 1}
+
+        (kb / "policy.md").write_text("one\n\ntwo", encoding="utf-8")
+        deadline = time.time() + 5
+        while len(runs) < 2 and time.time() < deadline:
+            time.sleep(0.02)
+        assert indexer.wait_until_idle() and len(runs) == 2
+    finally:
+        indexer.stop()
+    assert not indexer.running
+
+
+def test_bursts_of_changes_are_debounced(kb):
+    runs = []
+    indexer = make_indexer(kb, lambda: runs.append(1), debounce_seconds=0.3, poll_seconds=60)
+    indexer.start()
+    try:
+        for _ in range(5):
+            indexer.notify_change()
+            time.sleep(0.02)
+        assert indexer.status()["pending"] and indexer.status()["lag_seconds"] > 0
+        assert indexer.wait_until_idle()
+        assert len(runs) == 1
+    finally:
+        indexer.stop()
+
+
+def test_failures_are_reported_and_left_pending(kb):
+    def failing():
+        raise RuntimeError("quota exceeded")
+
+    indexer = make_indexer(kb, failing, poll_seconds=60).start()
+    try:
+        deadline = time.time() + 5
+        while not indexer.runs and time.time() < deadline:
+            time.sleep(0.02)
+        status = indexer.status()
+        assert status["last_error"] == "quota exceeded"
+        assert status["pending"] and status["last_indexed_at"] is None
+    finally:
+        indexer.stop()
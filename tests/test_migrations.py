@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+
+import data.migrations as migrations
+from data.connection import close_all_connections, get_connection
+from data.insert_data import insert_employee, is_manager_of
+
+
+@pytest.fixture()
+def legacy_db(tmp_path):
+    """A DB as created by early versions: no supervisor_id, single-column review index."""
+    path = tmp_path / "employee.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE employee (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL, last_name TEXT NOT NULL, email TEXT UNIQUE NOT NULL,
+            department TEXT, position TEXT, salary REAL, hire_date TEXT
+        );
+        CREATE TABLE performance_review (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, employee_id INTEGER NOT NULL,
+            reviewer_employee_id INTEGER, score REAL, comments TEXT, created_at TEXT
+        );
+        CREATE INDEX idx_performance_employee ON performance_review(employee_id);
+        INSERT INTO employee (first_name, last_name, email) VALUES ('Old', 'Row', 'old@example.com');
+        """
+    )
+    conn.close()
+    yield path
+    close_all_connections()
+
+
+def _plan(conn, sql, params=()):
+    return " | ".join(r[-1] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+
+def test_migrate_upgrades_legacy_db(legacy_db):
+    assert migrations.get_schema_version(legacy_db) == 0
+    assert migrations.migrate(legacy_db) == migrations.LATEST_VERSION
+    # Idempotent
+    assert migrations.migrate(legacy_db) == migrations.LATEST_VERSION
+
+    conn = get_connection(legacy_db)
+    indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_performance_employee_created", "idx_employee_supervisor", "idx_employee_department_position"} <= indexes
+    assert "idx_performance_employee" not in indexes
+
+    plan = _plan(conn, "SELECT * FROM performance_review WHERE employee_id = ? ORDER BY created_at DESC", (1,))
+    assert "idx_performance_employee_created" in plan and "TEMP B-TREE" not in plan
+
+    # Hierarchy and search indexes were built over the existing rows
+    boss = insert_employee("Boss", "New", "boss@example.com", db_path=legacy_db)
+    conn.execute("UPDATE employee SET supervisor_id = ? WHERE email = 'old@example.com'", (boss,))
+    assert is_manager_of(boss, 1, db_path=legacy_db)
+    assert conn.execute("SELECT COUNT(*) FROM employee_fts").fetchone()[0] == 2
+
+
+def test_failed_migration_keeps_previous_version(legacy_db, monkeypatch):
+    broken = migrations.MIGRATIONS[:2] + [(3, "broken", "CREATE INDEX idx_ok ON employee(email); SELECT * FROM no_such_table;")]
+    monkeypatch.setattr(migrations, "MIGRATIONS", broken)
+    with pytest.raises(sqlite3.OperationalError):
+        migrations.migrate(legacy_db, target=3)
+    assert migrations.get_schema_version(legacy_db) == 2
+    conn = get_connection(legacy_db)
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'idx_ok'").fetchone()[0] == 0
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+
+POLICY = "## 誠信正直\n保持誠實、透明並遵守流程。\n\n## 團隊合作\n主動協作、分享資訊。"
+
+
+@pytest.fixture()
+def agent(db_path, tmp_path, import_agent):
+    mod = import_agent(db_path)
+    kb = tmp_path / "kb"
+    kb.mkdir()
+    (kb / "culture_policy.md").write_text(POLICY, encoding="utf-8")
+    mod.KNOWLEDGE_BASE_PATH = kb
+    mod.policy_cache = mod.PolicyRulesCache(tmp_path / "policy_cache.json")
+    calls = {"search": 0, "embed": 0}
+
+    def fake_search(query):
+        calls["search"] += 1
+        return {"status": "success", "text": (kb / "culture_policy.md").read_text(encoding="utf-8")}
+
+    def fake_embed(texts):
+        calls["embed"] += 1
+        return [[1.0, float(i)] for i, _ in enumerate(texts)]
+
+    mod.search_company_policies = fake_search
+    mod._embed_texts = fake_embed
+    mod.calls = calls
+    return mod
+
+
+def test_policy_context_cached_until_knowledge_base_changes(agent, tmp_path):
+    first = agent._load_policy_context()
+    assert first["chunks"] and first["rules"]
+    assert agent.calls == {"search": 1, "embed": 1}
+
+    # Same knowledge base: no retrieval, no parsing, no embedding
+    assert agent._load_policy_context()["embeddings"] == first["embeddings"]
+    assert agent.calls == {"search": 1, "embed": 1}
+
+    # Survives a restart (new cache object over the same file)
+    agent.policy_cache = agent.PolicyRulesCache(tmp_path / "policy_cache.json")
+    agent._load_policy_context()
+    assert agent.calls == {"search": 1, "embed": 1}
+
+    # Touching a KB file forces retrieval; identical text reuses the parsed entry
+    path = agent.KNOWLEDGE_BASE_PATH / "culture_policy.md"
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+    agent._load_policy_context()
+    assert agent.calls == {"search": 2, "embed": 1}
+
+    # Changed policy text is parsed and embedded again
+    path.write_text(POLICY + "\n\n## 創新求變\n勇於嘗試。", encoding="utf-8")
+    changed = agent._load_policy_context()
+    assert agent.calls == {"search": 3, "embed": 2}
+    assert changed["chunks"] != first["chunks"] and "## 創新求變" in changed["chunks"][-1]
+
+
+def test_failed_embeddings_are_not_cached(agent):
+    def failing_embed(texts):
+        raise agent.EmbeddingError("quota exceeded", list(range(len(texts))))
+
+    agent._embed_texts = failing_embed
+    assert agent._load_policy_context()["embeddings"] == []
+    entry = agent.policy_cache.get(POLICY)
+    assert entry["rules"] and entry["embeddings"] is None
+
+
+def test_stored_embeddings_dropped_when_chunks_change(agent, tmp_path):
+    cache = agent.PolicyRulesCache(tmp_path / "direct.json")
+    cache.put("q", "kb1", POLICY, [], ["a", "b"], [[1.0], [2.0]], chunker="v1")
+    # Same chunks and chunker, embedding failed this time: keep the earlier vectors
+    assert cache.put("q", "kb1", POLICY, [], ["a", "b"], None, chunker="v1")["embeddings"] == [[1.0], [2.0]]
+    # Re-chunked: the old vectors no longer line up with the chunks
+    assert cache.put("q", "kb1", POLICY, [], ["a", "b", "c"], None, chunker="v1")["embeddings"] is None
+    cache.put("q", "kb1", POLICY, [], ["a", "b"], [[1.0], [2.0]], chunker="v1")
+    assert cache.put("q", "kb1", POLICY, [], ["a", "b"], None, chunker="v2")["embeddings"] is None
@@ -0,0 +1,33 @@
+from query_cache import QueryResultCache
+
+RESULT = {"status": "success", "text": "來源: policy.md"}
+
+
+def test_hits_need_same_normalized_query_and_index_version():
+    cache = QueryResultCache(max_entries=4, ttl_seconds=60)
+    assert cache.get("Culture  policy", "v1") == (None, None)
+    cache.put("Culture  policy", "v1", [1.0, 0.0], RESULT)
+    assert cache.get(" culture policy ", "v1") == ([1.0, 0.0], RESULT)
+    # A new index version invalidates the result but keeps the embedding
+    assert cache.get("culture policy", "v2") == ([1.0, 0.0], None)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stale"]) == (1, 2, 1)
+    assert stats["hit_rate"] == round(1 / 3, 4)
+
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    import query_cache
+
+    now = [1000.0]
+    monkeypatch.setattr(query_cache.time, "time", lambda: now[0])
+    cache = QueryResultCache(max_entries=2, ttl_seconds=10)
+    cache.put("a", "v", [1.0], RESULT)
+    cache.put("b", "v", [2.0], RESULT)
+    cache.get("a", "v")
+    cache.put("c", "v", [3.0], RESULT)
+    assert cache.get("b", "v") == (None, None)
+    assert cache.stats()["evictions"] == 1
+
+    now[0] += 11
+    assert cache.get("a", "v") == (None, None)
+    assert cache.stats()["expired"] == 1 and cache.stats()["entries"] == 1
@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+from data.connection import get_connection
+from data.insert_data import insert_employee, insert_performance_review
+from data.query_data import query_performance_reviews, query_reviews_by_employee
+
+
+def _seed(db_path):
+    boss = insert_employee("Boss", "Lee", "boss@example.com", db_path=db_path)
+    a = insert_employee("Ann", "Wu", "ann@example.com", supervisor_id=boss, db_path=db_path)
+    b = insert_employee("Ben", "Ho", "ben@example.com", supervisor_id=boss, db_path=db_path)
+    insert_performance_review(a, boss, 80, "good", db_path=db_path, created_at="2024-01-01 00:00:00")
+    insert_performance_review(a, boss, 90, "great", db_path=db_path, created_at="2025-01-01 00:00:00")
+    insert_performance_review(b, boss, 70, "ok", db_path=db_path, created_at="2024-06-01 00:00:00")
+    return boss, a, b
+
+
+def test_bulk_reviews_match_per_employee_query(db_path):
+    boss, a, b = _seed(db_path)
+
+    everyone = query_reviews_by_employee(db_path=db_path)
+    assert list(everyone) == [a, b]
+    assert everyone[a] == query_performance_reviews(a, db_path=db_path)
+    assert [r["comments"] for r in everyone[a]] == ["great", "good"]
+
+    only_b = query_reviews_by_employee([b, boss], db_path=db_path)
+    assert list(only_b) == [b]
+    assert query_reviews_by_employee([], db_path=db_path) == {}
+
+
+def test_find_employees_uses_fts_with_like_fallback(db_path):
+    from data.employee_search import create_employee_search_index
+    from data.insert_data import find_employees, resolve_employee_identifier
+    from data.update_data import update_employee_by_id
+
+    boss, a, b = _seed(db_path)
+    cjk = insert_employee("小明", "王", "wang@example.com", position="Engineer", db_path=db_path)
+
+    # Without the index every query goes through LIKE
+    assert [r["id"] for r in find_employees("ann wu", db_path=db_path)] == [a]
+
+    create_employee_search_index(db_path)
+    assert [r["id"] for r in find_employees("ANN WU", db_path=db_path)] == [a]
+    assert [r["id"] for r in find_employees("小明 王", db_path=db_path)] == [cjk]
+    # Name hits rank above role hits
+    engineer = insert_employee("Gin", "Eer", "gin@example.com", position="Sales", db_path=db_path)
+    update_employee_by_id(engineer, {"first_name": "Engineer"}, db_path=db_path)
+    assert [r["id"] for r in find_employees("engineer", db_path=db_path)] == [engineer, cjk]
+    # Short queries fall back to LIKE
+    assert [r["id"] for r in resolve_employee_identifier("Wu", db_path=db_path)] == [a]
+    # Quotes in user input are not FTS syntax
+    assert find_employees('Ann "', db_path=db_path) == []
+
+
+def test_fts_errors_other_than_a_missing_index_propagate(db_path):
+    from data.employee_search import search_employees_fts
+
+    _seed(db_path)
+    assert search_employees_fts("ann wu", db_path=db_path) is None
+    # A plain table in place of the FTS index is broken, not absent
+    get_connection(db_path).execute("CREATE TABLE employee_fts (full_name TEXT)")
+    with pytest.raises(sqlite3.OperationalError):
+        search_employees_fts("ann wu", db_path=db_path)
+
+
+def test_iter_employees_pages_past_the_old_limit(db_path):
+    from data.query_data import iter_employees, query_employees
+
+    for i in range(130):
+        insert_employee(f"E{i}", "X", f"e{i}@example.com", db_path=db_path)
+
+    assert len(query_employees(db_path=db_path)) == 100
+    ids = [r["id"] for r in iter_employees(db_path=db_path, page_size=7)]
+    assert ids == list(range(1, 131))
+    assert [r["id"] for r in iter_employees(db_path=db_path, page_size=50, after_id=125)] == list(range(126, 131))
@@ -0,0 +1,52 @@
+import sqlite3
+
+import pytest
+
+from data.connection import get_connection
+from data.insert_data import insert_employee, insert_performance_review
+from data.migrations import migrate
+from data.review_stats import REVIEW_STATS_REBUILD_SQL, query_review_stats, query_review_stats_many
+
+
+def test_triggers_match_fallback_aggregate(db_path):
+    boss = insert_employee("Boss", "Lee", "boss@example.com", db_path=db_path)
+    a = insert_employee("Ann", "Wu", "ann@example.com", db_path=db_path)
+    insert_performance_review(a, boss, 80, "x", db_path=db_path, created_at="2024-01-01 00:00:00")
+    # Without the table, stats are aggregated on the fly
+    fallback_before = query_review_stats(a, db_path=db_path)
+    assert fallback_before["review_count"] == 1
+
+    migrate(db_path)
+    assert query_review_stats(a, db_path=db_path) == fallback_before
+
+    insert_performance_review(a, boss, 60, "y", db_path=db_path, created_at="2025-01-01 00:00:00")
+    insert_performance_review(a, boss, 100, "z", db_path=db_path, created_at="2023-01-01 00:00:00")
+    stats = query_review_stats(a, db_path=db_path)
+    assert stats == {
+        "employee_id": a,
+        "review_count": 3,
+        "mean_score": 80.0,
+        "min_score": 60.0,
+        "max_score": 100.0,
+        "latest_score": 60.0,
+        "latest_at": "2025-01-01 00:00:00",
+    }
+
+    conn = get_connection(db_path)
+    conn.execute("DELETE FROM performance_review WHERE score = 60")
+    conn.execute("UPDATE performance_review SET score = 90 WHERE score = 100")
+    stats = query_review_stats(a, db_path=db_path)
+    assert (stats["review_count"], stats["mean_score"], stats["max_score"], stats["latest_score"]) == (2, 85.0, 90.0, 80.0)
+
+    incremental = query_review_stats_many(db_path=db_path)
+    conn.executescript(REVIEW_STATS_REBUILD_SQL)
+    assert query_review_stats_many(db_path=db_path) == incremental
+    assert query_review_stats(boss, db_path=db_path) is None
+
+
+def test_errors_other_than_a_missing_table_propagate(db_path):
+    a = insert_employee("Ann", "Wu", "ann@example.com", db_path=db_path)
+    # A review_stats table missing its columns is broken, not absent
+    get_connection(db_path).execute("CREATE TABLE review_stats (employee_id INTEGER)")
+    with pytest.raises(sqlite3.OperationalError, match="no such column"):
+        query_review_stats(a, db_path=db_path)
@@ -0,0 +1,43 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from similarity import SimilarityIndex, normalize_rows
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    na, nb = math.sqrt(sum(x * x for x in a)), math.sqrt(sum(y * y for y in b))
+    return dot / (na * nb) if na and nb else 0.0
+
+
+def test_scores_match_pairwise_cosine():
+    rng = np.random.default_rng(0)
+    refs = rng.normal(size=(5, 16)).tolist()
+    queries = rng.normal(size=(7, 16)).tolist()
+    sims = SimilarityIndex(refs).scores(queries)
+    assert sims.shape == (7, 5)
+    for i, q in enumerate(queries):
+        for j, r in enumerate(refs):
+            assert sims[i, j] == pytest.approx(_cosine(q, r), abs=1e-5)
+
+
+def test_best_top_k_and_hits():
+    index = SimilarityIndex([[1, 0], [0, 1], [1, 1]])
+    idx, scores = index.best([[1, 0], [0, 2], [0, 0], [1]])
+    assert idx[:2].tolist() == [0, 1]
+    # Zero and wrong-dimension queries score 0 everywhere
+    assert scores.tolist()[2:] == [0.0, 0.0]
+
+    top_idx, top_scores = index.top_k([[1, 0.2]], k=2)
+    assert top_idx.tolist() == [[0, 2]]
+    assert top_scores[0, 0] >= top_scores[0, 1]
+
+    assert index.hits([[1, 0], [0, 1]], threshold=0.99) == [(0, 0, pytest.approx(1.0)), (1, 1, pytest.approx(1.0))]
+
+
+def test_normalize_rows_handles_ragged_input():
+    m = normalize_rows([[3, 4], [0.0], [0, 0]], dim=2)
+    assert m.tolist() == [[pytest.approx(0.6), pytest.approx(0.8)], [0, 0], [0, 0]]
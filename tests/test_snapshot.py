@@ -0,0 +1,49 @@
+import pytest
+
+from data.connection import get_connection, transaction
+from data.insert_data import insert_employee, insert_performance_review
+from data.query_data import iter_employees, query_reviews_by_employee
+from data.snapshot import close_snapshots, enable_snapshots, get_read_connection, get_snapshot
+
+
+@pytest.fixture()
+def db_path(db_path):
+    enable_snapshots(True)
+    yield db_path
+    enable_snapshots(False)
+    close_snapshots()
+
+
+def test_reports_read_snapshot_and_refresh_after_writes(db_path):
+    boss = insert_employee("Boss", "Lee", "boss@example.com", db_path=db_path)
+    snap = get_snapshot(db_path)
+    assert [r["id"] for r in iter_employees(db_path=db_path)] == [boss]
+    assert snap.refreshes == 1
+    # No commits since the copy: served from memory without another backup
+    assert [r["id"] for r in iter_employees(db_path=db_path)] == [boss]
+    assert snap.refreshes == 1
+
+    ann = insert_employee("Ann", "Wu", "ann@example.com", db_path=db_path)
+    insert_performance_review(ann, boss, 90, "great", db_path=db_path)
+    assert [r["id"] for r in iter_employees(db_path=db_path)] == [boss, ann]
+    assert list(query_reviews_by_employee(db_path=db_path)) == [ann]
+    assert snap.refreshes == 2
+
+
+def test_report_reads_one_consistent_copy_while_writers_commit(db_path):
+    ids = [insert_employee("E", str(i), f"e{i}@example.com", db_path=db_path) for i in range(3)]
+    rows = iter_employees(db_path=db_path, page_size=1)
+    assert next(rows)["id"] == ids[0]
+    # Writers commit mid-report; the report keeps reading the copy it started with
+    with transaction(db_path) as conn:
+        conn.execute("UPDATE employee SET salary = 1 WHERE id = ?", (ids[1],))
+        conn.execute("DELETE FROM employee WHERE id = ?", (ids[2],))
+    rest = list(rows)
+    assert [r["id"] for r in rest] == ids[1:] and rest[0]["salary"] is None
+
+    conn = get_read_connection(db_path)
+    assert conn is not get_connection(db_path)
+    with pytest.raises(Exception):
+        conn.execute("DELETE FROM employee")
+    # The next report sees the committed changes
+    assert [r["salary"] for r in iter_employees(db_path=db_path)] == [None, 1]
@@ -63,6 +63,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def apply_schema_migrations() -> None:
+    # Bring the employee DB schema (indexes, hierarchy, search tables) up to date
+    from data.async_db import run_db
+    from data.migrations import migrate
+    version = await run_db(migrate)
+    print(f"Employee DB schema at version {version}")
+    # Keep the policy index up to date in the background instead of on each query
+    from rag_tool import start_background_indexer
+    start_background_indexer()
+
+@app.on_event("shutdown")
+async def close_db_pool() -> None:
+    from data.async_db import shutdown_db_executor, shutdown_io_executor
+    from data.snapshot import close_snapshots
+    from rag_tool import close_collection, stop_background_indexer
+    shutdown_db_executor(wait=False)
+    shutdown_io_executor(wait=False)
+    close_snapshots()
+    stop_background_indexer()
+    close_collection()
+
 # Serve static files (our frontend)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -196,6 +218,12 @@ async def cancel_endpoint(req: CancelRequest):
 
     return {"status": "cancel_requested", "session_id": req.session_id}
 
+@app.get("/kb/status")
+async def kb_status():
+    # Knowledge-base index version plus background indexer freshness and lag
+    from rag_tool import index_status
+    return index_status()
+
 @app.get("/")
 async def root():
     return RedirectResponse(url="/static/index.html")